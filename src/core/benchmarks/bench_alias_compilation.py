@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: compiling many task aliases
+======================================
+
+Each alias is resolved into a GroupDeclaration - every task of every alias is a copy of the original TaskDeclaration
+with alias env, arguments and argument block applied. Aliases are resolved on first use, so ApplicationContext.compile()
+should not depend on the number of aliases, while validate_all() resolves all of them (as "rkd --validate-all" does).
+Reports time and peak memory of both for growing number of aliases.
+
+Usage: python benchmarks/bench_alias_compilation.py [--aliases 1000,5000] [--tasks-per-alias 4]
+"""
+
+import os
+import sys
+import argparse
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)) + '/../')
+
+from rkd.core.api.syntax import TaskDeclaration, TaskAliasDeclaration  # noqa: E402
+from rkd.core.api.inputoutput import NullSystemIO  # noqa: E402
+from rkd.core.context import ApplicationContext  # noqa: E402
+from rkd.core.standardlib import CallableTask  # noqa: E402
+
+TASKS = 20
+
+
+def execute(context, task) -> bool:
+    return True
+
+
+def create_context(aliases: int, tasks_per_alias: int) -> ApplicationContext:
+    declarations = [TaskDeclaration(CallableTask(':task-%i' % task_num, execute)) for task_num in range(0, TASKS)]
+    alias_declarations = []
+
+    for alias_num in range(0, aliases):
+        to_execute = []
+
+        for task_num in range(0, tasks_per_alias):
+            to_execute += [':task-%i' % ((alias_num + task_num) % TASKS), '--help']
+
+        alias_declarations.append(TaskAliasDeclaration(':alias-%i' % alias_num, to_execute,
+                                                       env={'ALIAS_NUM': str(alias_num)}))
+
+    ctx = ApplicationContext(declarations, alias_declarations, '', subprojects=[], workdir='', project_prefix='')
+    ctx.io = NullSystemIO()
+
+    return ctx
+
+
+def measure(method) -> tuple:
+    """
+    :return: Tuple of (elapsed seconds, peak memory in MB)
+    """
+
+    tracemalloc.start()
+    started_at = perf_counter()
+
+    method()
+
+    elapsed = perf_counter() - started_at
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures compilation of ApplicationContext with many aliases')
+    parser.add_argument('--aliases', default='1000,5000', help='Comma separated list of alias counts')
+    parser.add_argument('--tasks-per-alias', type=int, default=4, help='Number of tasks executed by each alias')
+    args = parser.parse_args()
+
+    print('%12s %16s %12s %16s %17s %16s' % ('Aliases', 'Declarations', 'Compile [s]', 'Peak memory [MB]',
+                                             'Validate all [s]', 'Peak memory [MB]'))
+
+    for aliases in [int(num) for num in args.aliases.split(',')]:
+        ctx = create_context(aliases, args.tasks_per_alias)
+
+        compile_elapsed, compile_peak = measure(ctx.compile)
+        validate_elapsed, validate_peak = measure(ctx.validate_all)
+
+        assert len(ctx.find_all_tasks()) == TASKS + aliases
+
+        print('%12i %16i %12.3f %16.1f %17.3f %16.1f' % (
+            aliases, aliases * args.tasks_per_alias, compile_elapsed, compile_peak, validate_elapsed, validate_peak
+        ))
+
+
+if __name__ == '__main__':
+    main()
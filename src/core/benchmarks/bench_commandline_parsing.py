@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: parsing long commandlines
+====================================
+
+Generated pipelines could consist of thousands of tasks, every n-th of them wrapped in a {@retry} block.
+Commandline is tokenized in a single pass, so the time of CommandlineParsingHelper.create_grouped_arguments()
+should grow linearly with the number of arguments - the time per 1000 arguments should stay flat.
+
+Usage: python benchmarks/bench_commandline_parsing.py [--tasks 1000,4000,16000,64000] [--block-every 10]
+"""
+
+import os
+import sys
+import argparse
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)) + '/../')
+
+from rkd.core.api.inputoutput import NullSystemIO  # noqa: E402
+from rkd.core.argparsing.parser import CommandlineParsingHelper  # noqa: E402
+
+
+def create_commandline(tasks: int, block_every: int) -> list:
+    commandline = []
+
+    for task_num in range(0, tasks):
+        if task_num % block_every == 0:
+            commandline += ['{@retry 2}', ':task-%i' % task_num, '--arg', 'value', '{/@}']
+        else:
+            commandline += [':task-%i' % task_num, '--arg=%i' % task_num]
+
+    return commandline
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures parsing of long commandlines with blocks')
+    parser.add_argument('--tasks', default='1000,4000,16000,64000', help='Comma separated list of task counts')
+    parser.add_argument('--block-every', type=int, default=10, help='Wrap every n-th task in a {@retry} block')
+    args = parser.parse_args()
+
+    print('%12s %12s %12s %18s' % ('Tasks', 'Arguments', 'Parse [s]', 'Per 1000 args [ms]'))
+
+    for tasks in [int(num) for num in args.tasks.split(',')]:
+        commandline = create_commandline(tasks, args.block_every)
+
+        started_at = perf_counter()
+        blocks = CommandlineParsingHelper(NullSystemIO()).create_grouped_arguments(commandline)
+        elapsed = perf_counter() - started_at
+
+        assert sum(len(block.tasks()) for block in blocks) == tasks
+
+        print('%12i %12i %12.3f %18.3f' % (tasks, len(commandline), elapsed, elapsed / len(commandline) * 1000000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: merging contexts of many subprojects
+===============================================
+
+Builds an ApplicationContext the same way as ContextFactory.create_unified_context() does - one context per subproject
+is merged into the main context, then the result is compiled. Reports time and peak memory for growing number
+of subprojects, the growth should be close to linear.
+
+Usage: python benchmarks/bench_context_merge.py [--subprojects 50,100,200] [--tasks 50]
+"""
+
+import os
+import sys
+import argparse
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)) + '/../')
+
+from rkd.core.api.syntax import TaskDeclaration  # noqa: E402
+from rkd.core.api.inputoutput import NullSystemIO  # noqa: E402
+from rkd.core.context import ApplicationContext  # noqa: E402
+from rkd.core.standardlib import CallableTask  # noqa: E402
+
+
+def execute(context, task) -> bool:
+    return True
+
+
+def create_subproject_contexts(subprojects: int, tasks: int) -> list:
+    contexts = []
+
+    for project_num in range(0, subprojects):
+        declarations = [TaskDeclaration(CallableTask(':task-%i' % task_num, execute)) for task_num in range(0, tasks)]
+
+        contexts.append(ApplicationContext(declarations, [], '/project/app-%i/.rkd' % project_num,
+                                           subprojects=[], workdir='app-%i' % project_num,
+                                           project_prefix=':app-%i' % project_num))
+
+    return contexts
+
+
+def build_unified_context(contexts: list) -> ApplicationContext:
+    ctx = ApplicationContext([], [], '', subprojects=[], workdir='', project_prefix='')
+    ctx.io = NullSystemIO()
+
+    for subctx in contexts:
+        ctx = ApplicationContext.merge(ctx, subctx)
+
+    ctx.io = NullSystemIO()
+    ctx.compile()
+
+    return ctx
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures merging of ApplicationContext for many subprojects')
+    parser.add_argument('--subprojects', default='50,100,200', help='Comma separated list of subproject counts')
+    parser.add_argument('--tasks', type=int, default=50, help='Number of tasks in each subproject')
+    args = parser.parse_args()
+
+    print('%12s %8s %12s %16s' % ('Subprojects', 'Tasks', 'Merge [s]', 'Peak memory [MB]'))
+
+    for subprojects in [int(num) for num in args.subprojects.split(',')]:
+        contexts = create_subproject_contexts(subprojects, args.tasks)
+
+        tracemalloc.start()
+        started_at = perf_counter()
+
+        ctx = build_unified_context(contexts)
+
+        elapsed = perf_counter() - started_at
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        assert len(ctx.find_all_tasks()) == subprojects * args.tasks
+
+        print('%12i %8i %12.3f %16.1f' % (subprojects, subprojects * args.tasks, elapsed, peak / 1024 / 1024))
+
+
+if __name__ == '__main__':
+    main()
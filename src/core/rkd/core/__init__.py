@@ -1 +1,8 @@
-from .bootstrap import main, RiotKitDoApplication
+def __getattr__(name: str):
+    """Bootstrap is imported on demand - the thin client (rkd.core.client) does not need it"""
+
+    if name in ['main', 'RiotKitDoApplication']:
+        from . import bootstrap
+        return getattr(bootstrap, name)
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
 
-from .bootstrap import main
+from .client import main
 
 main()
@@ -6,7 +6,6 @@ CONTRACT (part of API)
 Core interfaces that should be changed WITH CAREFUL as those are parts of API.
 Any breaking change there requires to bump RKD major version (see: Semantic Versioning)
 """
-from tabulate import tabulate
 from abc import abstractmethod, ABC as AbstractClass
 from typing import Dict, List, Union, Optional
 from argparse import ArgumentParser
@@ -88,6 +87,15 @@ class TaskDeclarationInterface(AbstractClass):
     def format_task_name(self, name: str) -> str:
         pass
 
+    def get_dependencies(self) -> List[str]:
+        return []
+
+    def get_inputs(self) -> List[str]:
+        return []
+
+    def get_outputs(self) -> List[str]:
+        return []
+
     @property
     def is_internal(self) -> bool:
         return False
@@ -318,6 +326,29 @@ class TaskInterface(TaskUtilities):
     def get_description(self) -> str:
         return ''
 
+    def get_dependencies(self) -> List[str]:
+        """Names of tasks that needs to be executed before this task eg. [':build']
+
+        Each dependency is executed only once per RKD invocation, even if multiple tasks depend on it.
+        Inside a subproject the name is looked up first in the subproject, then globally."""
+
+        return []
+
+    def get_inputs(self) -> List[str]:
+        """Glob patterns of files the task reads eg. ['src/**/*.py', 'setup.py'], relative to task's workdir
+
+        When inputs are declared, then the task is skipped as "up-to-date", if the content of input files,
+        the arguments and the environment did not change since last successful execution."""
+
+        return []
+
+    def get_outputs(self) -> List[str]:
+        """Paths of files or directories the task produces eg. ['dist/'], relative to task's workdir
+
+        Task is never considered up-to-date, when any of its outputs is missing."""
+
+        return []
+
     @abstractmethod
     def execute(self, context: ExecutionContext) -> bool:
         """ Executes a task. True/False should be returned as return """
@@ -484,6 +515,8 @@ class TaskInterface(TaskUtilities):
             Formatted table as string
         """
 
+        from tabulate import tabulate
+
         return tabulate(body, headers=header, floatfmt=floatfmt, numalign=numalign, tablefmt=tablefmt,
                         stralign=stralign, missingval=missingval, showindex=showindex,
                         disable_numparse=disable_numparse, colalign=colalign)
@@ -1,19 +1,24 @@
 import importlib
 from types import FunctionType
-from typing import List
+from typing import List, Optional
 from ..exception import ParsingException
 from .syntax import TaskDeclaration
+from ..task_manifest import TaskManifest
 
 
 class SyntaxParsing(object):
     @staticmethod
-    def parse_imports_by_list_of_classes(classes_or_modules: List[str]) -> List[TaskDeclaration]:
+    def parse_imports_by_list_of_classes(classes_or_modules: List[str],
+                                         manifest: Optional[TaskManifest] = None) -> List[TaskDeclaration]:
         """
         Parses a List[str] of imports, like in YAML syntax.
         Produces a List[TaskDeclaration] with imported list of tasks.
 
         Could be used to import & validate RKD tasks.
 
+        When a TaskManifest is passed, then imports known in the manifest are not imported,
+        LazyTaskDeclaration is created instead. Other imports are imported and remembered in the manifest.
+
         Examples:
             - rkd.core.standardlib
             - rkd.core.standardlib.jinja.FileRendererTask
@@ -25,6 +30,12 @@ class SyntaxParsing(object):
         parsed: List[TaskDeclaration] = []
 
         for import_str in classes_or_modules:
+            lazy_declarations = manifest.get_declarations(import_str) if manifest else None
+
+            if lazy_declarations is not None:
+                parsed += lazy_declarations
+                continue
+
             parts = import_str.split('.')
             class_name = parts[-1]
             import_path = '.'.join(parts[:-1])
@@ -48,8 +59,13 @@ class SyntaxParsing(object):
                 raise ParsingException.from_class_not_found_in_module_error(import_str, class_name, import_path)
 
             if isinstance(module.__getattribute__(class_name), FunctionType):
-                parsed += module.__getattribute__(class_name)()
+                imported = module.__getattribute__(class_name)()
             else:
-                parsed.append(TaskDeclaration(module.__getattribute__(class_name)()))
+                imported = [TaskDeclaration(module.__getattribute__(class_name)())]
+
+            if manifest:
+                manifest.remember(import_str, module, imported)
+
+            parsed += imported
 
         return parsed
@@ -7,6 +7,8 @@ Classes used in a declaration syntax in makefile.py
 
 """
 
+import inspect
+import importlib
 from typing import List, Dict, Optional
 from copy import deepcopy
 from .contract import TaskDeclarationInterface
@@ -15,6 +17,7 @@ from .contract import TaskInterface
 from .inputoutput import get_environment_copy
 from ..argparsing.model import ArgumentBlock
 from ..exception import DeclarationException
+from ..makefile_loader import is_makefile_module
 from uuid import uuid4
 
 
@@ -49,24 +52,41 @@ def merge_workdir(task_workdir: Optional[str], subproject_workdir: Optional[str]
     return subproject_workdir + '/' + task_workdir
 
 
+def _is_constructible_without_arguments(cls: type) -> bool:
+    try:
+        inspect.signature(cls).bind()
+        return True
+
+    except (TypeError, ValueError):
+        return False
+
+
 class TaskDeclaration(TaskDeclarationInterface):
     """
     Task Declaration is a DECLARED USAGE of a Task (instance of TaskInterface)
+
+    Declarations are immutable - with_*() and as_part_of_subproject() are producing a shallow copy, that shares
+    the task instance, env, args and other containers with the original declaration, so copying costs the same
+    no matter how big the environment is. Shared containers are replaced by the setters, never modified in place.
     """
 
     _task: TaskInterface
     _env: Dict[str, str]       # environment at all
     _user_defined_env: list    # list of env variables overridden by user
     _args: List[str]
-    _block: ArgumentBlock = None
+    _block: Optional[ArgumentBlock]
     _unique_id: str
     _workdir: Optional[str]        # current working directory (eg. combination of subproject + task)
     _task_workdir: Optional[str]   # original task working directory as defined in task
     _project_name: str
     _is_internal: Optional[bool]             # task is not listed on :tasks
+    _dependencies: List[str]                 # tasks to execute before this task (in addition to task's own)
+    _inputs: List[str]                       # glob patterns of files read by task (in addition to task's own)
+    _outputs: List[str]                      # files/directories produced by task (in addition to task's own)
 
     def __init__(self, task: TaskInterface, env: Dict[str, str] = None, args: List[str] = None,
-                 workdir: str = None, internal: Optional[bool] = None):
+                 workdir: str = None, internal: Optional[bool] = None, dependencies: List[str] = None,
+                 inputs: List[str] = None, outputs: List[str] = None):
 
         if env is None:
             env = {}
@@ -74,11 +94,21 @@ class TaskDeclaration(TaskDeclarationInterface):
         if args is None:
             args = []
 
-        if not isinstance(task, TaskInterface):
+        if dependencies is None:
+            dependencies = []
+
+        if inputs is None:
+            inputs = []
+
+        if outputs is None:
+            outputs = []
+
+        if not self._is_valid_task(task):
             raise DeclarationException('Invalid class: TaskDeclaration needs to take TaskInterface as task argument')
 
         self._unique_id = uuid4().hex
         self._task = task
+        self._block = None
         self._env = merge_env(env)
         self._args = args
         self._workdir = workdir
@@ -86,6 +116,13 @@ class TaskDeclaration(TaskDeclarationInterface):
         self._user_defined_env = list(env.keys())
         self._project_name = ''
         self._is_internal = internal
+        self._dependencies = dependencies
+        self._inputs = inputs
+        self._outputs = outputs
+
+    @staticmethod
+    def _is_valid_task(task) -> bool:
+        return isinstance(task, TaskInterface)
 
     def to_full_name(self):
         if self._project_name:
@@ -136,11 +173,11 @@ class TaskDeclaration(TaskDeclarationInterface):
         return copy
 
     def _clone(self) -> 'TaskDeclaration':
-        """Clone securely the object. There fields shared across objects as references could be kept"""
+        """Shallow copy with a new unique id. Fields are shared as references - setters must replace, not modify them"""
 
-        copy = deepcopy(self)
+        copy = object.__new__(type(self))
+        copy.__dict__.update(self.__dict__)
         copy._unique_id = uuid4().hex
-        copy._block = self._block
 
         return copy
 
@@ -161,6 +198,25 @@ class TaskDeclaration(TaskDeclarationInterface):
 
         return self._user_defined_env
 
+    def get_dependencies(self) -> List[str]:
+        """ Names of tasks to execute before this task - declared in TaskDeclaration and by the task itself """
+
+        return list(dict.fromkeys(self._dependencies + self._task.get_dependencies()))
+
+    def get_inputs(self) -> List[str]:
+        """ Glob patterns of input files - declared in TaskDeclaration and by the task itself """
+
+        return list(dict.fromkeys(self._inputs + self._task.get_inputs()))
+
+    def get_outputs(self) -> List[str]:
+        """ Paths of files/directories produced by the task - declared in TaskDeclaration and by the task itself """
+
+        return list(dict.fromkeys(self._outputs + self._task.get_outputs()))
+
+    @property
+    def project_name(self) -> str:
+        return self._project_name
+
     def get_group_name(self) -> str:
         split = self.to_full_name().split(':')
         return split[1] if len(split) >= 3 else ''
@@ -234,6 +290,140 @@ class TaskDeclaration(TaskDeclarationInterface):
         return 'TaskDeclaration<%s>' % self.get_task_to_execute().get_full_name()
 
 
+class LazyTaskDeclaration(TaskDeclaration):
+    """
+    Declaration of a task, that is imported only when it is going to be executed (or inspected eg. with --help).
+
+    Everything that is needed to list the task and to validate the context (name, description, dependencies)
+    is known up front, eg. from a TaskManifest - the task class is imported on first get_task_to_execute() call.
+
+    Example:
+        LazyTaskDeclaration('rkd.core.standardlib.jinja.FileRendererTask', ':j2:render',
+                            description='Renders a single file from JINJA2')
+    """
+
+    _class_path: str
+    _full_name: str
+    _description: str
+    _full_description: str
+    _has_fancy_formatting: bool
+
+    def __init__(self, class_path: str, full_name: str, description: str = '', full_description: str = '',
+                 env: Dict[str, str] = None, args: List[str] = None, workdir: str = None, internal: bool = False,
+                 dependencies: List[str] = None, inputs: List[str] = None, outputs: List[str] = None,
+                 has_fancy_formatting: bool = False):
+
+        super().__init__(None, env=env, args=args, workdir=workdir, internal=internal, dependencies=dependencies,
+                         inputs=inputs, outputs=outputs)
+
+        self._class_path = class_path
+        self._full_name = full_name
+        self._description = description
+        self._full_description = full_description if full_description else description
+        self._has_fancy_formatting = has_fancy_formatting
+
+    @staticmethod
+    def _is_valid_task(task) -> bool:
+        """Task is imported on first use"""
+
+        return task is None
+
+    @staticmethod
+    def describe(declaration: TaskDeclaration) -> Optional[dict]:
+        """
+        Collects constructor arguments of a LazyTaskDeclaration equivalent to given declaration
+
+        :return: None, when the task cannot be recreated just from its class (eg. it takes constructor arguments)
+        """
+
+        if type(declaration) is not TaskDeclaration or declaration.block() or declaration.project_name \
+                or declaration.get_user_overridden_envs():
+            return None
+
+        task = declaration.get_task_to_execute()
+        task_class = type(task)
+
+        if '.' in task_class.__qualname__ or task_class.__module__ == '__main__' \
+                or is_makefile_module(task_class.__module__):
+            return None
+
+        # the class is not instantiated there - constructors could have side effects. Task without any instance
+        # state is fully configured by its class, so it can be recreated by calling the constructor without arguments
+        if getattr(task, '__dict__', None) != {} or not _is_constructible_without_arguments(task_class):
+            return None
+
+        return {
+            'class_path': task_class.__module__ + '.' + task_class.__qualname__,
+            'full_name': declaration.to_full_name(),
+            'description': declaration.get_description(),
+            'full_description': declaration.get_full_description(),
+            'args': declaration.get_args(),
+            'workdir': declaration._task_workdir,
+            'internal': declaration.is_internal,
+            'dependencies': declaration.get_dependencies(),
+            'inputs': declaration._inputs,
+            'outputs': declaration._outputs,
+            'has_fancy_formatting': task_class.format_task_name is not TaskInterface.format_task_name
+        }
+
+    def to_full_name(self):
+        return self._project_name + self._full_name
+
+    def get_task_to_execute(self) -> TaskInterface:
+        if self._task is None:
+            self._task = self._import_task()
+
+        return self._task
+
+    def _import_task(self) -> TaskInterface:
+        module_name, class_name = self._class_path.rsplit('.', 1)
+
+        try:
+            task = getattr(importlib.import_module(module_name), class_name)()
+
+        except (ImportError, AttributeError) as exc:
+            raise DeclarationException(f'Cannot import task "{self._full_name}" from "{self._class_path}": {exc}')
+
+        if task.get_full_name() != self._full_name:
+            raise DeclarationException(f'Task "{self._class_path}" is now named "{task.get_full_name()}", '
+                                       f'but it was declared as "{self._full_name}". Task manifest is outdated')
+
+        return task
+
+    def is_loaded(self) -> bool:
+        return self._task is not None
+
+    def get_dependencies(self) -> List[str]:
+        """ Dependencies declared by the task itself are already included """
+
+        return list(self._dependencies)
+
+    def get_inputs(self) -> List[str]:
+        return list(dict.fromkeys(self._inputs + self.get_task_to_execute().get_inputs()))
+
+    def get_outputs(self) -> List[str]:
+        return list(dict.fromkeys(self._outputs + self.get_task_to_execute().get_outputs()))
+
+    def get_description(self) -> str:
+        return self._description
+
+    def get_full_description(self) -> str:
+        return self._full_description
+
+    def format_task_name(self, name: str) -> str:
+        if not self._has_fancy_formatting:
+            return name
+
+        return self.get_task_to_execute().format_task_name(name)
+
+    @property
+    def is_internal(self) -> bool:
+        return self._is_internal
+
+    def __str__(self):
+        return 'LazyTaskDeclaration<%s>' % self._full_name
+
+
 class GroupDeclaration(GroupDeclarationInterface):
     """ Internal DTO: Processed definition of TaskAliasDeclaration into TaskDeclaration """
 
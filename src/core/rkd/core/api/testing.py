@@ -25,6 +25,7 @@ from rkd.core.api.inputoutput import IO
 from rkd.core.api.inputoutput import NullSystemIO
 from rkd.core.api.inputoutput import BufferedSystemIO
 from rkd.core.context import ApplicationContext
+from rkd.core.packaging import resolver
 
 
 class OutputCapturingSafeTestCase(TestCase):
@@ -68,6 +69,7 @@ class BasicTestingCase(TestCase):
 
     Provides minimum of:
       - Doing backup of environment and cwd
+      - Forgetting remembered filesystem lookups (files could be created by tests)
       - Methods for mocking task dependencies (RKD-specific like ExecutionContext)
 
     """
@@ -77,6 +79,7 @@ class BasicTestingCase(TestCase):
 
     def setUp(self) -> None:
         os.environ['RKD_PATH'] = ''
+        resolver.clear()
 
         self._envs = deepcopy(os.environ)
         self._cwd = os.getcwd()
@@ -108,6 +111,13 @@ class BasicTestingCase(TestCase):
             os.environ.update(environ)
             yield
         finally:
+            # os.environ.update() also exported the variables to the process, subprocesses would inherit them
+            for name in environ:
+                if name in backup:
+                    os.putenv(name, backup[name])
+                else:
+                    os.unsetenv(name)
+
             os.environ = backup
 
     @staticmethod
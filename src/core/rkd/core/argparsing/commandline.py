@@ -0,0 +1,312 @@
+"""
+Commandline syntax
+==================
+
+Tokenizer and syntax tree of a commandline (or of arguments of a task alias):
+
+.. code:: shell
+
+    :prepare @ --env=test :deploy '{@rescue :rollback @retry 3}' :migrate :restart '{/@}'
+
+Commandline is read once, from left to right - each argument is split only around block markers ("{@", "{/@}"),
+so the time of parsing grows linearly with the number of arguments and blocks.
+
+Tokens:
+
+    - WORD: a task (":task", "@"), a switch or a value
+    - BLOCK_BEGIN: "{@modifier ...}" header, could be spread across multiple arguments
+    - BLOCK_END: "{/@}"
+
+Syntax tree (result of parse_commandline()):
+
+    - TaskNode: task name with arguments that follow it
+    - SharedArgumentsNode: "@" with arguments, that are appended to each next task (empty "@" clears them)
+    - ArgumentsNode: arguments that do not follow any task (eg. "rkd --help")
+    - BlockNode: block header with its modifiers, and nodes of its body
+
+to_argv() renders the nodes back into a commandline, that parses into the same tree.
+"""
+
+import re
+from shlex import quote
+from typing import List, Union, Optional, Dict
+from .model import ArgumentBlock
+from ..exception import CommandlineParsingError
+
+WORD = 'word'
+BLOCK_BEGIN = 'block_begin'
+BLOCK_END = 'block_end'
+
+TOKEN_SHARED_ARGUMENTS = '@'
+TOKEN_BEGIN_BLOCK = '{@'
+TOKEN_BEGIN_BLOCK_ENDING = '{/@'
+TOKEN_CLOSING_BLOCK = '}'
+TOKEN_BLOCK_ENDING = TOKEN_BEGIN_BLOCK_ENDING + TOKEN_CLOSING_BLOCK
+
+_BLOCK_MARKER = re.compile(re.escape(TOKEN_BLOCK_ENDING) + '|' + re.escape(TOKEN_BEGIN_BLOCK))
+_HEADER_INTERRUPTION = re.compile(re.escape(TOKEN_BEGIN_BLOCK_ENDING) + '|' + re.escape(TOKEN_BEGIN_BLOCK))
+
+ALLOWED_MODIFIERS = ['rescue', 'error', 'retry', 'retry-block']
+
+
+class Token(object):
+    kind: str
+    value: str
+    position: int  # number of commandline argument, where the token begins
+
+    def __init__(self, kind: str, value: str, position: int):
+        self.kind = kind
+        self.value = value
+        self.position = position
+
+    def __repr__(self):
+        return 'Token<%s %r at %i>' % (self.kind, self.value, self.position)
+
+
+class TaskNode(object):
+    name: str
+    args: List[str]
+
+    def __init__(self, name: str, args: List[str] = None):
+        self.name = name
+        self.args = args if args is not None else []
+
+    def to_argv(self) -> List[str]:
+        return [self.name] + self.args
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.to_argv() == self.to_argv()
+
+    def __repr__(self):
+        return 'TaskNode<%s %s>' % (self.name, self.args)
+
+
+class SharedArgumentsNode(object):
+    args: List[str]
+
+    def __init__(self, args: List[str] = None):
+        self.args = args if args is not None else []
+
+    def to_argv(self) -> List[str]:
+        return [TOKEN_SHARED_ARGUMENTS] + self.args
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.args == self.args
+
+    def __repr__(self):
+        return 'SharedArgumentsNode<%s>' % self.args
+
+
+class ArgumentsNode(object):
+    args: List[str]
+
+    def __init__(self, args: List[str] = None):
+        self.args = args if args is not None else []
+
+    def to_argv(self) -> List[str]:
+        return list(self.args)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.args == self.args
+
+    def __repr__(self):
+        return 'ArgumentsNode<%s>' % self.args
+
+
+class BlockNode(object):
+    header: str     # eg. "{@retry 3 @error :notify", without the closing "}"
+    modifiers: dict
+    body: List[Union[TaskNode, SharedArgumentsNode, ArgumentsNode]]
+
+    def __init__(self, header: str, modifiers: dict, body: list = None):
+        self.header = header
+        self.modifiers = modifiers
+        self.body = body if body is not None else []
+
+    def create_argument_block(self) -> ArgumentBlock:
+        """
+        :raises CommandlineParsingError:
+        """
+
+        try:
+            return ArgumentBlock(body=to_argv(self.body), **self.modifiers)
+        except TypeError as e:
+            raise CommandlineParsingError.from_block_unknown_modifier(self.header, e)
+
+    def to_argv(self) -> List[str]:
+        return [self.header + TOKEN_CLOSING_BLOCK] + to_argv(self.body) + [TOKEN_BLOCK_ENDING]
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.header == self.header and other.body == self.body
+
+    def __repr__(self):
+        return 'BlockNode<%s, %s>' % (self.header, self.body)
+
+
+Node = Union[TaskNode, SharedArgumentsNode, ArgumentsNode, BlockNode]
+
+
+def parse_block_header(block_header: str) -> Dict[str, Union[str, int]]:
+    """
+    Parses a header ex. "{@retry 3"
+
+    :author: dkwebbie <github.com/dkwebbie>
+    """
+
+    parsed = re.findall('@([a-z\-]+)([^@]*)', block_header)
+    as_dict = {}
+
+    if not parsed:
+        raise CommandlineParsingError.from_block_header_parsing_exception(block_header)
+
+    for result in parsed:
+        result: List[str]
+        name = result[0].strip()
+
+        if name not in ALLOWED_MODIFIERS:
+            raise CommandlineParsingError.from_block_unknown_modifier(block_header,
+                                                                      Exception('Unknown modifier "%s"' % name))
+
+        if name in as_dict:
+            raise CommandlineParsingError.from_block_modifier_declared_twice(name, block_header)
+
+        as_dict[name.replace('-', '_')] = result[1].strip()
+
+    return as_dict
+
+
+def tokenize(commandline: List[str]) -> List[Token]:
+    """
+    Splits commandline arguments into tokens. Arguments are stripped from whitespaces, the empty parts of arguments
+    around block markers are skipped (eg. "{@retry 3}:deploy" is BLOCK_BEGIN + WORD)
+
+    :raises CommandlineParsingError:
+    """
+
+    tokens = []
+    header: Optional[List[str]] = None  # parts of currently read block header
+    opened_at = 0
+
+    for position, argument in enumerate(commandline):
+        if header is None and TOKEN_BEGIN_BLOCK not in argument and TOKEN_BEGIN_BLOCK_ENDING not in argument:
+            tokens.append(Token(WORD, argument.strip(), position))
+            continue
+
+        cursor = 0
+        length = len(argument)
+
+        while cursor < length or (header is not None and cursor == 0):
+            # inside of a header: "{@retry 3 ... }"
+            if header is not None:
+                closing = argument.find(TOKEN_CLOSING_BLOCK, cursor)
+                part_end = closing if closing >= 0 else length
+
+                if _HEADER_INTERRUPTION.search(argument, cursor, part_end):
+                    raise CommandlineParsingError.from_block_closing_not_found(opened_at)
+
+                part = argument[cursor:part_end]
+
+                # whole arguments are quoted, so the values containing spaces are kept eg. in @error :notify "Failed"
+                if closing < 0:
+                    header.append(quote(part) if cursor == 0 else part)
+                    break
+
+                if part:
+                    header.append(part)
+
+                tokens.append(Token(BLOCK_BEGIN, TOKEN_BEGIN_BLOCK + ' '.join(header), opened_at))
+                header = None
+                cursor = closing + 1
+                continue
+
+            marker = _BLOCK_MARKER.search(argument, cursor)
+            word_end = marker.start() if marker else length
+            word = argument[cursor:word_end].strip()
+
+            if word:
+                tokens.append(Token(WORD, word, position))
+
+            if not marker:
+                break
+
+            if marker.group() == TOKEN_BLOCK_ENDING:
+                tokens.append(Token(BLOCK_END, TOKEN_BLOCK_ENDING, position))
+            else:
+                header = []
+                opened_at = position
+
+            cursor = marker.end()
+
+            # header opened at the end of an argument - continues in the next argument
+            if header is not None and cursor == length:
+                break
+
+    if header is not None:
+        raise CommandlineParsingError.from_block_closing_not_found(opened_at)
+
+    return tokens
+
+
+def parse_commandline(commandline: List[str]) -> List[Node]:
+    """
+    Parses commandline arguments into a syntax tree
+
+    Rules:
+        - Arguments starting with ":" or "@" are tasks, "@" alone is a list of arguments shared with next tasks
+        - A block closes the previous task, arguments after the block (not following a task) are not a part of any task
+        - Blocks cannot be nested
+
+    :raises CommandlineParsingError:
+    """
+
+    nodes: List[Node] = []
+    scope = nodes                           # nodes of the top level or of the body of a block
+    block: Optional[BlockNode] = None
+    arguments: Optional[List[str]] = None   # where to collect next arguments
+
+    for token in tokenize(commandline):
+        if token.kind == BLOCK_BEGIN:
+            if block is not None:
+                raise CommandlineParsingError.from_nested_blocks_not_allowed(TOKEN_BEGIN_BLOCK, block.header)
+
+            block = BlockNode(token.value, parse_block_header(token.value))
+            nodes.append(block)
+            scope = block.body
+            arguments = None
+
+        elif token.kind == BLOCK_END:
+            if block is None:
+                raise CommandlineParsingError.from_block_ending_without_block(TOKEN_BLOCK_ENDING, token.position)
+
+            block = None
+            scope = nodes
+            arguments = None
+
+        elif token.value[0:1] in (':', '@'):
+            node = SharedArgumentsNode() if token.value == TOKEN_SHARED_ARGUMENTS else TaskNode(token.value)
+            scope.append(node)
+            arguments = node.args
+
+        else:
+            if arguments is None:
+                node = ArgumentsNode()
+                scope.append(node)
+                arguments = node.args
+
+            arguments.append(token.value)
+
+    if block is not None:
+        raise CommandlineParsingError.from_block_ending_not_found(TOKEN_BLOCK_ENDING)
+
+    return nodes
+
+
+def to_argv(nodes: List[Node]) -> List[str]:
+    """Renders nodes back into commandline arguments"""
+
+    argv = []
+
+    for node in nodes:
+        argv += node.to_argv()
+
+    return argv
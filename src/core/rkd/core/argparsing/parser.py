@@ -3,14 +3,22 @@
 import os
 from typing import List
 from typing import Tuple
+from typing import Dict
+from typing import Callable
+from typing import Optional
+from weakref import WeakKeyDictionary, ref
 from argparse import ArgumentParser
 from argparse import RawTextHelpFormatter
 from shlex import split as split_argv
 from ..api.inputoutput import IO
 from ..api.contract import TaskDeclarationInterface
+from ..api.contract import TaskInterface
 from ..api.contract import ArgumentEnv
-from .blocks import parse_blocks, TOKEN_BLOCK_REFERENCE_OPENING, TOKEN_BLOCK_REFERENCE_CLOSING, ArgumentBlock
+from ..exception import CommandlineParsingError
+from .blocks import ArgumentBlock
+from .commandline import parse_commandline, Node, TaskNode, SharedArgumentsNode, BlockNode
 from .model import TaskArguments
+from .. import env as rkd_env
 
 
 class TraceableArgumentParser(ArgumentParser):
@@ -22,11 +30,24 @@ class TraceableArgumentParser(ArgumentParser):
     """
 
     traced_arguments: dict
+    _describe: Optional[Callable[[ArgumentParser], None]]
+
+    def __init__(self, *args, describe: Optional[Callable[[ArgumentParser], None]] = None, **kwargs):
+        """
+        :param describe: Fills the description in, when the help is going to be shown for the first time
+        """
 
-    def __init__(self, *args, **kwargs):
         self.traced_arguments = {}
+        self._describe = describe
         super().__init__(*args, **kwargs)
 
+    def format_help(self):
+        if self._describe is not None:
+            describe, self._describe = self._describe, None
+            describe(self)
+
+        return super().format_help()
+
     def add_argument(self, *args, **kwargs):
         self._trace_argument(args, kwargs)
         super().add_argument(*args, **kwargs)
@@ -47,78 +68,53 @@ class CommandlineParsingHelper(object):
     """
 
     io: IO
+    _parsers: 'WeakKeyDictionary[TaskInterface, Dict[str, TraceableArgumentParser]]' = WeakKeyDictionary()
 
     def __init__(self, io: IO):
         self.io = io
 
     def create_grouped_arguments(self, commandline: List[str]) -> List[ArgumentBlock]:
-        commandline, blocks = parse_blocks(commandline)
-
-        current_group_elements = []
-        current_task_name = 'rkd:initialize'
-        cursor = -1
-        max_cursor = len(commandline)
-
-        parsed_into_blocks = []
-
-        for part in commandline:
-            cursor += 1
-
-            # normalize - strip out spaces to be able to detect "-", "--" and ":" at the beginning of string
-            part = part.strip()
-
-            is_flag = part[0:1] == "-"
-            is_task = part[0:1] in (':', '@')
-            is_block = part.startswith(TOKEN_BLOCK_REFERENCE_OPENING) and part.endswith(TOKEN_BLOCK_REFERENCE_CLOSING)
-            previous_is_flag = commandline[cursor-1][0:1] == "-" if cursor >= 1 else False
-
-            # option name or flag
-            if is_flag:
-                current_group_elements.append(part)
-
-            elif is_block:
-                if part not in blocks:
-                    raise Exception('Parser error. Cannot find block "{}"'.format(part))
+        """
+        Groups commandline arguments into blocks of tasks with arguments. Each task outside of {@block} is a block
 
-                block: ArgumentBlock = blocks[part]
-                block = block.with_tasks_from_first_block(
-                    self.create_grouped_arguments(block.body)
-                )
+        Example:
+            :task1 --arg1 @ --shared {@retry 2} :task2 :task3 {/@}
+            -> [:task1 --arg1], retry 2: [:task2 --shared, :task3 --shared]
+        """
 
-                parsed_into_blocks.append(block)
+        return self.parse_modifiers_in_blocks(self._create_blocks(parse_commandline(commandline), []))
 
-            # option value
-            elif not is_flag and previous_is_flag and not is_task:
-                current_group_elements.append(part)
+    def _create_blocks(self, nodes: List[Node], outer_shared_args: List[str]) -> List[ArgumentBlock]:
+        """
+        :param outer_shared_args: Arguments of "@" placed before a block are appended to tasks of the block
+        """
 
-            # new task
-            elif is_task:
-                if current_task_name != 'rkd:initialize':
-                    task_arguments = [TaskArguments(current_task_name, current_group_elements)]
+        blocks = []
+        shared_args = []
 
-                    self.io.internal('Creating task with arguments {}'.format(task_arguments))
+        for node in nodes:
+            if isinstance(node, SharedArgumentsNode):
+                # "@" without any arguments is clearing previous "@" with arguments
+                shared_args = node.args
 
-                    # by default every task belongs to a block, even if the block for it was not defined
-                    parsed_into_blocks.append(ArgumentBlock([current_task_name] + current_group_elements)
-                                              .clone_with_tasks(task_arguments))
+            elif isinstance(node, BlockNode):
+                tasks = [task for block in self._create_blocks(node.body, shared_args + outer_shared_args)
+                         for task in block.tasks()]
 
-                current_task_name = part
-                current_group_elements = []
+                # cut off empty blocks (ex. ['@', '--type', 'human-rights'] -> [])
+                if tasks:
+                    blocks.append(node.create_argument_block().clone_with_tasks(tasks))
 
-            # is not an option (--some or -s) but a positional argument actually
             else:
-                current_group_elements.append(part)
+                name = node.name if isinstance(node, TaskNode) else 'rkd:initialize'
+                task_arguments = TaskArguments(name, node.args + shared_args + outer_shared_args)
 
-            if cursor + 1 == max_cursor:
-                task_arguments = [TaskArguments(current_task_name, current_group_elements)]
+                self.io.internal('Creating task with arguments {}'.format(task_arguments))
 
-                self.io.internal('End of commandline arguments, closing current task collection with {}'
-                                 .format(task_arguments))
+                # by default every task belongs to a block, even if the block for it was not defined
+                blocks.append(ArgumentBlock([name] + node.args).clone_with_tasks([task_arguments]))
 
-                parsed_into_blocks.append(ArgumentBlock([current_task_name] + current_group_elements)
-                                          .clone_with_tasks(task_arguments))
-
-        return self._parse_shared_arguments(self.parse_modifiers_in_blocks(parsed_into_blocks))
+        return blocks
 
     def parse_modifiers_in_blocks(self, blocks: List[ArgumentBlock]) -> List[ArgumentBlock]:
         """Parse list of tasks in blocks attributes eg.
@@ -128,61 +124,69 @@ class CommandlineParsingHelper(object):
             attributes = block.raw_attributes()
 
             if attributes['error']:
-                block.set_parsed_error_handler(
-                    self.create_grouped_arguments(split_argv(attributes['error']))[0].tasks())
+                block.set_parsed_error_handler(self._create_tasks(split_argv(attributes['error'])))
 
             if attributes['rescue']:
-                block.set_parsed_rescue(self.create_grouped_arguments(split_argv(attributes['rescue']))[0].tasks())
+                block.set_parsed_rescue(self._create_tasks(split_argv(attributes['rescue'])))
 
         return blocks
 
+    def _create_tasks(self, commandline: List[str]) -> List[TaskArguments]:
+        return [task for block in self.create_grouped_arguments(commandline) for task in block.tasks()]
+
     @classmethod
-    def _parse_shared_arguments(cls, blocks: List[ArgumentBlock]) -> List[ArgumentBlock]:
-        """Apply arguments from task "@" that is before a group of tasks
-           "@" without any arguments is clearing previous "@" with arguments
-        """
+    def parse(cls, declaration: TaskDeclarationInterface, args: list) -> Tuple[dict, dict]:
+        """Parses ArgumentParser arguments defined by tasks
+
+        Behavior:
+          - Adds RKD-specific arguments
+          - Includes task's specific arguments
+          - Formats description, including documentation of environment variables (only when help is shown)
 
-        global_group_elements = []
-        new_blocks = []
+        Parser is configured once per task and name, then reused - a task is usually parsed multiple times
+        (validation, then execution, in each task alias that uses it)
 
-        for block in blocks:
-            block_tasks = []
-            block_body = []
+        Returns:
+          Tuple of two dicts. First dict: arguments key=>value, Second dict: arguments definitions for advanced usae
+        """
 
-            for task in block.tasks():
-                task: TaskArguments
+        argparse = cls._get_parser(declaration)
 
-                if task.name() == '@':
-                    global_group_elements = task.args()
-                    # jump to next task - "@" task should not be finally on the list
-                    continue
+        return vars(argparse.parse_args(args)), argparse.traced_arguments
 
-                block_body.append([task.name()] + task.args() + global_group_elements)
-                block_tasks.append(task.with_args(task.args() + global_group_elements))
+    @classmethod
+    def _get_parser(cls, declaration: TaskDeclarationInterface) -> TraceableArgumentParser:
+        task = declaration.get_task_to_execute()
+        name = declaration.to_full_name()
 
-            # cut off empty blocks (ex. ['@', '--type', 'human-rights'] -> [] -> to be removed after propagation)
-            if not block_body:
-                continue
+        try:
+            parsers = cls._parsers.setdefault(task, {})
 
-            # replace all blocks with new blocks that contains the additional arguments
-            new_blocks.append(block.clone_with_tasks(block_tasks))
+        except TypeError:  # not hashable or not weak-referenceable task, cannot be cached
+            return cls._create_parser(declaration)
 
-        return new_blocks
+        if name not in parsers:
+            parsers[name] = cls._create_parser(declaration)
+
+        return parsers[name]
 
     @classmethod
-    def parse(cls, declaration: TaskDeclarationInterface, args: list) -> Tuple[dict, dict]:
-        """Parses ArgumentParser arguments defined by tasks
+    def _create_parser(cls, declaration: TaskDeclarationInterface) -> TraceableArgumentParser:
+        # cached parser cannot keep a reference to the task, else the task would never be released from the cache
+        name = declaration.to_full_name()
+        full_description = declaration.get_full_description()
+        task = declaration.get_task_to_execute()
 
-        Behavior:
-          - Adds RKD-specific arguments
-          - Includes task's specific arguments
-          - Formats description, including documentation of environment variables
+        try:
+            task_ref = ref(task)
 
-        Returns:
-          Tuple of two dicts. First dict: arguments key=>value, Second dict: arguments definitions for advanced usae
-        """
+        except TypeError:  # parser is not cached then
+            task_ref = lambda: task  # noqa: E731
 
-        argparse = TraceableArgumentParser(declaration.to_full_name(), formatter_class=RawTextHelpFormatter)
+        argparse = TraceableArgumentParser(
+            name, formatter_class=RawTextHelpFormatter,
+            describe=lambda parser: cls._describe(parser, name, full_description, task_ref())
+        )
 
         argparse.add_argument('--log-to-file', '-rf', help='Capture stdout and stderr to file')
         argparse.add_argument('--log-level', '-rl', help='Log level: debug,info,warning,error,fatal')
@@ -191,32 +195,49 @@ class CommandlineParsingHelper(object):
         argparse.add_argument('--silent', '-rs', help='Do not print logs, just task output', action='store_true')
         argparse.add_argument('--become', '-rb', help='Execute task as given user (requires sudo)', default='')
         argparse.add_argument('--task-workdir', '-rw', help='Set a working directory for this task', default='')
+        argparse.add_argument('--rerun', '-rr', help='Execute the task, even if it is up-to-date',
+                              action='store_true')
 
-        declaration.get_task_to_execute().configure_argparse(argparse)
-        cls.add_env_variables_to_argparse_description(argparse, declaration)
+        task.configure_argparse(argparse)
 
-        return vars(argparse.parse_args(args)), argparse.traced_arguments
+        return argparse
 
     @classmethod
     def add_env_variables_to_argparse_description(cls, argparse: ArgumentParser, task: TaskDeclarationInterface):
+        cls._describe(argparse, task.to_full_name(), task.get_full_description(), task.get_task_to_execute())
+
+    @staticmethod
+    def _describe(argparse: ArgumentParser, name: str, full_description: str, task: TaskInterface):
         if argparse.description is None:
             argparse.description = ""
 
-        argparse.description += task.get_full_description() + "\n"
+        argparse.description += full_description + "\n"
 
         # print all environment variables possible to use
-        argparse.description += "\nEnvironment variables for task \"%s\":\n" % task.to_full_name()
+        argparse.description += "\nEnvironment variables for task \"%s\":\n" % name
 
-        for env in task.get_task_to_execute().internal_normalized_get_declared_envs().values():
+        for env in task.internal_normalized_get_declared_envs().values():
             env: ArgumentEnv
 
             argparse.description += " - %s (default: %s)\n" % (
                 str(env.name), str(env.default)
             )
 
-        if not task.get_task_to_execute().get_declared_envs():
+        if not task.get_declared_envs():
             argparse.description += ' -- No environment variables declared -- '
 
+    @staticmethod
+    def _parse_jobs_number(source: str, value: str) -> int:
+        try:
+            jobs = int(value)
+        except ValueError:
+            raise CommandlineParsingError.from_invalid_jobs_number(source, value)
+
+        if jobs < 1:
+            raise CommandlineParsingError.from_invalid_jobs_number(source, value)
+
+        return jobs
+
     @staticmethod
     def preparse_args(args: List[str]):
         """
@@ -224,6 +245,7 @@ class CommandlineParsingHelper(object):
         Those arguments should decide about RKD core behavior on very early stage
 
         :param args:
+        :raises CommandlineParsingError: When number of jobs is not a positive number
         :return:
         """
 
@@ -238,13 +260,26 @@ class CommandlineParsingHelper(object):
 
         argparse = ArgumentParser(add_help=False)
         argparse.add_argument('--imports', '-ri')
+        argparse.add_argument('--jobs', '-rj')
+        argparse.add_argument('--validate-all', action='store_true')
+        argparse.add_argument('--plan-out')
+        argparse.add_argument('--plan-in')
 
         parsed = vars(argparse.parse_known_args(args=limited_args)[0])
 
+        if parsed['jobs'] is not None:
+            jobs = CommandlineParsingHelper._parse_jobs_number('--jobs switch', parsed['jobs'])
+        else:
+            jobs = CommandlineParsingHelper._parse_jobs_number('RKD_JOBS environment variable', rkd_env.jobs())
+
         return {
             'imports': list(filter(None,
                                    os.getenv('RKD_IMPORTS', parsed['imports'] if parsed['imports'] else '').split(':')
-                                   ))
+                                   )),
+            'jobs': jobs,
+            'validate_all': parsed['validate_all'],
+            'plan_out': parsed['plan_out'],
+            'plan_in': parsed['plan_in']
         }
 
     @staticmethod
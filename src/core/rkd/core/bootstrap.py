@@ -10,34 +10,47 @@ Only this layer can use sys.exit() call to pass exit code to the operating syste
 
 import sys
 import os
-from dotenv import load_dotenv
+from typing import Optional
 from .execution.results import ProgressObserver
 from .argparsing.parser import CommandlineParsingHelper
 from .context import ContextFactory, ApplicationContext
+from .context_cache import ContextCache
+from .task_manifest import TaskManifest
 from .resolver import TaskResolver
 from .validator import TaskDeclarationValidator
 from .execution.executor import OneByOneTaskExecutor
-from .exception import TaskNotFoundException, ParsingException, YamlParsingException, CommandlineParsingError
+from .execution.executor import ParallelTaskExecutor
+from .execution.plan import ExecutionPlan
+from .exception import TaskNotFoundException, ParsingException, YamlParsingException, CommandlineParsingError, \
+    TaskDependencyException, DeclarationException, InvalidExecutionPlanException
 from .api.inputoutput import SystemIO
 from .api.inputoutput import UnbufferedStdout
 from .aliasgroups import parse_alias_groups_from_env
 from .packaging import find_resource_file
+from .startup_profile import profiler
 from . import env
 
 
 class RiotKitDoApplication(object):
     _ctx: ApplicationContext
     _tasks_to_execute = []
+    _context_cache: Optional[ContextCache]
+
+    def __init__(self, context_cache: Optional[ContextCache] = None):
+        self._context_cache = context_cache
 
     @staticmethod
     def load_environment():
-        paths = env.rkd_paths()
+        env_files = [path + '/.env' for path in env.rkd_paths()] + [os.getcwd() + '/.env']
+        env_files = [path for path in env_files if os.path.isfile(path)]
+
+        if not env_files:
+            return
 
-        for path in paths:
-            if os.path.isfile(path + '/.env'):
-                load_dotenv(path + '/.env')
+        from dotenv import load_dotenv
 
-        load_dotenv(dotenv_path=os.getcwd() + '/.env')
+        for path in env_files:
+            load_dotenv(dotenv_path=path)
 
     @staticmethod
     def make_stdout_unbuffered():
@@ -50,7 +63,16 @@ class RiotKitDoApplication(object):
         sys.path = [os.getcwd() + '/src'] + sys.path
 
     def main(self, argv: list):
-        if not CommandlineParsingHelper.has_any_task(argv) and not CommandlineParsingHelper.was_help_used(argv):
+        # preparse arguments that are before tasks
+        try:
+            preparsed_args = CommandlineParsingHelper.preparse_args(argv)
+
+        except CommandlineParsingError as err:
+            SystemIO().error_msg(str(err))
+            sys.exit(1)
+
+        if not CommandlineParsingHelper.has_any_task(argv) and not CommandlineParsingHelper.was_help_used(argv) \
+                and not preparsed_args['validate_all'] and not preparsed_args['plan_in']:
             self.print_banner_and_exit()
 
         # system wide IO instance with defaults, the :init task should override those settings
@@ -58,14 +80,20 @@ class RiotKitDoApplication(object):
         io.silent = env.system_log_level() not in ['debug', 'internal']
         io.set_log_level(env.system_log_level())
 
-        cmdline_parser = CommandlineParsingHelper(io)
+        if preparsed_args['plan_in'] and CommandlineParsingHelper.has_any_task(argv):
+            io.error_msg('--plan-in cannot be used together with tasks, the tasks are already in the plan')
+            sys.exit(1)
 
-        # preparse arguments that are before tasks
-        preparsed_args = CommandlineParsingHelper.preparse_args(argv)
+        cmdline_parser = CommandlineParsingHelper(io)
 
         # load context of components - all tasks, plugins etc.
         try:
-            self._ctx = ContextFactory(io).create_unified_context(additional_imports=preparsed_args['imports'])
+            cache = self._context_cache if self._context_cache else ContextCache(env.context_cache_dir())
+
+            with profiler.phase('context'):
+                self._ctx = ContextFactory(io, cache=cache,
+                                           manifest=TaskManifest(env.task_manifest_path()))\
+                    .create_unified_context(additional_imports=preparsed_args['imports'])
 
         except ParsingException as e:
             io.silent = False
@@ -78,27 +106,102 @@ class RiotKitDoApplication(object):
             io.error_msg('Cannot import tasks/module from one of makefile.yaml files. Details: {}'.format(str(e)))
             sys.exit(1)
 
+        except TaskDependencyException as e:
+            io.silent = False
+            io.error_msg('Invalid dependencies between tasks. Details: {}'.format(str(e)))
+            sys.exit(1)
+
+        # task aliases are resolved on first use, unless all of them should be checked
+        if preparsed_args['validate_all']:
+            self.validate_all_and_exit_if_no_tasks(io, argv)
+
         observer = ProgressObserver(io)
         task_resolver = TaskResolver(self._ctx, parse_alias_groups_from_env(os.getenv('RKD_ALIAS_GROUPS', '')))
-        executor = OneByOneTaskExecutor(self._ctx, observer)
 
-        # iterate over each task, parse commandline arguments
+        if preparsed_args['jobs'] > 1:
+            executor = ParallelTaskExecutor(self._ctx, observer, jobs=preparsed_args['jobs'])
+        else:
+            executor = OneByOneTaskExecutor(self._ctx, observer)
+
         try:
-            requested_tasks = cmdline_parser.create_grouped_arguments([':init'] + argv[1:])
+            # take a plan resolved earlier (eg. on CI)
+            if preparsed_args['plan_in']:
+                with profiler.phase('loading execution plan'):
+                    plan = ExecutionPlan.load(preparsed_args['plan_in'], self._ctx)
+
+            # or iterate over each task, parse commandline arguments, then resolve tasks into a plan
+            else:
+                with profiler.phase('commandline parsing'):
+                    requested_tasks = cmdline_parser.create_grouped_arguments([':init'] + argv[1:])
+
+                with profiler.phase('resolving tasks'):
+                    plan = task_resolver.plan(requested_tasks)
+
+            # validate all tasks
+            with profiler.phase('validating tasks'):
+                plan.walk(TaskDeclarationValidator.assert_declaration_is_valid)
+
         except CommandlineParsingError as err:
             io.error_msg(str(err))
             sys.exit(1)
 
-        # validate all tasks
-        task_resolver.resolve(requested_tasks, TaskDeclarationValidator.assert_declaration_is_valid)
+        except TaskDependencyException as e:
+            io.silent = False
+            io.error_msg('Invalid dependencies between tasks. Details: {}'.format(str(e)))
+            sys.exit(1)
+
+        except InvalidExecutionPlanException as e:
+            io.silent = False
+            io.error_msg('Cannot use execution plan. Details: {}'.format(str(e)))
+            sys.exit(1)
+
+        if preparsed_args['plan_out']:
+            self.write_plan_and_exit(io, plan, preparsed_args['plan_out'])
+
+        # startup is finished, when tasks are going to be executed
+        profiler.finish()
 
         # execute all tasks
-        task_resolver.resolve(requested_tasks, executor.execute)
+        try:
+            executor.execute_pipeline(task_resolver, plan)
+        finally:
+            executor.shutdown()
 
         executor.get_observer().execution_finished()
 
         sys.exit(1 if executor.get_observer().is_at_least_one_task_failing() else 0)
 
+    def validate_all_and_exit_if_no_tasks(self, io: SystemIO, argv: list):
+        try:
+            with profiler.phase('validating all aliases'):
+                self._ctx.validate_all()
+
+        except DeclarationException as e:
+            io.silent = False
+            io.error_msg(str(e))
+            sys.exit(1)
+
+        if not CommandlineParsingHelper.has_any_task(argv):
+            profiler.finish()
+            io.silent = False
+            io.success_msg('All tasks and task aliases are valid')
+            sys.exit(0)
+
+    @staticmethod
+    def write_plan_and_exit(io: SystemIO, plan: ExecutionPlan, path: str):
+        profiler.finish()
+        io.silent = False
+
+        try:
+            plan.dump(path)
+
+        except OSError as e:
+            io.error_msg('Cannot write execution plan to "{}". Details: {}'.format(path, str(e)))
+            sys.exit(1)
+
+        io.success_msg('Execution plan of {} tasks written to "{}"'.format(len(plan.tasks()), path))
+        sys.exit(0)
+
     @staticmethod
     def print_banner_and_exit():
         with open(find_resource_file('banner.txt'), 'rb') as banner_file:
@@ -107,11 +210,19 @@ class RiotKitDoApplication(object):
         sys.exit(0)
 
 
-def main():
-    app = RiotKitDoApplication()
+def main(context_cache: Optional[ContextCache] = None):
+    """
+    :param context_cache: Allows to keep the context in memory, when running inside rkd.core.daemon
+    """
+
+    profiler.enable(env.startup_profile())
+
+    app = RiotKitDoApplication(context_cache=context_cache)
     app.make_stdout_unbuffered()
     app.prepend_development_paths()
-    app.load_environment()
+
+    with profiler.phase('loading environment files'):
+        app.load_environment()
 
     try:
         app.main(argv=sys.argv)
@@ -0,0 +1,174 @@
+"""
+Thin client
+===========
+
+Entrypoint of "rkd" command. When a daemon (rkd.core.daemon) is listening on RKD_DAEMON_SOCKET, then the invocation
+is forwarded to it: commandline arguments, environment, working directory and standard descriptors (so the terminal).
+Signals received by the client (eg. CTRL+C) are forwarded to the process executing the invocation.
+
+When the daemon is not running, then RKD is bootstrapped in the current process as usual.
+
+Only the standard library is imported there - the whole point of the client is to start fast.
+"""
+
+import os
+import sys
+import json
+import array
+import socket
+import signal
+import struct
+from typing import List, Optional
+from . import env
+
+FRAME_HEADER = struct.Struct('>Q')
+READ_SIZE = 1024 * 64
+STANDARD_DESCRIPTORS = [0, 1, 2]
+FORWARDED_SIGNALS = [signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT]
+
+
+class MessageChannel(object):
+    """
+    Length-prefixed JSON messages over a Unix socket, file descriptors can be attached to a message
+    """
+
+    sock: socket.socket
+    fds: List[int]
+    _buffer: bytes
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.fds = []
+        self._buffer = b''
+
+    def send(self, message: dict, fds: List[int] = None) -> None:
+        payload = json.dumps(message).encode('utf-8')
+        data = FRAME_HEADER.pack(len(payload)) + payload
+
+        if fds:
+            sent = self.sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))])
+            data = data[sent:]
+
+        self.sock.sendall(data)
+
+    def receive(self) -> Optional[dict]:
+        """
+        Waits for a complete message. Received file descriptors are collected in "fds" attribute
+
+        :return: None, when the connection was closed
+        """
+
+        int_size = array.array('i').itemsize
+
+        while True:
+            if len(self._buffer) >= FRAME_HEADER.size:
+                end = FRAME_HEADER.size + FRAME_HEADER.unpack_from(self._buffer)[0]
+
+                if len(self._buffer) >= end:
+                    payload = self._buffer[FRAME_HEADER.size:end]
+                    self._buffer = self._buffer[end:]
+
+                    return json.loads(payload.decode('utf-8'))
+
+            chunk, ancillary, _, _ = self.sock.recvmsg(
+                READ_SIZE, socket.CMSG_SPACE(len(STANDARD_DESCRIPTORS) * int_size),
+                getattr(socket, 'MSG_CMSG_CLOEXEC', 0)
+            )
+
+            for level, kind, data in ancillary:
+                if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                    self.fds += list(array.array('i', data[:len(data) - (len(data) % int_size)]))
+
+            if not chunk:
+                return None
+
+            self._buffer += chunk
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+def forward_to_daemon(socket_path: str, argv: List[str]) -> Optional[int]:
+    """
+    Executes the invocation in the daemon
+
+    :return: Exit code, or None when the daemon is not available
+    """
+
+    if not socket_path or not os.path.exists(socket_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.connect(socket_path)
+
+    except OSError:
+        sock.close()
+        return None
+
+    channel = MessageChannel(sock)
+    previous_handlers = {}
+
+    try:
+        channel.send({'argv': argv, 'env': dict(os.environ), 'cwd': os.getcwd()}, fds=_get_standard_descriptors())
+        started = channel.receive()
+
+        if not started or 'pid' not in started:
+            if started:
+                print('RKD daemon refused the invocation: ' + str(started.get('error')), file=sys.stderr)
+
+            return None
+
+        def forward_signal(signum, frame):
+            try:
+                os.killpg(started['pid'], signum)
+            except ProcessLookupError:
+                pass
+
+        for signum in FORWARDED_SIGNALS:
+            previous_handlers[signum] = signal.signal(signum, forward_signal)
+
+        finished = channel.receive()
+
+        return finished['exit_code'] if finished else 1
+
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
+        channel.close()
+
+
+def _get_standard_descriptors() -> List[int]:
+    """Closed standard descriptors are replaced with /dev/null"""
+
+    descriptors = []
+
+    for fd in STANDARD_DESCRIPTORS:
+        try:
+            os.fstat(fd)
+            descriptors.append(fd)
+
+        except OSError:
+            descriptors.append(os.open(os.devnull, os.O_RDWR))
+
+    return descriptors
+
+
+def main():
+    if sys.argv[1:] == ['--server']:
+        from .daemon import serve
+        sys.exit(serve(env.daemon_socket_path()))
+
+    exit_code = forward_to_daemon(env.daemon_socket_path(), sys.argv)
+
+    if exit_code is None:
+        from .bootstrap import main as bootstrap_main
+        return bootstrap_main()
+
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,12 @@
 import os
 import sys
 import time
-from copy import deepcopy
+from copy import copy
+from threading import RLock
+from concurrent.futures import ThreadPoolExecutor
+from collections import ChainMap
 from datetime import datetime
 from typing import Dict, List, Union, Tuple, Optional
-from importlib.machinery import SourceFileLoader
 from traceback import print_exc
 from uuid import uuid4
 from . import env
@@ -24,18 +26,40 @@ from .exception import ContextFileNotFoundException
 from .exception import PythonContextFileNotFoundException
 from .exception import NotImportedClassException
 from .exception import ContextException
+from .exception import TaskDependencyException
+from .exception import DeclarationException
+from .exception import CommandlineParsingError
 from .packaging import get_user_site_packages
 from .yaml_context import YamlSyntaxInterpreter
 from .yaml_parser import YamlFileLoader
+from .context_cache import ContextCache, ContextSources, find_module_files
+from .task_manifest import TaskManifest
+from .makefile_loader import load_makefile
+from .startup_profile import profiler
 
 
 RKD_CORE_PATH = os.path.dirname(os.path.realpath(__file__))
+MAKEFILE_NAMES = ['makefile.py', 'makefile.yaml', 'makefile.yml']
+
+# makefile.py files are extending sys.path, and could import the same modules
+MAKEFILE_IMPORT_LOCK = RLock()
 
 
 def generate_id() -> str:
     return str(time.time_ns()) + '-' + str(uuid4())
 
 
+def flatten_layers(layers: ChainMap) -> dict:
+    """Merges layers into a single dict in linear time (lookups through all layers would be done for each key)"""
+
+    flat = {}
+
+    for layer in reversed(layers.maps):
+        flat.update(layer)
+
+    return flat
+
+
 class ApplicationContext(ContextInterface):
     """
     Application context - collects all tasks together
@@ -47,9 +71,11 @@ class ApplicationContext(ContextInterface):
     ContextFactory() is controlling the order.
     """
 
-    _imported_tasks: Dict[str, TaskDeclaration]
-    _task_aliases: Dict[str, TaskAliasDeclaration]
-    _compiled: Dict[str, Union[TaskDeclaration, GroupDeclaration]]
+    _imported_tasks: ChainMap  # layers of Dict[str, TaskDeclaration], see merge()
+    _task_aliases: ChainMap    # layers of Dict[str, TaskAliasDeclaration]
+    _compiled: Dict[str, Union[TaskDeclaration, GroupDeclaration]]  # aliases are added, when resolved on first use
+    _shadowed_tasks: Dict[str, TaskDeclaration]  # tasks overridden by an alias of the same name, that can wrap them
+    _resolving: List[str]  # aliases that are being resolved at the moment - to detect aliases including each other
     _created_at: datetime
     _directory: str
     _subprojects: List[str]
@@ -66,8 +92,8 @@ class ApplicationContext(ContextInterface):
                  workdir: str,
                  project_prefix: str):
 
-        self._imported_tasks = {}
-        self._task_aliases = {}
+        self._imported_tasks = ChainMap()
+        self._task_aliases = ChainMap()
         self._created_at = datetime.now()
         self._directory = directory
         self.directories = [directory] if directory else []
@@ -88,42 +114,188 @@ class ApplicationContext(ContextInterface):
 
     @classmethod
     def merge(cls, primary: 'ApplicationContext', subctx: 'ApplicationContext') -> 'ApplicationContext':
-        """ Add one context to other context. Produces immutable new context. """
+        """
+        Add one context to other context. Produces a new context, the primary context stays unchanged.
 
-        context: ApplicationContext
-        primary = deepcopy(primary)
+        Declarations are not copied - the new context shares all layers of the primary context
+        and writes declarations of the subctx into its own, new layer (copy-on-write)
+        """
 
-        for name, component in subctx._imported_tasks.items():
-            primary._add_task(component, parent_ctx=subctx)
+        merged = copy(primary)
+        merged._imported_tasks = primary._imported_tasks.new_child()
+        merged._task_aliases = primary._task_aliases.new_child()
+        merged.directories = primary.directories + subctx.directories
 
-        for name, task in subctx._task_aliases.items():
-            primary._add_pipeline(task)
+        # tasks were already attached to the subproject, when they were added to the subctx
+        merged._imported_tasks.maps[0].update(subctx._imported_tasks)
 
-        primary.directories += subctx.directories
+        for name, task in subctx._task_aliases.items():
+            merged._add_pipeline(task)
 
-        return primary
+        return merged
 
     def compile(self) -> None:
-        """ Resolve all objects in the context. Should be called only, when all contexts were merged """
+        """
+        Resolve all objects in the context. Should be called only, when all contexts were merged
+
+        Task aliases are resolved on first use (see find_task_by_name()), so the startup does not depend
+        on how many aliases are defined. Use validate_all() to resolve all of them at once
+        """
 
-        self._compiled = self._imported_tasks
+        self._compiled = flatten_layers(self._imported_tasks)
+        self._imported_tasks = ChainMap(self._compiled)
+        self._task_aliases = ChainMap(flatten_layers(self._task_aliases))
+        self._resolving = []
+        self._shadowed_tasks = {}
 
         for task in self._compiled:
             self.io.internal(f'Defined task {task} by context compilation')
 
-        for name, details in self._task_aliases.items():
+        for name in self._task_aliases:
             self.io.internal(f'Defined task alias {name}')
-            self._compiled[name] = self._resolve_pipeline(name, details)
+
+            # alias overrides a task of the same name, but still can execute it, eg. ":build" -> [":build", "--x"]
+            if name in self._compiled:
+                self._shadowed_tasks[name] = self._compiled.pop(name)
+
+        self._validate_dependencies(list(self._compiled))
+
+    def validate_all(self) -> None:
+        """
+        Resolves all task aliases, that otherwise would be resolved on first use. Checks every alias at once - eg. on CI
+
+        :raises DeclarationException: Lists all invalid aliases
+        """
+
+        errors = []
+
+        for name in self._task_aliases:
+            try:
+                self.find_task_by_name(name)
+
+            except (ContextException, CommandlineParsingError) as exc:
+                errors.append(f'{name}: {exc}')
+
+        if errors:
+            raise DeclarationException('Invalid task aliases:\n  ' + '\n  '.join(errors))
+
+    def _resolve_alias(self, name: str) -> GroupDeclaration:
+        """
+        Resolves task alias into a GroupDeclaration, then keeps it for next calls
+
+        :raises TaskDependencyException: When aliases are including each other or dependencies are invalid
+        """
+
+        if name in self._resolving:
+            raise TaskDependencyException.from_cycle(self._resolving[self._resolving.index(name):] + [name])
+
+        self._resolving.append(name)
+
+        try:
+            self._compiled[name] = self._resolve_pipeline(name, self._task_aliases[name])
+            self._validate_dependencies([name])
+
+        except Exception:
+            self._compiled.pop(name, None)
+            raise
+
+        finally:
+            self._resolving.pop()
+
+        return self._compiled[name]
+
+    def _validate_dependencies(self, names: List[str]) -> None:
+        """
+        Checks that all declared dependencies of given tasks exist and that there are no cycles between tasks
+
+        :raises TaskDependencyException:
+        """
+
+        visited = {}  # name -> True when fully processed, False when still on the stack
+
+        def visit(name: str, path: List[str]):
+            if visited.get(name) is True:
+                return
+
+            if visited.get(name) is False:
+                raise TaskDependencyException.from_cycle(path[path.index(name):] + [name])
+
+            visited[name] = False
+
+            for dependency_name in self._get_dependency_graph_edges(self.find_task_by_name(name)):
+                visit(dependency_name, path + [name])
+
+            visited[name] = True
+
+        for task_name in names:
+            visit(task_name, [])
+
+    def _get_dependency_graph_edges(self, declaration: Union[TaskDeclaration, GroupDeclaration]) -> List[str]:
+        """Names of tasks that have to be executed, when given task (or group) is executed"""
+
+        if isinstance(declaration, GroupDeclaration):
+            edges = []
+
+            for inner_declaration in self._resolve_recursively(declaration):
+                # alias inside a subproject can point to a global task, which is not compiled under a prefixed name.
+                # Task shadowed by the alias is not a separate node, only its dependencies are
+                if self._is_defined(inner_declaration.to_full_name()) \
+                        and inner_declaration.to_full_name() != declaration.get_name():
+                    edges.append(inner_declaration.to_full_name())
+
+                edges += self.get_dependencies_of(inner_declaration)
+
+            return list(dict.fromkeys(edges))
+
+        return self.get_dependencies_of(declaration)
+
+    def get_dependencies_of(self, declaration: TaskDeclaration) -> List[str]:
+        """
+        Resolves full names of tasks, that given task depends on.
+        Inside a subproject a dependency is searched first in the subproject, then globally
+
+        :raises TaskDependencyException: When dependency does not exist
+        """
+
+        resolved = []
+
+        for name in declaration.get_dependencies():
+            candidates = [name]
+
+            if declaration.project_name and not name.startswith(declaration.project_name + ':'):
+                candidates = [declaration.project_name + name, name]
+
+            found = [candidate for candidate in candidates if self._is_defined(candidate)]
+
+            if not found:
+                raise TaskDependencyException.from_dependency_not_found(declaration.to_full_name(), name)
+
+            resolved.append(found[0])
+
+        return resolved
+
+    def _is_defined(self, name: str) -> bool:
+        return name in self._compiled or name in self._task_aliases
 
     def find_task_by_name(self, name: str) -> Union[TaskDeclaration, GroupDeclaration]:
         try:
             return self._compiled[name]
         except KeyError:
-            raise TaskNotFoundException(('Task "%s" is not defined. Check if it is defined, or' +
-                                         ' imported, or if the spelling is correct.') % name)
+            pass
+
+        if name in self._task_aliases:
+            return self._resolve_alias(name)
+
+        raise TaskNotFoundException(('Task "%s" is not defined. Check if it is defined, or' +
+                                     ' imported, or if the spelling is correct.') % name)
 
     def find_all_tasks(self) -> Dict[str, Union[TaskDeclaration, GroupDeclaration]]:
-        return self._compiled
+        """Resolves all task aliases, use find_task_by_name() when looking for a single task"""
+
+        aliases = {name: self.find_task_by_name(name) for name in self._task_aliases}
+        tasks = {name: declaration for name, declaration in self._compiled.items() if name not in aliases}
+
+        return {**tasks, **aliases}
 
     def get_creation_date(self) -> datetime:
         return self._created_at
@@ -174,8 +346,11 @@ class ApplicationContext(ContextInterface):
 
         for block in args:
             for argument_group in block.tasks():
-                # single TaskDeclaration
-                resolved_declarations = [self.find_task_by_name(argument_group.name())]
+                # single TaskDeclaration (alias can wrap a task of its own name)
+                if argument_group.name() == name and name in self._shadowed_tasks:
+                    resolved_declarations = [self._shadowed_tasks[name]]
+                else:
+                    resolved_declarations = [self.find_task_by_name(argument_group.name())]
 
                 # or GroupDeclaration (multiple)
                 if isinstance(resolved_declarations[0], GroupDeclaration):
@@ -185,7 +360,8 @@ class ApplicationContext(ContextInterface):
                     resolved_declaration: TaskDeclaration
 
                     # preserve original task env, and append alias env in priority
-                    merged_env = resolved_declaration.get_env()
+                    # (env is shared between copies of a declaration, so it cannot be modified in place)
+                    merged_env = dict(resolved_declaration.get_env())
                     merged_env.update(pipeline.get_env())
 
                     new_task = resolved_declaration \
@@ -236,8 +412,21 @@ class ContextFactory(object):
     Takes responsibility of loading all tasks defined in USER PROJECT, USER HOME and GLOBALLY
     """
 
-    def __init__(self, io: SystemIO):
+    _cache: Optional[ContextCache]
+    _sources: ContextSources
+    _manifest: Optional[TaskManifest]
+
+    def __init__(self, io: SystemIO, cache: Optional[ContextCache] = None, manifest: Optional[TaskManifest] = None):
         self._io = io
+        self._cache = cache
+        self._sources = ContextSources()
+        self._manifest = manifest if manifest and manifest.is_enabled() else None
+
+    def _observe_makefiles(self, path: str) -> None:
+        """Makefiles could appear later - the cached context would be invalid then"""
+
+        for filename in MAKEFILE_NAMES:
+            self._sources.observe(path + '/' + filename)
 
     def _load_context_from_directory(self, path: str, workdir: Optional[str] = None,
                                      subproject: str = None) -> List[ApplicationContext]:
@@ -246,6 +435,7 @@ class ContextFactory(object):
             raise Exception('Path "%s" not found' % path)
 
         contexts = []
+        self._observe_makefiles(path)
 
         if os.path.isfile(path + '/makefile.py'):
             contexts += self._expand_contexts(self._load_from_py(path,
@@ -279,32 +469,66 @@ class ContextFactory(object):
 
         self._io.internal(f'Expanding contexts for {ctx}')
 
-        if ctx.subprojects:
-            for subdir_path in ctx.subprojects:
-                workdir_path = subdir_path
+        if not ctx.subprojects:
+            return contexts
+
+        subprojects = [self._locate_subproject(ctx, subdir_path) for subdir_path in ctx.subprojects]
+        workers = min(len(subprojects), env.subproject_loading_workers())
+
+        if workers <= 1:
+            loaded = [self._load_subproject(*subproject) for subproject in subprojects]
+        else:
+            load = profiler.inherit(lambda subproject: self._load_subproject(*subproject))
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rkd-subproject') as executor:
+                loaded = list(executor.map(load, subprojects))
+
+        # merged always in order of declaration, no matter which subproject was loaded first
+        for subproject_contexts in loaded:
+            contexts += subproject_contexts
 
-                if ctx.workdir:
-                    workdir_path = ctx.workdir + '/' + workdir_path
+        return contexts
+
+    def _locate_subproject(self, ctx: ApplicationContext, subdir_path: str) -> Tuple[str, str, str]:
+        """
+        :return: Tuple of (path to .rkd directory, workdir, project prefix)
+        """
 
-                rkd_path = workdir_path + '/.rkd'
+        workdir_path = subdir_path
 
-                self._io.internal('Trying subproject at {path}'.format(path=rkd_path))
+        if ctx.workdir:
+            workdir_path = ctx.workdir + '/' + workdir_path
 
-                if not os.path.isdir(rkd_path):
-                    raise Exception(
-                        f'Subproject directory {rkd_path} does not exist or does not contain ".rkd" directory'
-                    )
+        rkd_path = workdir_path + '/.rkd'
+
+        self._io.internal('Trying subproject at {path}'.format(path=rkd_path))
+
+        if not os.path.isdir(rkd_path):
+            raise Exception(
+                f'Subproject directory {rkd_path} does not exist or does not contain ".rkd" directory'
+            )
 
-                project_prefix = parse_path_into_subproject_prefix(subdir_path)
+        project_prefix = parse_path_into_subproject_prefix(subdir_path)
 
-                if ctx.project_prefix:
-                    project_prefix = ctx.project_prefix + project_prefix
+        if ctx.project_prefix:
+            project_prefix = ctx.project_prefix + project_prefix
 
-                contexts += self._load_context_from_directory(
-                    path=rkd_path,
-                    workdir=workdir_path,
-                    subproject=project_prefix
-                )
+        return rkd_path, workdir_path, project_prefix
+
+    def _load_subproject(self, rkd_path: str, workdir_path: str, project_prefix: str) -> List[ApplicationContext]:
+        started_at = time.perf_counter()
+
+        with profiler.phase(f'subproject {project_prefix}'):
+            contexts = self._load_context_from_directory(
+                path=rkd_path,
+                workdir=workdir_path,
+                subproject=project_prefix
+            )
+
+        self._io.internal(
+            f'Subproject {project_prefix} loaded in {(time.perf_counter() - started_at) * 1000:.1f}ms '
+            f'(including its subprojects), directory={rkd_path}'
+        )
 
         return contexts
 
@@ -312,7 +536,7 @@ class ContextFactory(object):
         makefile_path = path + '/' + filename
 
         with open(makefile_path, 'rb') as handle:
-            imported, tasks, subprojects = YamlSyntaxInterpreter(self._io, YamlFileLoader([])).parse(
+            imported, tasks, subprojects = YamlSyntaxInterpreter(self._io, YamlFileLoader([]), self._sources, self._manifest).parse(
                 handle.read().decode('utf-8'), path, makefile_path
             )
 
@@ -333,14 +557,9 @@ class ContextFactory(object):
             raise PythonContextFileNotFoundException(makefile_path)
 
         try:
-            sys.path.append(path)
-
-            # extra SourceFileLoader usage is due to Python bug: https://bugs.python.org/issue20178
-            # noinspection PyArgumentList
-            SourceFileLoader("makefile", RKD_CORE_PATH + '/misc/internal/empty/makefile.py').load_module()
-
-            # noinspection PyArgumentList
-            makefile = SourceFileLoader("makefile", makefile_path).load_module()
+            with MAKEFILE_IMPORT_LOCK:
+                self._sources.add_python_path(path)
+                makefile = load_makefile(makefile_path)
 
         except ImportError as e:
             print_exc()
@@ -385,7 +604,7 @@ class ContextFactory(object):
             f'Building context from shell --imports={additional_imports}'
         )
 
-        declarations = SyntaxParsing.parse_imports_by_list_of_classes(additional_imports)
+        declarations = SyntaxParsing.parse_imports_by_list_of_classes(additional_imports, self._manifest)
         ctx = ApplicationContext(declarations, [], '', subprojects=[], workdir='', project_prefix='')
 
         return ctx
@@ -414,19 +633,37 @@ class ContextFactory(object):
 
         paths += env.rkd_paths()
 
+        # calculated before the export - the exported RKD_PATH is derived from the environment
+        cache_key = self._cache.calculate_key(paths, additional_imports) \
+            if self._cache and self._cache.is_enabled() else None
+
         # export for usage inside in makefiles
         os.environ['RKD_PATH'] = ":".join(paths)
 
+        if cache_key:
+            with profiler.phase('loading from cache'):
+                cached_ctx = self._cache.load(cache_key)
+
+            if cached_ctx:
+                self._io.internal('Context loaded from cache')
+                cached_ctx.io = self._io
+
+                return cached_ctx
+
+        self._sources = ContextSources()
+        modules_before_loading = set(sys.modules)
         ctx = ApplicationContext([], [], '', subprojects=[], workdir='', project_prefix='')
         ctx.io = self._io
 
         for path in paths:
             # not all paths could exist, we consider this, we look where it is possible
             if not os.path.isdir(path):
+                self._observe_makefiles(path)
                 continue
 
             try:
-                contexts = self._load_context_from_directory(path)
+                with profiler.phase(f'path {path}'):
+                    contexts = self._load_context_from_directory(path)
             except ContextFileNotFoundException:
                 continue
 
@@ -439,10 +676,33 @@ class ContextFactory(object):
 
         # imports added by eg. environment variable
         if additional_imports:
-            ctx = ApplicationContext.merge(ctx, self._load_context_from_list_of_imports(additional_imports))
+            with profiler.phase('imports from commandline'):
+                ctx = ApplicationContext.merge(ctx, self._load_context_from_list_of_imports(additional_imports))
 
         ctx.io = self._io
-        ctx.compile()
+
+        with profiler.phase('compilation'):
+            ctx.compile()
+
+        # tasks imported for the first time are declared lazily not earlier than in next invocation,
+        # then the context is worth caching
+        if self._manifest and self._manifest.save():
+            self._io.internal('Task manifest updated')
+            return ctx
+
+        if self._manifest:
+            for path in self._manifest.get_used_files():
+                self._sources.observe(path)
+
+        # plugins and helper modules imported by makefiles - a changed module could declare different tasks
+        for path in find_module_files(set(sys.modules) - modules_before_loading):
+            self._sources.observe(path)
+
+        with profiler.phase('storing in cache'):
+            stored = cache_key and self._cache.store(cache_key, ctx, self._sources)
+
+        if stored:
+            self._io.internal(f'Context stored in cache, {len(self._sources.get_files())} files observed')
 
         return ctx
 
@@ -0,0 +1,395 @@
+"""
+Compiled context cache
+======================
+
+Loading of the context (executing makefile.py files, parsing and validating makefile.yaml files, merging subprojects)
+is done on every RKD invocation. A compiled context is persisted, so the next invocation can skip the loading phase.
+
+Cache entry is valid as long as:
+  - all files that contributed to the context (makefiles, env files, modules imported during loading - eg. plugins
+    and modules placed next to makefile.py) did not change (mtime + size, content hash as a fallback for touched,
+    but not changed files)
+  - makefiles, that did not exist before, still do not exist
+  - environment variables, working directory, RKD_PATH, RKD_IMPORTS, Python and RKD version are the same
+    (declarations are capturing the whole environment during loading, so any changed variable makes the context
+    outdated - that's why the cache is optional, enabled with RKD_CONTEXT_CACHE_DIR)
+
+Contexts containing classes or functions defined directly in makefile.py are not cached - those can be
+unpickled only by executing the makefile again. Those are detected in ContextPickler.reducer_override(),
+which is not supported by Python older than 3.8 - so there the cache is disabled.
+"""
+
+import os
+import sys
+import pickle
+import types
+from io import BytesIO
+from hashlib import sha256
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from .makefile_loader import is_makefile_module
+
+CACHE_FORMAT_VERSION = 5
+MAX_ENTRIES = 8
+NOT_CACHEABLE_MODULES = ['__main__']
+
+# not influencing the loading - eg. profiling of the startup should measure the same startup as without profiling
+IGNORED_ENVIRONMENT_VARIABLES = ['RKD_STARTUP_PROFILE']
+
+FILE_FINGERPRINT = Optional[Tuple[int, int, str]]
+
+
+class ContextNotCacheableError(Exception):
+    """Raised, when the context references objects that cannot be restored without loading makefiles"""
+
+
+class ContextSources(object):
+    """
+    Collects files that contributed to the context during its loading (also files that were looked for,
+    but did not exist)
+    """
+
+    _files: Dict[str, FILE_FINGERPRINT]
+    python_paths: List[str]
+
+    def __init__(self):
+        self._files = {}
+        self.python_paths = []
+
+    def observe(self, path: str) -> None:
+        path = os.path.abspath(path)
+
+        if path not in self._files:
+            self._files[path] = self.calculate_fingerprint(path)
+
+    def add_python_path(self, path: str) -> None:
+        """Directories added to sys.path during loading of makefile.py files"""
+
+        self.python_paths.append(path)
+
+    def get_files(self) -> List[str]:
+        return list(self._files.keys())
+
+    def is_up_to_date(self) -> bool:
+        for path, fingerprint in self._files.items():
+            try:
+                stat = os.stat(path)
+
+            except OSError:
+                if fingerprint is None:
+                    continue
+
+                return False
+
+            if fingerprint is None:
+                return False
+
+            if (stat.st_mtime_ns, stat.st_size) == fingerprint[0:2]:
+                continue
+
+            # touched, but not changed files do not invalidate the cache
+            if stat.st_size != fingerprint[1] or self.calculate_fingerprint(path)[2] != fingerprint[2]:
+                return False
+
+        return True
+
+    @staticmethod
+    def calculate_fingerprint(path: str) -> FILE_FINGERPRINT:
+        try:
+            stat = os.stat(path)
+
+            with open(path, 'rb') as f:
+                return stat.st_mtime_ns, stat.st_size, sha256(f.read()).hexdigest()
+
+        except OSError:
+            return None
+
+
+class ContextPickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        if isinstance(obj, (type, types.FunctionType)) and _is_defined_in_main_or_makefile(obj):
+            raise ContextNotCacheableError(f'"{obj.__qualname__}" is defined in "{obj.__module__}" module')
+
+        return NotImplemented
+
+
+def _is_defined_in_main_or_makefile(obj) -> bool:
+    module = getattr(obj, '__module__', None) or ''
+
+    return module in NOT_CACHEABLE_MODULES or is_makefile_module(module)
+
+
+class ContextCache(object):
+    """
+    Stores compiled ApplicationContext in a directory, one file per cache key
+    """
+
+    _directory: str
+
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def is_enabled(self) -> bool:
+        # without reducer_override() the classes defined in makefile.py would be pickled by reference
+        return self._directory != '' and sys.version_info >= (3, 8)
+
+    @staticmethod
+    def calculate_key(paths: List[str], additional_imports: Optional[List[str]]) -> str:
+        """Everything that influences the loading, apart from the files (files are checked on load)"""
+
+        try:
+            from importlib.metadata import version
+            rkd_version = version('rkd.core')
+        except Exception:
+            rkd_version = ''
+
+        key = sha256()
+
+        for part in [CACHE_FORMAT_VERSION, sys.version, rkd_version, os.path.dirname(os.path.realpath(__file__)),
+                     os.getcwd(), paths, additional_imports,
+                     sorted(item for item in os.environ.items() if item[0] not in IGNORED_ENVIRONMENT_VARIABLES)]:
+            key.update(repr(part).encode('utf-8'))
+            key.update(b'\0')
+
+        return key.hexdigest()
+
+    def load(self, key: str):
+        """
+        Returns cached ApplicationContext, when all files that contributed to it are unchanged
+
+        :return: Optional[ApplicationContext]
+        """
+
+        try:
+            with open(self._get_entry_path(key), 'rb') as f:
+                entry = pickle.load(f)
+
+        # not existing, or not readable eg. written by other version of Python
+        except Exception:
+            return None
+
+        if entry.get('format') != CACHE_FORMAT_VERSION or not entry['sources'].is_up_to_date():
+            return None
+
+        # modules imported by makefile.py (eg. placed in .rkd directory) are needed to unpickle the tasks
+        for path in entry['sources'].python_paths:
+            if path not in sys.path:
+                sys.path.append(path)
+
+        try:
+            return pickle.loads(entry['context'])
+        except Exception:
+            return None
+
+    def store(self, key: str, ctx, sources: ContextSources) -> bool:
+        """
+        Persists compiled ApplicationContext
+
+        :return: False, when the context cannot be cached
+        """
+
+        if not os.path.isdir(os.path.dirname(os.path.abspath(self._directory))):
+            return False
+
+        for path in _find_modules_within(sources.python_paths).values():
+            sources.observe(path)
+
+        serialized = _serialize_context(ctx)
+
+        if serialized is None:
+            return False
+
+        entry_path = self._get_entry_path(key)
+        tmp_path = f'{entry_path}.{os.getpid()}.tmp'
+
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'format': CACHE_FORMAT_VERSION, 'sources': sources, 'context': serialized}, f)
+
+            os.replace(tmp_path, entry_path)
+
+        except OSError:
+            return False
+
+        self.evict()
+
+        return True
+
+    def evict(self) -> None:
+        """Keeps only recently written entries (eg. older entries for a different environment)"""
+
+        entries = []
+
+        for name in os.listdir(self._directory):
+            if name.endswith('.pickle'):
+                try:
+                    entries.append((os.path.getmtime(self._directory + '/' + name), name))
+                except OSError:
+                    pass
+
+        for _, name in sorted(entries, reverse=True)[MAX_ENTRIES:]:
+            try:
+                os.unlink(self._directory + '/' + name)
+            except OSError:
+                pass
+
+    def _get_entry_path(self, key: str) -> str:
+        return f'{self._directory}/{key}.pickle'
+
+
+class MemoryContextCache(ContextCache):
+    """
+    Keeps compiled contexts in memory of a long-running process (see rkd.core.daemon).
+    Contexts are not serialized, so also contexts with classes defined in makefile.py are kept.
+
+    Modules imported from directories of makefile.py files (eg. .rkd/mytasks.py) are observed as well,
+    when a context is outdated then those modules are removed from sys.modules, so they are imported again.
+
+    An entry can be exported to a cache of other process - then it is kept serialized, and unpickled on each load.
+    This way the process that keeps the cache does not need to execute or import any code of the project.
+    """
+
+    last_stored_key: Optional[str]
+    _entries: 'OrderedDict[str, Tuple[ContextSources, object]]'
+
+    def __init__(self):
+        super().__init__(directory='')
+        self.last_stored_key = None
+        self._entries = OrderedDict()
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def load(self, key: str):
+        if key not in self._entries:
+            return None
+
+        sources, ctx = self._entries[key]
+
+        if not sources.is_up_to_date():
+            del self._entries[key]
+
+            for name in _find_modules_within(sources.python_paths):
+                del sys.modules[name]
+
+            return None
+
+        for path in sources.python_paths:
+            if path not in sys.path:
+                sys.path.append(path)
+
+        self._entries.move_to_end(key)
+
+        if isinstance(ctx, bytes):
+            try:
+                return pickle.loads(ctx)
+            except Exception:
+                return None
+
+        return ctx
+
+    def store(self, key: str, ctx, sources: ContextSources) -> bool:
+        for path in _find_modules_within(sources.python_paths).values():
+            sources.observe(path)
+
+        self._entries[key] = (sources, ctx)
+        self._entries.move_to_end(key)
+        self.last_stored_key = key
+        self.evict()
+
+        return True
+
+    def export_entry(self, key: str) -> Optional[bytes]:
+        """
+        Serialized entry, to be passed to import_entry() of other process
+
+        :return: None, when the context cannot be serialized (eg. classes are defined in makefile.py)
+        """
+
+        # classes defined in makefile.py are not detected without reducer_override()
+        if sys.version_info < (3, 8):
+            return None
+
+        sources, ctx = self._entries[key]
+        serialized = ctx if isinstance(ctx, bytes) else _serialize_context(ctx)
+
+        if serialized is None:
+            return None
+
+        return pickle.dumps({'format': CACHE_FORMAT_VERSION, 'key': key, 'sources': sources, 'context': serialized})
+
+    def import_entry(self, exported: bytes) -> None:
+        """Keeps an entry exported by other process - the context stays serialized until it is loaded"""
+
+        entry = pickle.loads(exported)
+
+        if entry.get('format') != CACHE_FORMAT_VERSION:
+            return
+
+        self._entries[entry['key']] = (entry['sources'], entry['context'])
+        self._entries.move_to_end(entry['key'])
+        self.evict()
+
+    def evict(self) -> None:
+        while len(self._entries) > MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+
+def find_module_files(names: Iterable[str]) -> List[str]:
+    """Paths of source files of given imported modules (builtin modules and namespace packages have no files)"""
+
+    paths = []
+
+    for name in names:
+        path = getattr(sys.modules.get(name), '__file__', None)
+
+        if path:
+            paths.append(path)
+
+    return paths
+
+
+def _find_modules_within(directories: List[str]) -> Dict[str, str]:
+    """Names and paths of imported modules, that are placed in given directories"""
+
+    prefixes = tuple([os.path.abspath(directory) + '/' for directory in directories])
+    found = {}
+
+    if not prefixes:
+        return found
+
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+
+        if path and os.path.abspath(path).startswith(prefixes):
+            found[name] = path
+
+    return found
+
+
+def _serialize_context(ctx) -> Optional[bytes]:
+    """
+    :return: None, when the context cannot be cached
+    """
+
+    # IO is configured per invocation
+    io = ctx.io
+    ctx.io = None
+
+    try:
+        return _dumps(ctx)
+
+    except (ContextNotCacheableError, pickle.PicklingError, AttributeError, TypeError):
+        return None
+
+    finally:
+        ctx.io = io
+
+
+def _dumps(obj) -> bytes:
+    buffer = BytesIO()
+    ContextPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+
+    return buffer.getvalue()
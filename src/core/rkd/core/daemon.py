@@ -0,0 +1,438 @@
+"""
+Resident daemon
+===============
+
+Keeps loaded contexts in memory between invocations, so "rkd" calls (also nested calls made by tasks) skip
+the Python startup, importing of modules and loading of makefiles. Started with "rkd --server", listens on
+a Unix socket (RKD_DAEMON_SOCKET). The thin client (rkd.core.client) forwards each invocation to the daemon.
+
+Each invocation:
+  1. A child process is forked, it applies environment and working directory of the client
+  2. Child loads the context - taken from memory, when none of makefiles (and modules placed next to makefile.py)
+     changed. A freshly loaded context is sent back serialized to the daemon, for next invocations
+  3. Child takes client's standard descriptors (terminal) and executes the invocation in the same way as a regular
+     "rkd" does
+  4. Exit code of the child is sent back to the client
+
+Code of the project (makefiles, imported modules) is executed only in the children - a failing or hanging makefile
+does not affect the daemon, and the daemon does not keep any state of the project. The cost is that contexts with
+classes defined in makefile.py (cannot be serialized) are loaded by each invocation, same as without the daemon.
+
+The child is placed in a new process group - signals received by the client are forwarded to this group.
+When the client disconnects, the group receives SIGHUP, as when a terminal is closed.
+Only processes of the same user can connect.
+"""
+
+import os
+import sys
+import fcntl
+import signal
+import socket
+import struct
+import selectors
+import traceback
+from typing import Dict, List, Optional
+from .api.inputoutput import SystemIO, NullSystemIO
+from .argparsing.parser import CommandlineParsingHelper
+from .bootstrap import RiotKitDoApplication, main as bootstrap_main
+from .client import MessageChannel
+from .context import ContextFactory
+from .context_cache import MemoryContextCache
+from .packaging import resolver
+from .task_manifest import TaskManifest
+from . import env
+
+CONNECTION_TIMEOUT = 5
+
+
+class ApplicationDaemon(object):
+    """
+    Accepts invocations on a Unix socket, executes each of them in a forked process
+    """
+
+    _socket_path: str
+    _io: SystemIO
+    _cache: MemoryContextCache
+    _server: Optional[socket.socket]
+    _selector: Optional[selectors.BaseSelector]
+    _clients: Dict[int, MessageChannel]   # pid of the child -> connection with the client
+    _wakeup_fds: List[int]
+    _handoffs: Dict[int, bytearray]      # descriptor -> context sent back by a child
+    _base_sys_path: List[str]
+
+    def __init__(self, socket_path: str, io: SystemIO):
+        self._socket_path = os.path.abspath(socket_path)
+        self._io = io
+        self._cache = MemoryContextCache()
+        self._server = None
+        self._selector = None
+        self._clients = {}
+        self._wakeup_fds = []
+        self._handoffs = {}
+        self._base_sys_path = list(sys.path)
+
+    def serve(self) -> int:
+        """
+        Accepts invocations until SIGTERM/SIGINT is received
+
+        :return: Exit code
+        """
+
+        if self._is_listening():
+            self._io.error_msg(f'RKD daemon is already listening on {self._socket_path}')
+            return 1
+
+        self._listen()
+        self._io.info_msg(f'RKD daemon is listening on {self._socket_path}')
+
+        try:
+            while True:
+                for key, _ in self._selector.select():
+                    key.data()
+
+        except KeyboardInterrupt:
+            self._io.info_msg('RKD daemon is stopping')
+
+        finally:
+            self._close()
+
+        return 0
+
+    def _listen(self) -> None:
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        previous_umask = os.umask(0o077)
+
+        try:
+            self._server.bind(self._socket_path)
+        finally:
+            os.umask(previous_umask)
+
+        self._server.listen(64)
+
+        # SIGCHLD wakes up the loop - finished invocations are reported to clients
+        self._wakeup_fds = list(os.pipe())
+
+        for fd in self._wakeup_fds:
+            os.set_blocking(fd, False)
+
+        signal.set_wakeup_fd(self._wakeup_fds[1])
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ, self._accept)
+        self._selector.register(self._wakeup_fds[0], selectors.EVENT_READ, self._reap)
+
+    def _close(self) -> None:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+        self._selector.close()
+        self._server.close()
+
+        for fd in self._wakeup_fds:
+            os.close(fd)
+
+        try:
+            os.unlink(self._socket_path)
+        except FileNotFoundError:
+            pass
+
+    def _accept(self) -> None:
+        sock, _ = self._server.accept()
+        channel = MessageChannel(sock)
+
+        try:
+            sock.settimeout(CONNECTION_TIMEOUT)
+
+            if not self._is_connected_by_same_user(sock):
+                channel.send({'error': 'Only the user that started the daemon can connect'})
+                channel.close()
+                return
+
+            request = channel.receive()
+
+        except OSError:
+            channel.close()
+            return
+
+        # connection without a request just checks if the daemon is alive
+        if not request or not request.get('argv') or len(channel.fds) != 3:
+            self._close_descriptors(channel.fds)
+            channel.close()
+            return
+
+        handoff_read_fd, handoff_write_fd = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(handoff_read_fd)
+            self._execute_in_child(channel, request, handoff_write_fd)
+
+        os.close(handoff_write_fd)
+        os.set_blocking(handoff_read_fd, False)
+        self._handoffs[handoff_read_fd] = bytearray()
+        self._selector.register(handoff_read_fd, selectors.EVENT_READ,
+                                lambda: self._receive_handoff(handoff_read_fd))
+
+        # also there, as the client could signal the group before the child creates it
+        try:
+            os.setpgid(pid, pid)
+        except OSError:
+            pass
+
+        self._close_descriptors(channel.fds)
+        self._clients[pid] = channel
+
+        try:
+            channel.send({'pid': pid})
+            self._selector.register(sock, selectors.EVENT_READ, lambda: self._on_client_disconnected(pid))
+
+        except OSError:
+            self._hang_up(pid)
+
+    def _prepare_process_state(self, request: dict) -> None:
+        """Environment and working directory of the client - as the client process would bootstrap RKD by itself"""
+
+        os.environ.clear()
+        os.environ.update(request['env'])
+        os.environ['RKD_DAEMON_SOCKET'] = self._socket_path
+
+        try:
+            os.chdir(request['cwd'])
+        except OSError:
+            pass
+
+        sys.path = list(self._base_sys_path)
+        resolver.clear()  # files could be created between invocations
+        RiotKitDoApplication.prepend_development_paths()
+        RiotKitDoApplication.load_environment()
+
+    def _warm_up(self, argv: List[str], handoff_fd: int) -> None:
+        """
+        Loads the context into memory, unless it is already there. Freshly loaded context is sent to the daemon.
+        Errors are not reported there - the invocation will load the context again, and report the errors to the client
+        """
+
+        environ = dict(os.environ)
+        self._cache.last_stored_key = None
+
+        try:
+            ContextFactory(NullSystemIO(), cache=self._cache, manifest=TaskManifest(env.task_manifest_path()))\
+                .create_unified_context(additional_imports=CommandlineParsingHelper.preparse_args(argv)['imports'])
+
+            exported = self._cache.export_entry(self._cache.last_stored_key) if self._cache.last_stored_key else None
+
+            if exported:
+                with open(handoff_fd, 'wb', closefd=False) as handoff:
+                    handoff.write(exported)
+
+        except Exception:
+            pass
+
+        finally:
+            os.close(handoff_fd)
+
+            # loading exports variables (eg. RKD_PATH), the invocation has to start with the same environment
+            os.environ.clear()
+            os.environ.update(environ)
+
+    def _receive_handoff(self, fd: int) -> None:
+        """Context loaded by a child - kept serialized, so no code of the project is imported by the daemon"""
+
+        # everything available is read at once - the child could have already exited
+        while True:
+            try:
+                chunk = os.read(fd, 1024 * 64)
+            except BlockingIOError:
+                return
+            except OSError:
+                chunk = b''
+
+            if not chunk:
+                break
+
+            self._handoffs[fd] += chunk
+
+        self._selector.unregister(fd)
+        os.close(fd)
+        exported = self._handoffs.pop(fd)
+
+        try:
+            if exported:
+                self._cache.import_entry(bytes(exported))
+
+        except Exception:
+            pass
+
+    def _execute_in_child(self, channel: MessageChannel, request: dict, handoff_fd: int) -> None:
+        """Executes an invocation in the forked process, never returns"""
+
+        exit_code = 1
+        argv = request['argv']
+
+        try:
+            os.setpgid(0, 0)
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+
+            # descriptors are moved above standard descriptors first, as any of them could be taken
+            descriptors = [fcntl.fcntl(fd, fcntl.F_DUPFD, 3) for fd in channel.fds]
+            self._close_descriptors(channel.fds + self._wakeup_fds + list(self._handoffs.keys()))
+            self._selector.close()
+            self._server.close()
+
+            for client in list(self._clients.values()) + [channel]:
+                client.close()
+
+            for target_fd, fd in enumerate(descriptors):
+                os.dup2(fd, target_fd)
+                os.close(fd)
+
+            sys.stdin = open(0, 'r', closefd=False)
+            sys.stdout = open(1, 'w', closefd=False, buffering=1)
+            sys.stderr = open(2, 'w', closefd=False, buffering=1)
+            sys.argv = argv
+
+            self._prepare_process_state(request)
+            self._warm_up(argv, handoff_fd)
+
+            try:
+                bootstrap_main(context_cache=self._cache)
+                exit_code = 0
+
+            except SystemExit as exit_request:
+                exit_code = self._translate_exit_request(exit_request)
+
+        except KeyboardInterrupt:
+            traceback.print_exc()
+            exit_code = 128 + signal.SIGINT
+
+        except BaseException:
+            traceback.print_exc()
+
+        finally:
+            for stream in [sys.stdout, sys.stderr]:
+                try:
+                    stream.flush()
+                except Exception:
+                    pass
+
+            os._exit(exit_code)
+
+    def _reap(self) -> None:
+        try:
+            while os.read(self._wakeup_fds[0], 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+        while self._clients:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+
+            if pid == 0:
+                return
+
+            channel = self._clients.pop(pid, None)
+
+            if channel is None:
+                continue
+
+            self._unregister(channel.sock)
+
+            try:
+                channel.send({'exit_code': self._translate_wait_status(status)})
+            except OSError:
+                pass
+
+            channel.close()
+
+    def _on_client_disconnected(self, pid: int) -> None:
+        """Client was killed - the invocation receives SIGHUP, like when a terminal is closed"""
+
+        try:
+            if self._clients[pid].sock.recv(1):
+                return
+        except OSError:
+            pass
+
+        self._unregister(self._clients[pid].sock)
+        self._hang_up(pid)
+
+    @staticmethod
+    def _hang_up(pid: int) -> None:
+        try:
+            os.killpg(pid, signal.SIGHUP)
+        except ProcessLookupError:
+            pass
+
+    def _unregister(self, sock: socket.socket) -> None:
+        try:
+            self._selector.unregister(sock)
+        except KeyError:
+            pass
+
+    def _is_listening(self) -> bool:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        try:
+            probe.connect(self._socket_path)
+            return True
+
+        except OSError:
+            return False
+
+        finally:
+            probe.close()
+
+    @staticmethod
+    def _is_connected_by_same_user(sock: socket.socket) -> bool:
+        if not hasattr(socket, 'SO_PEERCRED'):
+            return True  # socket is accessible only by the owner anyway
+
+        credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+
+        return struct.unpack('3i', credentials)[1] == os.getuid()
+
+    @staticmethod
+    def _translate_wait_status(status: int) -> int:
+        if os.WIFSIGNALED(status):
+            return 128 + os.WTERMSIG(status)
+
+        return os.WEXITSTATUS(status)
+
+    @staticmethod
+    def _translate_exit_request(exit_request: SystemExit) -> int:
+        if exit_request.code is None:
+            return 0
+
+        if isinstance(exit_request.code, int):
+            return exit_request.code
+
+        print(exit_request.code, file=sys.stderr)
+        return 1
+
+    @staticmethod
+    def _close_descriptors(fds: List[int]) -> None:
+        for fd in fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def serve(socket_path: str) -> int:
+    if not socket_path:
+        print('RKD_DAEMON_SOCKET is empty, there is no place to listen on', file=sys.stderr)
+        return 1
+
+    return ApplicationDaemon(socket_path, SystemIO()).serve()
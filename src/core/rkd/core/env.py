@@ -39,3 +39,45 @@ def system_log_level() -> str:
 
 def is_subprocess_compat_mode() -> bool:
     return os.getenv('RKD_COMPAT_SUBPROCESS', '').lower() in STR_BOOLEAN_TRUE
+
+
+def jobs() -> str:
+    # validated together with --jobs switch in CommandlineParsingHelper.preparse_args()
+    return os.getenv('RKD_JOBS', '1')
+
+
+def subproject_loading_workers() -> int:
+    # parsing is bound by CPU, threads would only compete for a single CPU
+    return int(os.getenv('RKD_SUBPROJECT_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+def startup_profile() -> str:
+    return os.getenv('RKD_STARTUP_PROFILE', '')
+
+
+def cache_dir() -> str:
+    return os.getenv('RKD_CACHE_DIR', '.rkd/cache')
+
+
+def context_cache_dir() -> str:
+    return os.getenv('RKD_CONTEXT_CACHE_DIR', '')
+
+
+def task_manifest_path() -> str:
+    return os.getenv('RKD_TASK_MANIFEST', '')
+
+
+def daemon_socket_path() -> str:
+    return os.getenv('RKD_DAEMON_SOCKET', '.rkd/daemon.sock')
+
+
+def cache_max_size() -> int:
+    """Size in bytes, accepts K, M, G suffixes eg. 512M"""
+
+    size = os.getenv('RKD_CACHE_MAX_SIZE', '1G').strip().upper()
+    multipliers = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+    if size and size[-1] in multipliers:
+        return int(float(size[:-1]) * multipliers[size[-1]])
+
+    return int(size) if size else 0
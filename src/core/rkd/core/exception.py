@@ -1,7 +1,9 @@
-from typing import List
-from jsonschema import ValidationError
+from typing import List, TYPE_CHECKING
 from .argparsing.model import TaskArguments
 
+if TYPE_CHECKING:
+    from jsonschema import ValidationError
+
 
 class ContextException(Exception):
     pass
@@ -95,7 +97,7 @@ class YamlParsingException(ContextException):
 class YAMLFileValidationError(YamlParsingException):
     """Errors related to schema validation"""
 
-    def __init__(self, err: ValidationError):
+    def __init__(self, err: 'ValidationError'):
         super().__init__('YAML schema validation failed at path "%s" with error: %s' % (
             '.'.join(list(map(str, list(err.path)))),
             str(err.message)
@@ -127,6 +129,49 @@ class DeclarationException(ContextException):
     """Something wrong with the makefile.py/makefile.yaml """
 
 
+class TaskDependencyException(DeclarationException):
+    """Invalid dependencies declared between tasks"""
+
+    @classmethod
+    def from_cycle(cls, cycle: List[str]) -> 'TaskDependencyException':
+        return cls('Tasks have cyclic dependencies: %s' % ' -> '.join(cycle))
+
+    @classmethod
+    def from_dependency_not_found(cls, task_name: str, dependency_name: str) -> 'TaskDependencyException':
+        return cls('Task "%s" depends on "%s", which is not defined' % (task_name, dependency_name))
+
+
+class InvalidExecutionPlanException(ContextException):
+    """Execution plan cannot be loaded from file or does not match the current context"""
+
+    @staticmethod
+    def from_unsupported_format(expected_version: int) -> 'InvalidExecutionPlanException':
+        return InvalidExecutionPlanException('Execution plan is not in a supported format (expected version %i)'
+                                             % expected_version)
+
+    @staticmethod
+    def from_malformed_plan(exc: Exception) -> 'InvalidExecutionPlanException':
+        return InvalidExecutionPlanException('Execution plan is malformed: {}'.format(repr(exc)))
+
+    @staticmethod
+    def from_unreadable_file(path: str, exc: Exception) -> 'InvalidExecutionPlanException':
+        return InvalidExecutionPlanException('Cannot read execution plan from "{}": {}'.format(path, str(exc)))
+
+    @staticmethod
+    def from_task_not_found(exc: TaskNotFoundException) -> 'InvalidExecutionPlanException':
+        return InvalidExecutionPlanException('The plan refers to a task, that is not in the current context. {}'
+                                             .format(str(exc)))
+
+    @staticmethod
+    def from_changed_alias(alias_name: str, task_name: str) -> 'InvalidExecutionPlanException':
+        return InvalidExecutionPlanException('Task alias "{}" was changed since the plan was created - '
+                                             'it does not contain "{}" anymore'.format(alias_name, task_name))
+
+    @staticmethod
+    def from_not_a_task(name: str) -> 'InvalidExecutionPlanException':
+        return InvalidExecutionPlanException('"{}" is not a task in the current context'.format(name))
+
+
 class ContextFileNotFoundException(ContextException):
     """When makefile.py, makefile.yaml, makefile.yml not found (at least one needed)"""
 
@@ -173,6 +218,11 @@ class MissingInputException(RuntimeException):
 
 
 class CommandlineParsingError(RuntimeException):
+    @staticmethod
+    def from_invalid_jobs_number(source: str, value: str) -> 'CommandlineParsingError':
+        return CommandlineParsingError('Invalid number of jobs in {}: "{}", expected a number greater than 0'
+                                       .format(source, value))
+
     @staticmethod
     def from_block_header_parsing_exception(block_header: str) -> 'CommandlineParsingError':
         return CommandlineParsingError('Cannot parse block header "{}"'.format(block_header))
@@ -196,4 +246,9 @@ class CommandlineParsingError(RuntimeException):
 
     @staticmethod
     def from_block_ending_not_found(block: str):
-        return CommandlineParsingError('Parsing exception: Block ending - %s not found' % block)
\ No newline at end of file
+        return CommandlineParsingError('Parsing exception: Block ending - %s not found' % block)
+
+    @staticmethod
+    def from_block_ending_without_block(block: str, pos: int):
+        return CommandlineParsingError('Parsing exception: Block ending - %s at argument %i does not close any block'
+                                       % (block, pos))
@@ -0,0 +1,234 @@
+"""
+Task results cache
+==================
+
+Content-addressed store of task outputs. Key is calculated by UpToDateChecker.calculate_cache_key() from task name,
+arguments, environment and content of input files - it does not depend on the location, so the cache directory
+can be shared between multiple checkouts or CI runners (RKD_CACHE_DIR).
+
+Each entry is a tar archive containing declared outputs of the task + its captured log:
+    <RKD_CACHE_DIR>/<first 2 characters of key>/<key>.tar
+
+Writes are atomic (temporary file + rename), so concurrent RKD processes can share the same directory.
+When the cache grows over RKD_CACHE_MAX_SIZE, then least recently used entries are removed (by mtime, which is
+refreshed on every hit).
+"""
+
+import os
+import shutil
+import tarfile
+from io import BytesIO
+from typing import Optional, List, Tuple
+from ..api.syntax import TaskDeclaration
+
+ENTRY_EXTENSION = '.tar'
+LOG_MEMBER = 'log'
+OUTPUTS_PREFIX = 'outputs/'
+
+
+class TaskResultCache(object):
+    """
+    Archives outputs of successfully executed tasks and restores them, when the same task is executed
+    with the same inputs again
+    """
+
+    _directory: str
+    _max_size: int
+
+    def __init__(self, directory: str, max_size: int):
+        """
+        :param directory: Empty value disables the cache
+        :param max_size: Size in bytes, 0 means no limit
+        """
+
+        self._directory = os.path.abspath(directory) if directory else ''
+        self._max_size = max_size
+
+    def is_enabled(self) -> bool:
+        return self._directory != ''
+
+    def restore(self, declaration: TaskDeclaration, workdir: str, cache_key: str) -> Optional[str]:
+        """
+        Restores outputs of the task into workdir. Returns captured log, or None if there was no usable entry
+        (missing, truncated, corrupted or containing paths pointing outside of workdir)
+        """
+
+        path = self._get_entry_path(cache_key)
+
+        try:
+            with tarfile.open(path, 'r') as archive:
+                members = self._list_valid_members(archive, os.path.getsize(path))
+
+                if members is None:
+                    return None
+
+                log = ''
+                outputs = []
+
+                for member in members:
+                    if member.name == LOG_MEMBER:
+                        log = archive.extractfile(member).read().decode('utf-8', errors='replace')
+
+                    elif member.name.startswith(OUTPUTS_PREFIX):
+                        outputs.append(member)
+
+                # nothing is removed until the entry is known to be complete
+                for output in declaration.get_outputs():
+                    self._remove_path(os.path.join(workdir, output))
+
+                for member in outputs:
+                    member.name = member.name[len(OUTPUTS_PREFIX):]
+                    self._extract(archive, member, workdir)
+
+        except (FileNotFoundError, tarfile.TarError, EOFError):
+            return None
+
+        # mark as recently used. Other process could evict the entry in the meantime
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return log
+
+    @classmethod
+    def _list_valid_members(cls, archive: tarfile.TarFile, archive_size: int) -> Optional[List[tarfile.TarInfo]]:
+        """
+        Lists members of the archive, when all of them are complete and safe to extract
+
+        :raises tarfile.TarError:
+        :raises EOFError:
+        """
+
+        members = archive.getmembers()
+
+        for member in members:
+            # truncated archive
+            if member.isfile() and member.offset_data + member.size > archive_size:
+                return None
+
+            if member.name != LOG_MEMBER and not cls._is_safe_output(member):
+                return None
+
+        return members
+
+    @staticmethod
+    def _is_safe_output(member: tarfile.TarInfo) -> bool:
+        """Output cannot point outside of workdir - with absolute path, "..", or a link"""
+
+        def is_inside(name: str) -> bool:
+            normalized = os.path.normpath(name)
+
+            return not os.path.isabs(name) and normalized != '..' and not normalized.startswith('../')
+
+        if not member.name.startswith(OUTPUTS_PREFIX) or not is_inside(member.name[len(OUTPUTS_PREFIX):]):
+            return False
+
+        if member.isdev():
+            return False
+
+        if member.issym():
+            return is_inside(os.path.join(os.path.dirname(member.name[len(OUTPUTS_PREFIX):]), member.linkname))
+
+        if member.islnk():
+            return member.linkname.startswith(OUTPUTS_PREFIX) and is_inside(member.linkname[len(OUTPUTS_PREFIX):])
+
+        return True
+
+    def store(self, declaration: TaskDeclaration, workdir: str, cache_key: str, log_path: str) -> bool:
+        """Archives outputs of the task. Task with a missing output is not stored"""
+
+        outputs = [(os.path.join(workdir, output), os.path.normpath(output)) for output in declaration.get_outputs()]
+
+        if not all([os.path.exists(path) for path, name in outputs]):
+            return False
+
+        path = self._get_entry_path(cache_key)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        try:
+            with tarfile.open(tmp_path, 'w') as archive:
+                for output_path, name in outputs:
+                    archive.add(output_path, arcname=OUTPUTS_PREFIX + name)
+
+                self._add_log(archive, log_path)
+
+            os.replace(tmp_path, path)
+
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        self.evict()
+
+        return True
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache fits in the size limit"""
+
+        if not self._max_size:
+            return
+
+        entries = self._list_entries()
+        total_size = sum([size for path, size, mtime in entries])
+
+        for path, size, mtime in sorted(entries, key=lambda entry: entry[2]):
+            if total_size <= self._max_size:
+                break
+
+            try:
+                os.unlink(path)
+            except FileNotFoundError:  # other process could remove it already
+                pass
+
+            total_size -= size
+
+    def _list_entries(self) -> List[Tuple[str, int, float]]:
+        entries = []
+
+        for root, dirs, files in os.walk(self._directory):
+            for name in files:
+                if not name.endswith(ENTRY_EXTENSION):
+                    continue
+
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+
+                entries.append((os.path.join(root, name), stat.st_size, stat.st_mtime))
+
+        return entries
+
+    def _get_entry_path(self, cache_key: str) -> str:
+        return self._directory + '/' + cache_key[0:2] + '/' + cache_key + ENTRY_EXTENSION
+
+    @staticmethod
+    def _add_log(archive: tarfile.TarFile, log_path: str) -> None:
+        try:
+            with open(log_path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            content = b''
+
+        info = tarfile.TarInfo(LOG_MEMBER)
+        info.size = len(content)
+        archive.addfile(info, BytesIO(content))
+
+    @staticmethod
+    def _extract(archive: tarfile.TarFile, member: tarfile.TarInfo, workdir: str) -> None:
+        # "data" filter rejects absolute paths and links pointing outside of workdir. On Python versions without
+        # the filters, the members are checked by _is_safe_output()
+        if hasattr(tarfile, 'data_filter'):
+            archive.extract(member, workdir, filter='data')
+        else:
+            archive.extract(member, workdir)
+
+    @staticmethod
+    def _remove_path(path: str) -> None:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+
+        elif os.path.lexists(path):
+            os.unlink(path)
@@ -3,7 +3,7 @@ import os
 from pwd import getpwnam
 from pickle import dumps as pickle_dumps
 from pickle import loads as pickle_loads
-from typing import Union, Optional
+from typing import Union, Optional, Dict, Tuple, Set
 from rkd.process import switched_workdir
 from ..argparsing.parser import CommandlineParsingHelper
 from ..api.syntax import TaskDeclaration, GroupDeclaration
@@ -11,6 +11,7 @@ from ..api.contract import TaskInterface
 from ..api.contract import ExecutorInterface
 from ..api.contract import ExecutionContext
 from ..context import ApplicationContext
+from ..resolver import TaskResolver
 from ..inputoutput import IO
 from ..inputoutput import SystemIO
 from ..inputoutput import output_formatted_exception
@@ -19,10 +20,19 @@ from ..exception import InterruptExecution, \
     ExecutionRescueException, \
     ExecutionErrorActionException
 from .results import ProgressObserver
+from .plan import ExecutionPlan, PlannedBlock
 from ..audit import decide_about_target_log_files
 from ..api.temp import TempManager
-from .serialization import FORKED_EXECUTOR_TEMPLATE
 from .serialization import get_unpicklable
+from .forking import ForkedProcess
+from .forking import ForkedProcessError
+from .forking import wait_for_any
+from .incremental import UpToDateChecker
+from .cache import TaskResultCache
+from .pool import WorkerPool
+from .pool import get_worker_sys_path
+from ..makefile_loader import get_loaded_makefiles
+from .. import env
 
 
 class OneByOneTaskExecutor(ExecutorInterface):
@@ -30,12 +40,58 @@ class OneByOneTaskExecutor(ExecutorInterface):
 
     _ctx: ApplicationContext
     _observer: ProgressObserver
+    _up_to_date: UpToDateChecker
+    _cache: TaskResultCache
+    _worker_pool: WorkerPool
     io: SystemIO
 
     def __init__(self, ctx: ApplicationContext, observer: ProgressObserver):
         self._ctx = ctx
         self.io = ctx.io
         self._observer = observer
+        self._up_to_date = UpToDateChecker()
+        self._cache = TaskResultCache(env.cache_dir(), env.cache_max_size())
+        self._worker_pool = WorkerPool()
+
+    def execute_pipeline(self, resolver: TaskResolver, plan: ExecutionPlan) -> None:
+        """
+        Executes all planned tasks in order of declaration
+        """
+
+        self._prepare_resolver(resolver, plan)
+        self._prewarm_worker_pool(plan)
+
+        for planned_block in plan.blocks:
+            try:
+                resolver.execute_block(planned_block, self.execute)
+            except InterruptExecution:
+                return
+
+    @staticmethod
+    def _prepare_resolver(resolver: TaskResolver, plan: ExecutionPlan) -> None:
+        """Tasks scheduled on demand (eg. by @rescue) do not execute again dependencies, that are already planned"""
+
+        resolver.reset()
+        resolver.mark_as_satisfied(plan.list_task_names())
+
+    def _prewarm_worker_pool(self, plan: ExecutionPlan) -> None:
+        """Starts worker processes for tasks executed as other user, so they are ready (imports done),
+        when the task starts"""
+
+        def prewarm(declaration: TaskDeclaration, task_num: int, parent: Optional[GroupDeclaration] = None,
+                    args: list = None):
+
+            task = declaration.get_task_to_execute()
+
+            if task.should_fork() and task.get_become_as():
+                self._worker_pool.prewarm(task.get_become_as())
+
+        plan.walk(prewarm)
+
+    def shutdown(self) -> None:
+        """Stops worker processes - should be called when the pipeline was executed"""
+
+        self._worker_pool.shutdown()
 
     def execute(self, declaration: TaskDeclaration, task_num: int, parent: Union[GroupDeclaration, None] = None,
                 args: list = None):
@@ -59,8 +115,22 @@ class OneByOneTaskExecutor(ExecutorInterface):
         cmdline_become: str = parsed_args['become']
         workdir = parsed_args.get('task_workdir') if parsed_args.get('task_workdir') else declaration.workdir
 
-        # 3. execute
+        # 3. skip, when inputs did not change since last successful execution, or restore outputs from cache
+        cache_key = None
+        fingerprint = None
+
+        if self._up_to_date.is_supported(declaration):
+            cache_key = self._up_to_date.calculate_cache_key(declaration, workdir, parsed_args)
+            fingerprint = self._up_to_date.fingerprint_from_cache_key(cache_key, workdir)
+
+            if not parsed_args['rerun'] and self._skip_or_restore(declaration, parent, workdir, cache_key, fingerprint):
+                return
+
+            self._up_to_date.forget(declaration)
+
+        # 4. execute
         temp = TempManager()
+        cache_log_path = None
 
         try:
             io = IO()
@@ -73,13 +143,17 @@ class OneByOneTaskExecutor(ExecutorInterface):
 
             where_to_store_logs = decide_about_target_log_files(self._ctx, log_to_file, declaration, task_num)
 
+            if cache_key and self._cache.is_enabled():
+                cache_log_path = temp.assign_temporary_file()
+                where_to_store_logs.append(cache_log_path)
+
             with io.capture_descriptors(target_files=where_to_store_logs):
 
                 task = declaration.get_task_to_execute()
                 task.internal_inject_dependencies(io, self._ctx, self, temp)
 
                 with switched_workdir(workdir):
-                    result = self._execute_directly_or_forked(cmdline_become, task, temp, ExecutionContext(
+                    result = self._execute_directly_or_forked(cmdline_become, task, ExecutionContext(
                             declaration=declaration,
                             parent=parent,
                             args=parsed_args,
@@ -87,7 +161,7 @@ class OneByOneTaskExecutor(ExecutorInterface):
                             defined_args=defined_args
                         ))
 
-        # 4. capture result
+        # 5. capture result
         except Exception as e:
             #
             # When: Task has a failure
@@ -100,6 +174,12 @@ class OneByOneTaskExecutor(ExecutorInterface):
         #
         # When: Task did not raise exception
         #
+        if result is True and fingerprint:
+            self._up_to_date.remember_success(declaration, fingerprint)
+
+            if cache_log_path:
+                self._cache.store(declaration, workdir, cache_key, cache_log_path)
+
         temp.finally_clean_up()
 
         if result is True:
@@ -107,6 +187,32 @@ class OneByOneTaskExecutor(ExecutorInterface):
         else:
             self._on_failure(declaration, keep_going, None, parent)
 
+    def _skip_or_restore(self, declaration: TaskDeclaration, parent: Optional[GroupDeclaration], workdir: str,
+                         cache_key: str, fingerprint: str) -> bool:
+
+        """
+        Decides if the task execution can be skipped - when it is up-to-date, or its outputs were restored from cache
+        """
+
+        if self._up_to_date.is_up_to_date(declaration, workdir, fingerprint):
+            self._observer.task_up_to_date(declaration, parent)
+            return True
+
+        if not self._cache.is_enabled():
+            return False
+
+        log = self._cache.restore(declaration, workdir, cache_key)
+
+        if log is None:
+            self._observer.task_cache_missed(declaration)
+            return False
+
+        self.io.out(log)
+        self._up_to_date.remember_success(declaration, fingerprint)
+        self._observer.task_restored_from_cache(declaration, parent)
+
+        return True
+
     def _on_failure(self, declaration: TaskDeclaration, keep_going: bool,
                     exception: Optional[Exception] = None,
                     parent: Union[GroupDeclaration, None] = None):
@@ -165,23 +271,38 @@ class OneByOneTaskExecutor(ExecutorInterface):
             output_formatted_exception(exception, str(declaration.get_task_to_execute().get_full_name()), self.io)
             self._observer.task_errored(declaration, exception)
 
-    def _execute_directly_or_forked(self, cmdline_become: str, task: TaskInterface, temp: TempManager, ctx: ExecutionContext):
+    def _execute_directly_or_forked(self, cmdline_become: str, task: TaskInterface, ctx: ExecutionContext):
         """Execute directly or pass to a forked process
+
+        Without changing the user a copy-on-write fork of current process is enough - it starts instantly and
+        does not require the task to be serializable. Changing the user requires a separate interpreter started by sudo
         """
 
-        if task.should_fork() or cmdline_become:
-            task.io().debug('Executing task as separate process')
-            return self._execute_as_forked_process(cmdline_become, task, temp, ctx)
+        if not task.should_fork() and not cmdline_become:
+            return task.execute(ctx)
+
+        if not cmdline_become and not task.get_become_as():
+            task.io().debug('Executing task in a forked process')
+            return self._execute_in_fork(task, ctx)
 
-        return task.execute(ctx)
+        task.io().debug('Executing task as separate process')
+        return self._execute_as_forked_process(cmdline_become, task, ctx)
 
     @staticmethod
-    def _execute_as_forked_process(become: str, task: TaskInterface, temp: TempManager, ctx: ExecutionContext):
-        """Execute task code as a separate Python process
+    def _execute_in_fork(task: TaskInterface, ctx: ExecutionContext):
+        """Execute task in os.fork() of current process, only the result is sent back
+
+        When an exception is raised by a task, then it is reraised there
+        """
+
+        return ForkedProcess(lambda: task.execute(ctx)).start().get_result()
 
-        The communication between processes is with serialized data and text files.
-        One text file is a script, the task code is passed with stdin together with a whole context
-        Second text file is a return from executed task - it can be a boolean or exeception.
+    def _execute_as_forked_process(self, become: str, task: TaskInterface, ctx: ExecutionContext):
+        """Execute task code in a separate Python process - a worker from the WorkerPool
+
+        The communication between processes is with serialized data sent through pipes (no files on disk).
+        Task and context are sent together with environment, working directory and sys.path.
+        The result of executed task is sent back - it can be a boolean or exeception.
 
         When an exception is returned by a task, then it is reraised there - so the original exception is shown
         without any proxies.
@@ -190,16 +311,11 @@ class OneByOneTaskExecutor(ExecutorInterface):
         if not become:
             become = task.get_become_as()
 
-        # prepare file with source code and context
-        communication_file = temp.assign_temporary_file()
-        task.io().debug('Assigning communication temporary file at "%s"' % communication_file)
-
-        context_to_pickle = {'task': task, 'ctx': ctx, 'communication_file': communication_file}
+        context_to_pickle = {'task': task, 'ctx': ctx}
 
         try:
             task.io().debug('Serializing context')
-            with open(communication_file, 'wb') as f:
-                f.write(pickle_dumps(context_to_pickle))
+            payload = pickle_dumps(context_to_pickle)
 
         except (AttributeError, TypeError) as e:
             task.io().error('Cannot fork, serialization failed. ' +
@@ -212,24 +328,28 @@ class OneByOneTaskExecutor(ExecutorInterface):
 
             return False
 
-        # set permissions to temporary file
         if become:
-            task.io().debug('Setting temporary file permissions')
-            os.chmod(communication_file, 0o777)
-
             try:
                 getpwnam(become)
             except KeyError:
                 task.io().error('Unknown user "%s"' % become)
                 return False
 
-        task.io().debug('Executing python code')
-        task.py(code=FORKED_EXECUTOR_TEMPLATE, become=become, capture=False, arguments=communication_file)
+        os.environ['RKD_BIN'] = task.get_rkd_binary()
+        worker = self._worker_pool.get_worker(become)
+
+        task.io().debug('Executing task in a worker process')
+        result = worker.execute(pickle_dumps({
+            'payload': payload,
+            'sys_path': get_worker_sys_path(),
+            'makefiles': get_loaded_makefiles(),
+            'cwd': os.getcwd(),
+            'environ': worker.get_environment_changes()
+        }))
 
         # collect, process and pass result
         task.io().debug('Parsing subprocess results from a serialized data')
-        with open(communication_file, 'rb') as conn_file:
-            task_return = pickle_loads(conn_file.read())
+        task_return = pickle_loads(result)
 
         if isinstance(task_return, Exception):
             task.io().debug('Exception was raised in subprocess, re-raising')
@@ -239,3 +359,112 @@ class OneByOneTaskExecutor(ExecutorInterface):
 
     def get_observer(self) -> ProgressObserver:
         return self._observer
+
+
+class ParallelTaskExecutor(OneByOneTaskExecutor):
+    """
+    Executes independent blocks of tasks concurrently, using up to X worker processes at once
+
+    Unit of work is a block - a single task from commandline, a pipeline (task alias) or a {@block}. Tasks inside
+    a block are executed one-by-one by the worker, so @retry, @retry-block, @rescue and @error work exactly
+    the same as in OneByOneTaskExecutor.
+
+    Workers are forked processes (not threads), because a task execution changes a process-wide state:
+    working directory, environment variables and sys.stdout/sys.stderr. Output of each worker is relayed
+    line-by-line to the main process, results are passed back to the ProgressObserver of the main process.
+    """
+
+    _jobs: int
+
+    def __init__(self, ctx: ApplicationContext, observer: ProgressObserver, jobs: int):
+        super().__init__(ctx, observer)
+        self._jobs = jobs
+
+    def execute_pipeline(self, resolver: TaskResolver, plan: ExecutionPlan) -> None:
+        """
+        Executes the first block (":init" - configures the application) in the main process,
+        then all the rest concurrently
+
+        When a task fails (and is not --keep-going), then no new blocks are scheduled, but already running
+        are allowed to finish.
+
+        A block waits for earlier blocks listed in the plan (see PlannedBlock.waits_for) - the ones that execute
+        its dependencies, or execute its requested tasks as dependencies. This way each dependency is executed
+        only once and never concurrently with the same task. Only tasks explicitly requested multiple times
+        (eg. ":sh -c 'a' :sh -c 'b'") are allowed to run concurrently.
+        """
+
+        self._prepare_resolver(resolver, plan)
+        pending = list(plan.blocks)
+
+        if not pending:
+            return
+
+        first_block = pending.pop(0)
+
+        try:
+            resolver.execute_block(first_block, self.execute)
+        except InterruptExecution:
+            return
+
+        # pid -> (worker, executed block)
+        running: Dict[int, Tuple[ForkedProcess, PlannedBlock]] = {}
+        finished: Set[int] = {first_block.num}
+        interrupted = False
+
+        while running or (pending and not interrupted):
+            for planned_block in list(pending):
+                if interrupted or len(running) >= self._jobs:
+                    break
+
+                if not finished.issuperset(planned_block.waits_for):
+                    continue
+
+                pending.remove(planned_block)
+                self.io.internal('Scheduling block {} (task num={}) in a worker process'.format(
+                    planned_block.block, planned_block.first_task_num
+                ))
+
+                worker = ForkedProcess(self._create_block_worker(resolver, planned_block)).start()
+                running[worker.pid] = (worker, planned_block)
+
+            wait_for_any([worker for worker, _ in running.values()])
+
+            for pid, (worker, planned_block) in list(running.items()):
+                if worker.is_running():
+                    continue
+
+                del running[pid]
+
+                try:
+                    was_interrupted, results, cache_stats = worker.get_result()
+
+                except ForkedProcessError as exc:
+                    # worker was killed (eg. by OOM killer) - its results are lost, other workers are still awaited
+                    self._observer.tasks_lost([planned.declaration for planned in planned_block.tasks], exc)
+                    finished.add(planned_block.num)
+                    interrupted = True
+                    continue
+
+                self._observer.import_results(results)
+                self._observer.import_cache_stats(cache_stats)
+                finished.add(planned_block.num)
+                interrupted = interrupted or was_interrupted
+
+    def _create_block_worker(self, resolver: TaskResolver, planned_block: PlannedBlock):
+        def execute_block() -> Tuple[bool, Dict[str, Tuple[str, str]], Dict[str, bool]]:
+            """Executed inside a worker process"""
+
+            was_interrupted = False
+
+            try:
+                resolver.execute_block(planned_block, self.execute)
+            except InterruptExecution:
+                was_interrupted = True
+
+            finally:
+                self.shutdown()
+
+            return was_interrupted, self._observer.export_results(), self._observer.export_cache_stats()
+
+        return execute_block
@@ -0,0 +1,230 @@
+"""
+Forking
+=======
+
+Runs a Python callable in a copy-on-write os.fork() of the current interpreter.
+
+Schema:
+   1. RKD creates two pipes - one for the output (stdout + stderr), second for the result
+   2. Child process redirects descriptors 1 and 2 into the output pipe, executes the callable
+   3. Return value (or raised exception) of the callable is pickled and written into the result pipe
+   4. Parent process relays output line-by-line into its own sys.stdout, so the output capturing still works
+   5. When both pipes are closed, the child process is reaped and the result is unpickled
+
+Nothing is serialized on the way to the child process - the child has a copy of whole memory, so even lambdas
+and inner-methods are available there. Only the result needs to be serializable.
+"""
+
+import os
+import sys
+import pickle
+import select
+import traceback
+from typing import Callable, Any, List, Optional
+from rkd.process import carefully_decode
+
+READ_CHUNK_SIZE = 1024 * 64
+
+
+class ForkedProcessError(Exception):
+    """Raised, when forked process exited without returning a result (eg. was killed)"""
+
+
+class ForkedProcess(object):
+    """
+    A callable executed in a forked process
+
+    Usage:
+        process = ForkedProcess(lambda: 2 + 2)
+        process.start()
+
+        while process.is_running():
+            process.communicate(timeout=0.5)
+
+        result = process.get_result()
+    """
+
+    pid: Optional[int]
+    _target: Callable[[], Any]
+    _output_fd: Optional[int]
+    _result_fd: Optional[int]
+    _output_buffer: bytes
+    _result_buffer: bytes
+    _exit_status: Optional[int]
+
+    def __init__(self, target: Callable[[], Any]):
+        self._target = target
+        self.pid = None
+        self._output_fd = None
+        self._result_fd = None
+        self._output_buffer = b''
+        self._result_buffer = b''
+        self._exit_status = None
+
+    def start(self) -> 'ForkedProcess':
+        output_read, output_write = os.pipe()
+        result_read, result_write = os.pipe()
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(output_read)
+            os.close(result_read)
+            self._run_child(output_write, result_write)
+
+        os.close(output_write)
+        os.close(result_write)
+
+        self.pid = pid
+        self._output_fd = output_read
+        self._result_fd = result_read
+
+        return self
+
+    def _run_child(self, output_fd: int, result_fd: int):
+        """Executed inside forked process. Never returns"""
+
+        exit_code = 0
+
+        try:
+            os.dup2(output_fd, 1)
+            os.dup2(output_fd, 2)
+            os.close(output_fd)
+
+            sys.stdout = open(1, 'w', buffering=1, closefd=False)
+            sys.stderr = open(2, 'w', buffering=1, closefd=False)
+
+            try:
+                result = self._target()
+            except Exception as exc:
+                traceback.print_exc()
+                result = exc
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            try:
+                serialized = pickle.dumps(result)
+            except Exception as exc:
+                serialized = pickle.dumps(ForkedProcessError(
+                    'Cannot serialize result of forked process: %s (%s)' % (str(exc), repr(result))
+                ))
+
+            with open(result_fd, 'wb', closefd=True) as f:
+                f.write(serialized)
+
+        except BaseException:
+            exit_code = 1
+
+        finally:
+            # skip atexit handlers and buffers inherited from the parent process
+            os._exit(exit_code)
+
+    def fileno_list(self) -> List[int]:
+        """Descriptors that are still open and should be read by the parent"""
+
+        return [fd for fd in [self._output_fd, self._result_fd] if fd is not None]
+
+    def is_running(self) -> bool:
+        return self._exit_status is None
+
+    def communicate(self, timeout: Optional[float] = None) -> None:
+        """Waits for data from the process at most timeout seconds, then relays it"""
+
+        if not self.fileno_list():
+            self._reap()
+            return
+
+        readable, _, _ = select.select(self.fileno_list(), [], [], timeout)
+
+        for fd in readable:
+            self.handle_readable(fd)
+
+    def handle_readable(self, fd: int) -> None:
+        """Reads from a descriptor that was reported as readable by select()"""
+
+        chunk = os.read(fd, READ_CHUNK_SIZE)
+
+        if fd == self._output_fd:
+            if not chunk:
+                self._flush_output(everything=True)
+                os.close(fd)
+                self._output_fd = None
+            else:
+                self._output_buffer += chunk
+                self._flush_output()
+
+        elif fd == self._result_fd:
+            if not chunk:
+                os.close(fd)
+                self._result_fd = None
+            else:
+                self._result_buffer += chunk
+
+        if not self.fileno_list():
+            self._reap()
+
+    def _flush_output(self, everything: bool = False) -> None:
+        """Relays only complete lines, so outputs of multiple processes are not mixed in the middle of a line"""
+
+        if everything:
+            to_write = self._output_buffer
+            self._output_buffer = b''
+        else:
+            last_newline = self._output_buffer.rfind(b'\n')
+
+            if last_newline < 0:
+                return
+
+            to_write = self._output_buffer[0:last_newline + 1]
+            self._output_buffer = self._output_buffer[last_newline + 1:]
+
+        if to_write:
+            sys.stdout.write(carefully_decode(to_write, 'utf-8'))
+            sys.stdout.flush()
+
+    def _reap(self) -> None:
+        if self._exit_status is None:
+            self._exit_status = os.waitpid(self.pid, 0)[1]
+
+    def get_result(self) -> Any:
+        """Returns unpickled result of the callable. Exception raised by the callable is re-raised"""
+
+        while self.is_running():
+            self.communicate()
+
+        if not self._result_buffer:
+            raise ForkedProcessError('Forked process pid=%i exited with status %i without returning a result' % (
+                self.pid, self._exit_status
+            ))
+
+        result = pickle.loads(self._result_buffer)
+
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+
+def wait_for_any(processes: List[ForkedProcess], timeout: Optional[float] = None) -> None:
+    """Relays output of multiple processes at once, returns after first portion of data was handled"""
+
+    by_fd = {}
+
+    for process in processes:
+        for fd in process.fileno_list():
+            by_fd[fd] = process
+
+    if not by_fd:
+        for process in processes:
+            process.communicate()
+
+        return
+
+    readable, _, _ = select.select(list(by_fd.keys()), [], [], timeout)
+
+    for fd in readable:
+        by_fd[fd].handle_readable(fd)
@@ -0,0 +1,153 @@
+"""
+Incremental execution
+=====================
+
+Make-style skipping of tasks that are "up-to-date".
+
+A task that declares inputs (glob patterns) and/or outputs (paths) gets a fingerprint calculated before execution:
+    - content of all input files (sha256)
+    - arguments the task was called with
+    - environment variables declared by the task + variables overridden in the declaration
+
+After successful execution the fingerprint is stored in .rkd/state/, next time the task is skipped when
+the fingerprint is the same and all declared outputs still exist.
+"""
+
+import os
+import json
+import hashlib
+from glob import glob
+from typing import List, Optional
+from ..api.syntax import TaskDeclaration
+from ..audit import normalize_task_name_to_filename
+
+STATE_DIR = '.rkd/state'
+READ_CHUNK_SIZE = 1024 * 64
+IGNORED_ARGS = ['rerun']
+
+
+class UpToDateChecker(object):
+    """
+    Keeps fingerprints of last successful executions of tasks that declare inputs/outputs
+    """
+
+    _state_dir: str
+
+    def __init__(self, state_dir: str = STATE_DIR):
+        self._state_dir = os.path.abspath(state_dir)
+
+    @staticmethod
+    def is_supported(declaration: TaskDeclaration) -> bool:
+        """Only tasks that declare inputs or outputs can be skipped"""
+
+        return bool(declaration.get_inputs() or declaration.get_outputs())
+
+    def calculate_fingerprint(self, declaration: TaskDeclaration, workdir: str, args: dict) -> str:
+        """Calculates a hash of everything that could influence the task result"""
+
+        return self.fingerprint_from_cache_key(self.calculate_cache_key(declaration, workdir, args), workdir)
+
+    @staticmethod
+    def fingerprint_from_cache_key(cache_key: str, workdir: str) -> str:
+        """Fingerprint is bound to the location, cache key is not - it can be shared between machines"""
+
+        return hashlib.sha256((cache_key + os.path.abspath(workdir)).encode('utf-8')).hexdigest()
+
+    def calculate_cache_key(self, declaration: TaskDeclaration, workdir: str, args: dict) -> str:
+        """Calculates a hash of task name, arguments, environment and input files - independent of the location"""
+
+        checksum = hashlib.sha256()
+        checksum.update(declaration.to_full_name().encode('utf-8'))
+        checksum.update(json.dumps(
+            {name: value for name, value in args.items() if name not in IGNORED_ARGS},
+            sort_keys=True, default=str
+        ).encode('utf-8'))
+        checksum.update(json.dumps(self._collect_env(declaration), sort_keys=True).encode('utf-8'))
+        checksum.update(json.dumps(declaration.get_outputs()).encode('utf-8'))
+
+        for pattern in declaration.get_inputs():
+            checksum.update(b'pattern:' + pattern.encode('utf-8'))
+
+            for path in self._find_input_files(workdir, pattern):
+                checksum.update(b'file:' + os.path.relpath(path, workdir).encode('utf-8'))
+                checksum.update(self._hash_file(path).encode('utf-8'))
+
+        return checksum.hexdigest()
+
+    def is_up_to_date(self, declaration: TaskDeclaration, workdir: str, fingerprint: str) -> bool:
+        """Task is up-to-date, when last successful execution had the same fingerprint and outputs still exist"""
+
+        if self._read_fingerprint(declaration) != fingerprint:
+            return False
+
+        for output in declaration.get_outputs():
+            if not os.path.exists(os.path.join(workdir, output)):
+                return False
+
+        return True
+
+    def remember_success(self, declaration: TaskDeclaration, fingerprint: str) -> None:
+        """Saves fingerprint atomically - a concurrent reader sees an old or a new file, never a partial one"""
+
+        os.makedirs(self._state_dir, exist_ok=True)
+
+        path = self._get_state_path(declaration)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+
+        with open(tmp_path, 'w') as f:
+            json.dump({'task': declaration.to_full_name(), 'fingerprint': fingerprint}, f)
+
+        os.replace(tmp_path, path)
+
+    def forget(self, declaration: TaskDeclaration) -> None:
+        """Task is going to be executed - if it fails, then it should not be considered up-to-date next time"""
+
+        try:
+            os.unlink(self._get_state_path(declaration))
+        except FileNotFoundError:
+            pass
+
+    def _read_fingerprint(self, declaration: TaskDeclaration) -> Optional[str]:
+        try:
+            with open(self._get_state_path(declaration), 'r') as f:
+                return json.load(f).get('fingerprint')
+
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _get_state_path(self, declaration: TaskDeclaration) -> str:
+        return self._state_dir + '/' + normalize_task_name_to_filename(declaration) + '.json'
+
+    @staticmethod
+    def _collect_env(declaration: TaskDeclaration) -> dict:
+        env = declaration.get_env()
+        collected = {name: env.get(name) for name in declaration.get_user_overridden_envs()}
+
+        for name, declared in declaration.get_task_to_execute().internal_normalized_get_declared_envs().items():
+            collected[name] = env.get(name, os.getenv(name, declared.default))
+
+        return collected
+
+    @staticmethod
+    def _find_input_files(workdir: str, pattern: str) -> List[str]:
+        files = []
+
+        for path in sorted(glob(os.path.join(workdir, pattern), recursive=True)):
+            if os.path.isdir(path):
+                for root, dirs, dir_files in os.walk(path):
+                    dirs.sort()
+                    files += [os.path.join(root, name) for name in sorted(dir_files)]
+            else:
+                files.append(path)
+
+        return files
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        checksum = hashlib.sha256()
+
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+                checksum.update(chunk)
+
+        return checksum.hexdigest()
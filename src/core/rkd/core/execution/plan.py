@@ -0,0 +1,255 @@
+"""
+Execution plan
+==============
+
+Result of resolving the requested tasks - every task that is going to be executed (requested tasks, tasks of task
+aliases and dependencies), in order of execution, together with its arguments, block and parent (alias).
+
+Tasks are grouped by blocks (a single task from commandline, a pipeline (task alias) or a {@block}). Each block lists
+earlier blocks that it has to wait for - eg. because they execute its dependencies - what makes a DAG, that allows
+to execute independent blocks concurrently.
+
+Plan is resolved and validated once, then executed. It can be also written to a JSON file and loaded later
+(rkd --plan-out plan.json :build, then rkd --plan-in plan.json) - tasks are referenced by names, so the same
+makefiles are needed to load it.
+
+Retries and tasks scheduled by @rescue and @error are not a part of the plan, they are resolved on demand.
+"""
+
+import json
+from typing import List, Optional, Set, Callable, Union
+from ..api.syntax import TaskDeclaration, GroupDeclaration
+from ..argparsing.model import ArgumentBlock, TaskArguments
+from ..api.contract import ContextInterface
+from ..exception import InvalidExecutionPlanException, TaskNotFoundException
+
+PLAN_FORMAT_VERSION = 1
+
+
+class PlannedTask(object):
+    """
+    Single task execution
+    """
+
+    declaration: TaskDeclaration       # connected to a block
+    task_num: int
+    parent: Optional[GroupDeclaration]
+    args: List[str]                    # arguments from makefile, then from commandline
+    request_num: int                   # tasks resolved from the same request (eg. tasks of an alias) share the number
+    position: int                      # position of the declaration in parent's declarations
+    is_dependency: bool
+
+    def __init__(self, declaration: TaskDeclaration, task_num: int, parent: Optional[GroupDeclaration],
+                 args: List[str], request_num: int, position: int = 0, is_dependency: bool = False):
+
+        self.declaration = declaration
+        self.task_num = task_num
+        self.parent = parent
+        self.args = args
+        self.request_num = request_num
+        self.position = position
+        self.is_dependency = is_dependency
+
+    def to_dict(self) -> dict:
+        return {
+            'task': self.declaration.to_full_name(),
+            'parent': self.parent.get_name() if self.parent else None,
+            'position': self.position,
+            'task_num': self.task_num,
+            'args': self.args,
+            'request_num': self.request_num,
+            'is_dependency': self.is_dependency
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, block: ArgumentBlock, ctx: ContextInterface) -> 'PlannedTask':
+        """
+        :raises InvalidExecutionPlanException:
+        """
+
+        parent = None
+
+        try:
+            if data['parent']:
+                parent = ctx.find_task_by_name(data['parent'])
+
+                try:
+                    declaration = parent.get_declarations()[data['position']]
+                except (AttributeError, IndexError):
+                    raise InvalidExecutionPlanException.from_changed_alias(data['parent'], data['task'])
+            else:
+                declaration = ctx.find_task_by_name(data['task'])
+
+        except TaskNotFoundException as exc:
+            raise InvalidExecutionPlanException.from_task_not_found(exc) from exc
+
+        if not isinstance(declaration, TaskDeclaration) or declaration.to_full_name() != data['task']:
+            raise InvalidExecutionPlanException.from_not_a_task(data['task'])
+
+        return cls(declaration.with_connected_block(block), data['task_num'], parent, data['args'],
+                   data['request_num'], data['position'], data['is_dependency'])
+
+
+class PlannedBlock(object):
+    """
+    Tasks of a single ArgumentBlock. The smallest unit that could be executed concurrently with others
+    """
+
+    num: int
+    block: ArgumentBlock
+    first_task_num: int
+    tasks: List[PlannedTask]
+    requested: Set[str]      # requested tasks and aliases
+    dependencies: Set[str]   # dependencies executed in this block
+    required: Set[str]       # all dependencies of tasks in this block, including executed in earlier blocks
+    waits_for: List[int]     # numbers of earlier blocks, that have to be finished first
+
+    def __init__(self, num: int, block: ArgumentBlock, first_task_num: int):
+        self.num = num
+        self.block = block
+        self.first_task_num = first_task_num
+        self.tasks = []
+        self.requested = set()
+        self.dependencies = set()
+        self.required = set()
+        self.waits_for = []
+
+    def add(self, planned: PlannedTask) -> None:
+        self.tasks.append(planned)
+
+    def note_resolved(self, name: str, is_dependency: bool) -> None:
+        (self.dependencies if is_dependency else self.requested).add(name)
+
+    def note_required(self, names: List[str]) -> None:
+        self.required.update(names)
+
+    def is_waiting_for(self, earlier: 'PlannedBlock') -> bool:
+        """
+        Dependencies are executed once per invocation, and never concurrently with the same task - so a block
+        waits for the block that executes its dependencies, or executes its requested tasks as dependencies
+        """
+
+        return bool(self.required & (earlier.dependencies | earlier.requested) or self.requested & earlier.dependencies)
+
+    def to_dict(self) -> dict:
+        return {
+            'block': {
+                'body': self.block.body,
+                'retry': self.block.retry_per_task,
+                'retry_block': self.block.retry_whole_block,
+                'rescue': _serialize_task_arguments(self.block.on_rescue),
+                'error': _serialize_task_arguments(self.block.on_error),
+                'tasks': _serialize_task_arguments(self.block.tasks())
+            },
+            'first_task_num': self.first_task_num,
+            'tasks': [planned.to_dict() for planned in self.tasks],
+            'requested': sorted(self.requested),
+            'dependencies': sorted(self.dependencies),
+            'required': sorted(self.required),
+            'waits_for': self.waits_for
+        }
+
+    @classmethod
+    def from_dict(cls, num: int, data: dict, ctx: ContextInterface) -> 'PlannedBlock':
+        block_data = data['block']
+        block = ArgumentBlock(block_data['body'], retry=block_data['retry'], retry_block=block_data['retry_block'])\
+            .clone_with_tasks(_unserialize_task_arguments(block_data['tasks']))
+        block.set_parsed_rescue(_unserialize_task_arguments(block_data['rescue']))
+        block.set_parsed_error_handler(_unserialize_task_arguments(block_data['error']))
+
+        planned_block = cls(num, block, data['first_task_num'])
+        planned_block.tasks = [PlannedTask.from_dict(planned, block, ctx) for planned in data['tasks']]
+        planned_block.requested = set(data['requested'])
+        planned_block.dependencies = set(data['dependencies'])
+        planned_block.required = set(data['required'])
+        planned_block.waits_for = data['waits_for']
+
+        return planned_block
+
+
+class ExecutionPlan(object):
+    """
+    All blocks of tasks to execute, in order of execution
+    """
+
+    blocks: List[PlannedBlock]
+
+    def __init__(self):
+        self.blocks = []
+
+    def create_block(self, block: ArgumentBlock, first_task_num: int) -> PlannedBlock:
+        return PlannedBlock(len(self.blocks), block, first_task_num)
+
+    def add_block(self, planned_block: PlannedBlock) -> None:
+        """Adds a block, that has all tasks already planned"""
+
+        planned_block.waits_for = [earlier.num for earlier in self.blocks if planned_block.is_waiting_for(earlier)]
+        self.blocks.append(planned_block)
+
+    def tasks(self) -> List[PlannedTask]:
+        return [planned for planned_block in self.blocks for planned in planned_block.tasks]
+
+    def list_task_names(self) -> List[str]:
+        """Names of all tasks and aliases, that are executed by the plan"""
+
+        names = set()
+
+        for planned_block in self.blocks:
+            names.update(planned_block.requested | planned_block.dependencies)
+
+        return sorted(names)
+
+    def walk(self, callback: Callable[[TaskDeclaration, int, Union[GroupDeclaration, None], list], None]) -> None:
+        """Calls a callback on each planned task, in order of execution (eg. to validate the tasks)"""
+
+        for planned in self.tasks():
+            callback(planned.declaration, planned.task_num, planned.parent, planned.args)
+
+    def to_dict(self) -> dict:
+        return {'version': PLAN_FORMAT_VERSION, 'blocks': [planned_block.to_dict() for planned_block in self.blocks]}
+
+    @classmethod
+    def from_dict(cls, data: dict, ctx: ContextInterface) -> 'ExecutionPlan':
+        """
+        :raises InvalidExecutionPlanException: Also when the plan refers to a task, that is not defined anymore
+        """
+
+        if not isinstance(data, dict) or data.get('version') != PLAN_FORMAT_VERSION:
+            raise InvalidExecutionPlanException.from_unsupported_format(PLAN_FORMAT_VERSION)
+
+        plan = cls()
+
+        try:
+            plan.blocks = [PlannedBlock.from_dict(num, block, ctx) for num, block in enumerate(data['blocks'])]
+
+        except (KeyError, TypeError) as exc:
+            raise InvalidExecutionPlanException.from_malformed_plan(exc) from exc
+
+        return plan
+
+    def dump(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    @classmethod
+    def load(cls, path: str, ctx: ContextInterface) -> 'ExecutionPlan':
+        """
+        :raises InvalidExecutionPlanException:
+        """
+
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+
+        except (OSError, ValueError) as exc:
+            raise InvalidExecutionPlanException.from_unreadable_file(path, exc) from exc
+
+        return cls.from_dict(data, ctx)
+
+
+def _serialize_task_arguments(tasks_arguments: List[TaskArguments]) -> List[dict]:
+    return [{'name': arguments.name(), 'args': arguments.args()} for arguments in tasks_arguments]
+
+
+def _unserialize_task_arguments(data: List[dict]) -> List[TaskArguments]:
+    return [TaskArguments(arguments['name'], arguments['args']) for arguments in data]
@@ -0,0 +1,372 @@
+"""
+Worker pool
+===========
+
+Keeps Python processes that execute forked tasks (should_fork() or --become) alive for the whole RKD invocation,
+so the interpreter startup and the imports are paid once per user, not once per task.
+
+Schema:
+   1. On first task for given user a worker is started: "python -c WORKER_TEMPLATE" (with "sudo -E -u user"),
+      with stdin, stdout and stderr attached to a virtual terminal - same as in rkd.process.check_call()
+   2. Worker connects to a unix socket in a private temporary directory - the only peer accepted is a process
+      of the target user
+   3. A job (pickled task + context) is written as a frame to the socket
+   4. Parent relays task output from the terminal into its own sys.stdout (so the output capturing still works),
+      in an interactive session the stdin is relayed to the terminal
+   5. Worker writes the pickled result as a frame into the socket - it is the only signal, that the job is done.
+      Output written by the task is already in the terminal then, parent drains it before taking next job
+   6. When RKD finishes, the socket is closed - worker exits
+
+Environment variables changed by RKD between tasks, working directory and sys.path are passed with each job.
+"""
+
+import io
+import os
+import pty
+import sys
+import tty
+import codecs
+import select
+import socket
+import struct
+import atexit
+import shutil
+import termios
+import subprocess
+from pwd import getpwnam
+from tempfile import mkdtemp
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from rkd.process import copy_terminal_size
+from .serialization import WORKER_TEMPLATE
+from .serialization import FrameDecoder
+from .serialization import encode_frame
+
+READ_CHUNK_SIZE = 1024 * 64
+
+
+def get_worker_sys_path() -> list:
+    """Modules placed next to makefiles - paths added later (eg. project makefile after internal RKD
+    makefile) have to win, same as in TaskUtilities.py()"""
+
+    return list(reversed(sys.path))
+
+
+class WorkerProcessError(Exception):
+    """Raised, when a worker process exited while executing a task"""
+
+
+class WorkerOutputRelay(object):
+    """
+    Forwards output of tasks from the worker's terminal into sys.stdout. Output is relayed as-is, the end of a job
+    is signaled only through the control socket
+    """
+
+    is_closed: bool
+    _fd: int
+
+    def __init__(self, primary_fd: int):
+        self._fd = primary_fd
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self.is_closed = False
+
+    def relay(self) -> bool:
+        """Relays a chunk of output, returns False when there was nothing to read"""
+
+        try:
+            chunk = os.read(self._fd, READ_CHUNK_SIZE)
+
+        except BlockingIOError:
+            return False
+
+        except OSError:
+            # EIO: the worker exited, other side of the terminal is closed
+            chunk = b''
+
+        if not chunk:
+            self.is_closed = True
+            return False
+
+        self._write(chunk)
+        return True
+
+    def drain(self) -> None:
+        """
+        Relays everything, that was written into the terminal until now. Reading a terminal that has no input
+        waits for the data, that the kernel is still passing from the other side - so when the worker sent
+        the result after its output was written, no output of the job is left behind
+        """
+
+        os.set_blocking(self._fd, False)
+
+        try:
+            while self.relay():
+                pass
+        finally:
+            if not self.is_closed:
+                os.set_blocking(self._fd, True)
+
+    def _write(self, data: bytes) -> None:
+        text = self._decoder.decode(data)
+
+        if text:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+
+class PooledWorker(object):
+    """
+    A single Python process executing tasks as given user, one by one
+    """
+
+    become: str
+    _process: Optional[subprocess.Popen]
+    _spawn_environ: Dict[str, str]
+    _socket_dir: Optional[str]
+    _listener: Optional[socket.socket]
+    _connection: Optional[socket.socket]
+    _primary_fd: Optional[int]
+    _relay: Optional[WorkerOutputRelay]
+
+    def __init__(self, become: str = ''):
+        self.become = become
+        self._process = None
+        self._spawn_environ = {}
+        self._socket_dir = None
+        self._listener = None
+        self._connection = None
+        self._primary_fd = None
+        self._relay = None
+
+    def start(self) -> 'PooledWorker':
+        cmd = [sys.executable, '-c', WORKER_TEMPLATE]
+
+        if self.become:
+            cmd = ['sudo', '-E', '-u', self.become] + cmd
+
+        self._socket_dir = mkdtemp(prefix='rkd-worker-')
+        socket_path = self._socket_dir + '/control.sock'
+
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(socket_path)
+        self._listener.listen(1)
+
+        # other user needs to connect - peer is verified when accepting the connection
+        if self.become:
+            os.chmod(self._socket_dir, 0o711)
+            os.chmod(socket_path, 0o777)
+
+        self._primary_fd, replica_fd = pty.openpty()
+        self._relay = WorkerOutputRelay(self._primary_fd)
+        self._spawn_environ = dict(os.environ)
+
+        try:
+            self._process = subprocess.Popen(
+                cmd, stdin=replica_fd, stdout=replica_fd, stderr=replica_fd, bufsize=0, close_fds=True,
+                start_new_session=True,
+                env={**self._spawn_environ, 'RKD_CTX_PY_PATH': ':'.join(get_worker_sys_path()),
+                     'RKD_WORKER_SOCKET': socket_path}
+            )
+        finally:
+            os.close(replica_fd)
+
+        return self
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def get_environment_changes(self) -> dict:
+        """Environment changes since the worker was started - worker applies them on top of its own environment
+        (which could be modified by sudo)"""
+
+        return {
+            'set': {k: v for k, v in os.environ.items() if self._spawn_environ.get(k) != v},
+            'unset': [k for k in self._spawn_environ.keys() if k not in os.environ]
+        }
+
+    def execute(self, job: bytes) -> bytes:
+        """Sends a job and relays the output (and the input in an interactive session), until the worker sends
+        back a result"""
+
+        with self._attached_stdin() as stdin_fd:
+            if self._connection is None:
+                self._accept(stdin_fd)
+
+            self._connection.sendall(encode_frame(job))
+
+            control_fd = self._connection.fileno()
+            decoder = FrameDecoder()
+            results = []
+
+            while not results:
+                if not self._wait([control_fd], stdin_fd):
+                    continue
+
+                chunk = self._connection.recv(READ_CHUNK_SIZE)
+
+                if not chunk:
+                    self._relay.drain()
+                    raise WorkerProcessError(
+                        'Worker process (user: "%s") exited with code %s while executing a task' % (
+                            self.become, self._process.wait()
+                        )
+                    )
+
+                results = decoder.feed(chunk)
+
+            # output written before the result was sent could be still on its way through the terminal
+            self._relay.drain()
+
+        return results[0]
+
+    def _accept(self, stdin_fd: Optional[int]) -> None:
+        """Waits for the worker to connect. Meanwhile the output is relayed (eg. sudo asking for a password)"""
+
+        expected_uid = getpwnam(self.become).pw_uid if self.become else os.getuid()
+
+        while self._connection is None:
+            if self._relay.is_closed:
+                raise WorkerProcessError('Worker process (user: "%s") exited with code %s before executing a task' % (
+                    self.become, self._process.wait()
+                ))
+
+            if not self._wait([self._listener.fileno()], stdin_fd):
+                continue
+
+            connection, _ = self._listener.accept()
+            pid, uid, gid = struct.unpack('3i', connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                                                      struct.calcsize('3i')))
+
+            if uid != expected_uid:
+                connection.close()
+                continue
+
+            self._connection = connection
+            self._close_listener()
+
+    def _wait(self, fds: List[int], stdin_fd: Optional[int]) -> List[int]:
+        """Waits until any of given descriptors is readable, meanwhile relays the output and the input"""
+
+        watched = list(fds)
+
+        if not self._relay.is_closed:
+            watched.append(self._primary_fd)
+
+        if stdin_fd is not None:
+            watched.append(stdin_fd)
+
+        readable = select.select(watched, [], [])[0]
+
+        if stdin_fd in readable:
+            os.write(self._primary_fd, os.read(stdin_fd, READ_CHUNK_SIZE))
+
+        if self._primary_fd in readable:
+            self._relay.relay()
+
+        return [fd for fd in fds if fd in readable]
+
+    @contextmanager
+    def _attached_stdin(self):
+        """In an interactive session the keyboard input goes to the worker's terminal, as in rkd.process.check_call()
+        - yields the stdin descriptor then, None otherwise"""
+
+        try:
+            stdin_fd = sys.stdin.fileno()
+            old_tty = termios.tcgetattr(stdin_fd)
+
+        except (AttributeError, ValueError, OSError, io.UnsupportedOperation, termios.error):
+            yield None
+            return
+
+        try:
+            copy_terminal_size(sys.stdout, self._primary_fd)
+        except (OSError, io.UnsupportedOperation):
+            pass
+
+        tty.setraw(stdin_fd)
+
+        try:
+            yield stdin_fd
+        finally:
+            termios.tcsetattr(stdin_fd, termios.TCSADRAIN, old_tty)
+
+    def _close_listener(self) -> None:
+        if self._listener:
+            self._listener.close()
+            self._listener = None
+
+        if self._socket_dir:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            self._socket_dir = None
+
+    def stop(self) -> None:
+        if not self._process:
+            return
+
+        self._close_listener()
+
+        try:
+            if self._connection:
+                self._connection.close()
+            else:
+                self._process.terminate()
+
+            self._process.wait()
+        except OSError:
+            pass
+
+        os.close(self._primary_fd)
+
+        self._connection = None
+        self._primary_fd = None
+        self._process = None
+
+
+class WorkerPool(object):
+    """
+    Pool of pre-started workers - one per target user
+    """
+
+    _workers: Dict[str, PooledWorker]
+    _owner_pid: int
+
+    def __init__(self):
+        self._workers = {}
+        self._owner_pid = os.getpid()
+        atexit.register(self.shutdown)
+
+    def get_worker(self, become: str = '') -> PooledWorker:
+        self._forget_workers_of_parent_process()
+
+        if become not in self._workers or not self._workers[become].is_alive():
+            self._workers[become] = PooledWorker(become).start()
+
+        return self._workers[become]
+
+    def prewarm(self, become: str = '') -> None:
+        """Starts a worker in background, so the imports are done before first task needs it"""
+
+        self.get_worker(become)
+
+    def shutdown(self) -> None:
+        self._forget_workers_of_parent_process()
+
+        for worker in self._workers.values():
+            worker.stop()
+
+        self._workers = {}
+
+    def __getstate__(self):
+        """Executor (and its pool) is serialized together with a task - running workers are not passed"""
+
+        state = self.__dict__.copy()
+        state['_workers'] = {}
+
+        return state
+
+    def _forget_workers_of_parent_process(self) -> None:
+        """Workers of a process are not shared with its forks (eg. ParallelTaskExecutor workers)"""
+
+        if os.getpid() != self._owner_pid:
+            self._workers = {}
+            self._owner_pid = os.getpid()
@@ -1,5 +1,5 @@
 
-from typing import Union, Dict
+from typing import Union, Dict, Tuple, Optional, List
 from ..api.syntax import TaskDeclaration
 from ..api.syntax import GroupDeclaration
 from ..argparsing.model import ArgumentBlock
@@ -10,6 +10,8 @@ STATUS_STARTED = 'started'
 STATUS_ERRORED = 'errored'
 STATUS_FAILURE = 'failure'
 STATUS_SUCCEED = 'succeed'
+STATUS_UP_TO_DATE = 'up-to-date'
+STATUS_RESTORED_FROM_CACHE = 'restored-from-cache'
 
 """
 Can be treated as "succeed" because "in-rescue" means that we don't check task status, instead we start a new task
@@ -19,15 +21,21 @@ STATUS_RESCUE_STATE = 'in-rescue'
 
 
 class TaskResult(object):
-    task: TaskDeclaration
+    task: Optional[TaskDeclaration]
+    name: str
     status: str
 
-    def __init__(self, task: TaskDeclaration, status: str):
+    def __init__(self, task: Optional[TaskDeclaration], status: str, name: str = ''):
+        """
+        :param task: Declaration could be not available, when the result was collected in other process
+        """
+
         self.task = task
         self.status = status
+        self.name = name if name else (task.to_full_name() if task else '')
 
     def has_succeed(self) -> bool:
-        return self.status in [STATUS_SUCCEED, STATUS_RESCUE_STATE]
+        return self.status in [STATUS_SUCCEED, STATUS_UP_TO_DATE, STATUS_RESTORED_FROM_CACHE, STATUS_RESCUE_STATE]
 
 
 class ProgressObserver(object):
@@ -40,10 +48,12 @@ class ProgressObserver(object):
 
     _io: SystemIO
     _executed_tasks: Dict[str, TaskResult]
+    _cache_stats: Dict[str, bool]  # unique_id -> was it a cache hit?
 
     def __init__(self, io: SystemIO):
         self._io = io
         self._executed_tasks = {}
+        self._cache_stats = {}
 
     @staticmethod
     def _format_parent_task(parent: Union[GroupDeclaration, None]) -> str:
@@ -73,6 +83,21 @@ class ProgressObserver(object):
         self._io.print_separator()
         self._io.print_opt_line()
 
+    def tasks_lost(self, declarations: List[TaskDeclaration], exception: Exception):
+        """ When a worker process executing the tasks died without reporting results """
+
+        for declaration in declarations:
+            if declaration.get_unique_id() not in self._executed_tasks:
+                self._set_status(declaration, STATUS_ERRORED)
+
+        self._io.print_opt_line()
+        self._io.error_msg('Tasks %s were lost: %s' % (
+            ', '.join(declaration.to_full_name() for declaration in declarations),
+            str(exception)
+        ))
+        self._io.print_separator()
+        self._io.print_opt_line()
+
     def task_failed(self, declaration: TaskDeclaration, parent: Union[GroupDeclaration, None]):
         """ When task returns False """
 
@@ -101,6 +126,37 @@ class ProgressObserver(object):
             self._io.print_separator()
             self._io.print_opt_line()
 
+    def task_up_to_date(self, declaration: TaskDeclaration, parent: Union[GroupDeclaration, None]):
+        """ When task was skipped, because its inputs did not change since last successful execution """
+
+        self._set_status(declaration, STATUS_UP_TO_DATE)
+
+        if not declaration.get_task_to_execute().is_silent_in_observer():
+            self._io.info_msg('The task "%s" %s is up-to-date, skipping.' % (
+                declaration.to_full_name(),
+                self._format_parent_task(parent)
+            ))
+            self._io.print_opt_line()
+
+    def task_restored_from_cache(self, declaration: TaskDeclaration, parent: Union[GroupDeclaration, None]):
+        """ When task outputs were restored from cache instead of executing the task """
+
+        self._set_status(declaration, STATUS_RESTORED_FROM_CACHE)
+        self._cache_stats[declaration.get_unique_id()] = True
+
+        if not declaration.get_task_to_execute().is_silent_in_observer():
+            self._io.info_msg('The task "%s" %s was restored from cache.' % (
+                declaration.to_full_name(),
+                self._format_parent_task(parent)
+            ))
+            self._io.print_opt_line()
+
+    def task_cache_missed(self, declaration: TaskDeclaration):
+        """ When task is cacheable, but there was no entry in cache for its inputs """
+
+        self._io.internal('{} task not found in cache'.format(str(declaration)))
+        self._cache_stats[declaration.get_unique_id()] = False
+
     def execution_finished(self):
         """
         When all tasks were executed - the TaskExecutor finished its job
@@ -113,14 +169,52 @@ class ProgressObserver(object):
         else:
             self._io.success_msg('Successfully executed %i tasks.' % len(self._executed_tasks))
 
+        if self._cache_stats:
+            self._io.info_msg('Cache: %i hits, %i misses' % self.count_cache_hits_and_misses())
+
         self._io.print_opt_line()
 
+    def count_cache_hits_and_misses(self) -> Tuple[int, int]:
+        hits = len([was_hit for was_hit in self._cache_stats.values() if was_hit])
+
+        return hits, len(self._cache_stats) - hits
+
     def _set_status(self, declaration: TaskDeclaration, status: str):
         """Internally mark given task as done + save status"""
 
         self._io.internal('{} task, unique_id={}, status={}'.format(str(declaration), declaration.get_unique_id(), status))
         self._executed_tasks[declaration.get_unique_id()] = TaskResult(declaration, status)
 
+    def export_results(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Exports collected results in a serializable form: unique_id -> (task name, status)
+        Used to pass results from a worker process to the main process
+        """
+
+        return {k: (v.name, v.status) for k, v in self._executed_tasks.items()}
+
+    def import_results(self, results: Dict[str, Tuple[str, str]]) -> None:
+        """
+        Collects results exported by a worker process (see export_results()).
+        Already known results are kept untouched
+        """
+
+        for unique_id, (name, status) in results.items():
+            if unique_id in self._executed_tasks:
+                continue
+
+            self._io.internal('{} task imported from worker, unique_id={}, status={}'.format(name, unique_id, status))
+            self._executed_tasks[unique_id] = TaskResult(None, status, name=name)
+
+    def export_cache_stats(self) -> Dict[str, bool]:
+        """Exports cache hits/misses: unique_id -> was it a hit. Used together with export_results()"""
+
+        return dict(self._cache_stats)
+
+    def import_cache_stats(self, stats: Dict[str, bool]) -> None:
+        for unique_id, was_hit in stats.items():
+            self._cache_stats.setdefault(unique_id, was_hit)
+
     def is_at_least_one_task_failing(self) -> bool:
         return self.count_failed_tasks() >= 1
 
@@ -135,7 +229,7 @@ class ProgressObserver(object):
         """
 
         executed_tasks_that_belongs_to_block = {
-            k: v for k, v in self._executed_tasks.items() if v.task.block() is block
+            k: v for k, v in self._executed_tasks.items() if v.task is not None and v.task.block() is block
         }
 
         for declaration in executed_tasks_that_belongs_to_block.values():
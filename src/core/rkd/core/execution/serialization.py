@@ -2,59 +2,147 @@
 Forked executor takes a Python code and executes as a separate process.
 
 Schema:
-   1. RKD spawns PYTHON process that executes THIS SCRIPT
-   2. RKD creates a temporary file for communication
-   3. Context and task code is passed to communication file, so the 'forked' subprocess can read it
-   4. Process is unpacking the serialized data, executing the task
-   5. Possible errors are catch and passed via temporary file to RKD (to re-raise in main process)
-   6. Return result is passed via temporary file to RKD
+   1. RKD spawns a PYTHON worker process that executes WORKER_TEMPLATE (optionally with sudo - to change the user)
+   2. Worker connects to a unix socket RKD listens on (sudo closes inherited descriptors other than standard ones)
+   3. Context and task code is serialized with pickle and sent through the socket as a frame
+   4. Worker is unpacking the serialized data, executing the task - with stdin, stdout and stderr attached to
+      a terminal, same as a process started by rkd.process.check_call()
+   5. Possible errors are catch and passed back as a frame (to re-raise in main process)
+   6. Return result is passed back as a frame, after the output was flushed to the terminal
+
+Frames are length-prefixed (8 bytes, big-endian unsigned length + payload).
+Worker lives for the whole RKD invocation, see rkd.core.execution.pool
 
 This method gives us a possibility to change user on-the-fly (in Docker containers it is very helpful) and possibly
 a chance in the future to implement eg. remote executor or at least partially isolated executor
 """
 
 import pickle
+import struct
+from typing import List
+
+FRAME_HEADER = struct.Struct('>Q')
+
+
+def encode_frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class FrameDecoder(object):
+    """
+    Collects chunks of data read from a pipe, returns complete frames
+    """
+
+    _buffer: bytes
+
+    def __init__(self):
+        self._buffer = b''
 
+    def feed(self, chunk: bytes) -> List[bytes]:
+        self._buffer += chunk
+        frames = []
 
-FORKED_EXECUTOR_TEMPLATE = """
+        while len(self._buffer) >= FRAME_HEADER.size:
+            length = FRAME_HEADER.unpack_from(self._buffer)[0]
+            end = FRAME_HEADER.size + length
+
+            if len(self._buffer) < end:
+                break
+
+            frames.append(self._buffer[FRAME_HEADER.size:end])
+            self._buffer = self._buffer[end:]
+
+        return frames
+
+    def has_incomplete_frame(self) -> bool:
+        return len(self._buffer) > 0
+
+
+WORKER_TEMPLATE = """
 import pickle
-import base64
+import socket
+import struct
 import sys
 import traceback
 import os
 
+FRAME_HEADER = struct.Struct('>Q')
+
+# standard descriptors are left to the tasks - jobs and results are exchanged through a socket
+control = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+control.connect(os.environ.pop('RKD_WORKER_SOCKET'))
+jobs = control.makefile('rb', buffering=0)
+
 if os.getenv('RKD_CTX_PY_PATH'):
     sys.path = os.getenv('RKD_CTX_PY_PATH').split(':')
 
+# pre-import to pay the cost once for all tasks executed by this worker
+try:
+    import rkd.core.api.contract
+except ImportError:
+    pass
+
+
+def _read_exactly(size: int) -> bytes:
+    data = b''
+
+    while len(data) < size:
+        chunk = jobs.read(size - len(data))
+
+        if not chunk:
+            raise EOFError()
+
+        data += chunk
+
+    return data
+
+
 def _communicate_return(val):
-    with open(communication_file, 'wb') as f:
-        f.write(pickle.dumps(val))
+    payload = pickle.dumps(val)
+    control.sendall(FRAME_HEADER.pack(len(payload)) + payload)
 
 
-communication_file = sys.argv[1]
+while True:
+    try:
+        job = pickle.loads(_read_exactly(FRAME_HEADER.unpack(_read_exactly(FRAME_HEADER.size))[0]))
 
-try:
-    #
-    # Load serialized context
-    #
-    
-    with open(communication_file, 'rb') as f:
-        unserialized = pickle.loads(f.read())
-    
-    task = unserialized['task']
-    ctx = unserialized['ctx']
-
-    if not task.execute(ctx):
-        _communicate_return(False)
-        sys.exit(0)
-
-except Exception as exc:
-    traceback.print_exc()
-    _communicate_return(exc)
-
-    sys.exit(0)
-
-_communicate_return(True)
+    # RKD closed the channel - no more tasks to execute
+    except EOFError:
+        break
+
+    try:
+        sys.path = job['sys_path']
+        os.chdir(job['cwd'])
+
+        # classes defined in makefiles are imported by name of the makefile module
+        if job['makefiles']:
+            from rkd.core.makefile_loader import MakefileFinder
+            MakefileFinder.register(job['makefiles'])
+
+        os.environ.update(job['environ']['set'])
+
+        for name in job['environ']['unset']:
+            os.environ.pop(name, None)
+
+        # task and context are serialized separately - unpickling may require sys.path to be set
+        unserialized = pickle.loads(job['payload'])
+        result = unserialized['task'].execute(unserialized['ctx']) is True
+
+    except SystemExit as exc:
+        result = exc.code in [None, 0]
+
+    except Exception as exc:
+        traceback.print_exc()
+        result = exc
+
+    # the result tells RKD that the job is done - the output has to be in the terminal before
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    try:
+        _communicate_return(result)
+    except Exception as exc:
+        _communicate_return(Exception('Cannot serialize result of task: ' + str(exc)))
 """
 
 
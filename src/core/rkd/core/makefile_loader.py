@@ -0,0 +1,90 @@
+"""
+Makefile loader
+===============
+
+Imports makefile.py files as regular modules, each under its own name derived from the path of the makefile
+(eg. "rkd_makefile_3f1a9c0b7d2e4a61"), so:
+  - makefiles of different directories (eg. subprojects) do not replace each other in sys.modules
+  - bytecode is reused from __pycache__, as for any other module
+  - directory of a makefile is added to sys.path only once - modules placed next to makefile.py stay importable
+
+MakefileFinder resolves the names of loaded makefiles back to their files. Thanks to this, objects defined
+in a makefile can be unpickled by name - eg. in a worker process that executes a forked task.
+"""
+
+import os
+import sys
+from hashlib import sha256
+from types import ModuleType
+from typing import Dict
+from importlib.util import spec_from_file_location, module_from_spec
+
+MODULE_PREFIX = 'rkd_makefile_'
+
+
+class MakefileFinder(object):
+    """
+    Meta path finder (see sys.meta_path) for modules of makefiles loaded by load_makefile()
+    """
+
+    paths: Dict[str, str] = {}  # module name -> path to makefile.py
+
+    @classmethod
+    def register(cls, paths: Dict[str, str]) -> None:
+        cls.paths.update(paths)
+
+        if cls not in sys.meta_path:
+            sys.meta_path.append(cls)
+
+    @classmethod
+    def find_spec(cls, name: str, path=None, target=None):
+        if name not in cls.paths:
+            return None
+
+        return spec_from_file_location(name, cls.paths[name])
+
+
+def get_module_name(makefile_path: str) -> str:
+    return MODULE_PREFIX + sha256(os.path.realpath(makefile_path).encode('utf-8')).hexdigest()[0:16]
+
+
+def is_makefile_module(name: str) -> bool:
+    return name.startswith(MODULE_PREFIX)
+
+
+def get_loaded_makefiles() -> Dict[str, str]:
+    """
+    :return: Module name -> path to makefile.py
+    """
+
+    return dict(MakefileFinder.paths)
+
+
+def load_makefile(makefile_path: str) -> ModuleType:
+    """
+    Executes a makefile.py. Loading the same makefile again executes it again (it could be changed in the meantime)
+
+    :raises ImportError:
+    """
+
+    name = get_module_name(makefile_path)
+    directory = os.path.dirname(makefile_path)
+    makefile_path = os.path.abspath(makefile_path)
+
+    if directory not in sys.path:
+        sys.path.append(directory)
+
+    MakefileFinder.register({name: makefile_path})
+
+    spec = spec_from_file_location(name, makefile_path)
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+
+    try:
+        spec.loader.exec_module(module)
+
+    except BaseException:
+        sys.modules.pop(name, None)
+        raise
+
+    return module
@@ -1,3 +0,0 @@
-IMPORTS = []
-TASKS = []
-PIPELINES = []
@@ -3,15 +3,92 @@ Packaging
 =========
 
 Utilities related to finding resources of installed RKD
+
+Lookups are going through a process-wide ResourceResolver, that remembers lists of candidate paths and results
+of filesystem checks (most of the checked paths do not exist). Remembered results are forgotten when
+RKD_PATH, RKD_DIST_NAME or working directory changes.
 """
 
 import os
 import sys
-from distutils.sysconfig import get_python_lib
-from typing import List, Optional, Callable
+from functools import lru_cache
+from typing import List, Optional, Callable, Dict, Tuple, Hashable
 from . import env
 
 
+class ResourceResolver(object):
+    """
+    Finds first existing path from a list of candidates, remembers the results for the whole process
+    """
+
+    _scope: Optional[tuple]
+    _candidates: Dict[Hashable, List[str]]
+    _checks: Dict[Tuple[str, Callable], bool]
+
+    def __init__(self):
+        self._scope = None
+        self._candidates = {}
+        self._checks = {}
+
+    def get_candidates(self, key: Hashable, build: Callable[[], List[str]]) -> List[str]:
+        """
+        Returns remembered list of candidate paths, builds it on first use
+
+        :param key: Identifies the list, has to cover all arguments of "build"
+        :param build: Creates the list of candidates
+        """
+
+        self._refresh_scope()
+
+        if key not in self._candidates:
+            self._candidates[key] = build()
+
+        return list(self._candidates[key])
+
+    def find(self, candidates: List[str], method: Callable[[str], bool]) -> Optional[str]:
+        """
+        :param candidates: Paths in order of priority
+        :param method: os.path.isfile or os.path.isdir
+        :return: First path that passes the check
+        """
+
+        self._refresh_scope()
+
+        for path in candidates:
+            if self._check(path, method):
+                return path
+
+        return None
+
+    def check(self, path: str, method: Callable[[str], bool]) -> bool:
+        self._refresh_scope()
+
+        return self._check(path, method)
+
+    def clear(self) -> None:
+        """Forgets everything - eg. when files could be created in the meantime"""
+
+        self._candidates = {}
+        self._checks = {}
+
+    def _check(self, path: str, method: Callable[[str], bool]) -> bool:
+        try:
+            return self._checks[(path, method)]
+        except KeyError:
+            result = self._checks[(path, method)] = method(path)
+            return result
+
+    def _refresh_scope(self) -> None:
+        scope = (os.getenv('RKD_PATH', ''), env.distribution_name(), os.getcwd())
+
+        if scope != self._scope:
+            self.clear()
+            self._scope = scope
+
+
+resolver = ResourceResolver()
+
+
 def find_resource_directory(path: str) -> Optional[str]:
     return _find(path, os.path.isdir)
 
@@ -71,14 +148,13 @@ def get_user_site_packages() -> str:
 
 
 def _find(path: str, method: Callable) -> Optional[str]:
-    for checked_path in get_possible_paths(path):
-        if method(checked_path):
-            return checked_path
-
-    return None
+    return resolver.find(resolver.get_candidates(('packaging', path), lambda: get_possible_paths(path)), method)
 
 
+@lru_cache(maxsize=None)
 def _get_global_site_packages() -> str:
+    from distutils.sysconfig import get_python_lib  # distutils is slow to import
+
     return get_python_lib()
 
 
@@ -1,8 +1,9 @@
 
-from typing import List, Callable, Union, Optional
+from typing import List, Callable, Union, Optional, Tuple, Set
 from .argparsing.model import TaskArguments, ArgumentBlock
 from .api.syntax import TaskDeclaration, GroupDeclaration
 from .context import ApplicationContext
+from .execution.plan import ExecutionPlan, PlannedBlock, PlannedTask
 # todo: verfiy if ExecutionErrorActionException and ExecutionRescueException were properly implemented/handled
 #       and if we have tests for that case
 from .exception import InterruptExecution, \
@@ -21,14 +22,21 @@ class TaskResolver(object):
         - expanding groups (flatten tasks)
         - connecting each task to parent
         - preserve valid order of task validation/execution
+        - scheduling declared dependencies before tasks (each dependency once per invocation, in topological order)
+
+    The result is an ExecutionPlan - resolved once, then validated and executed (see plan() and execute_block())
     """
 
     _ctx: ApplicationContext
     _alias_groups: List[AliasGroup]
+    _satisfied_dependencies: Set[str]
+    _request_num: int
 
     def __init__(self, ctx: ApplicationContext, alias_groups: List[AliasGroup]):
         self._ctx = ctx
         self._alias_groups = alias_groups
+        self._satisfied_dependencies = set()
+        self._request_num = 0
 
     def resolve(self, requested_blocks: List[ArgumentBlock], callback: CALLBACK_DEF):
         """
@@ -39,16 +47,127 @@ class TaskResolver(object):
         :return:
         """
 
+        plan = self.plan(requested_blocks)
+
+        for planned_block in plan.blocks:
+            try:
+                self.execute_block(planned_block, callback)
+            except InterruptExecution:
+                return
+
+    def plan(self, requested_blocks: List[ArgumentBlock]) -> ExecutionPlan:
+        """
+        Resolves all requested tasks into an ExecutionPlan - aliases are expanded, dependencies are planned before
+        tasks that need them (each dependency once per invocation, in topological order)
+
+        :raises TaskNotFoundException:
+        """
+
+        self.reset()
+        plan = ExecutionPlan()
+
+        for task_num, block in self.enumerate_blocks(requested_blocks):
+            planned_block = plan.create_block(block, task_num)
+
+            for num, task_request in enumerate(block.tasks()):
+                self._plan_element(planned_block, task_request, task_num + num, block)
+
+            plan.add_block(planned_block)
+
+        return plan
+
+    def execute_block(self, planned_block: PlannedBlock, callback: CALLBACK_DEF) -> None:
+        """
+        Calls a callback on each planned task of a block, in order
+
+        :raises InterruptExecution: When the pipeline should not be continued
+        """
+
+        retried_request_num = None
+
+        for planned in planned_block.tasks:
+            # whole block was retried - rest of the tasks of the same request were already executed in the retry
+            if planned.request_num == retried_request_num:
+                continue
+
+            if not self._call(callback, planned.declaration, planned.task_num, planned.parent, planned.args):
+                retried_request_num = planned.request_num
+
+    @staticmethod
+    def enumerate_blocks(requested_blocks: List[ArgumentBlock]) -> List[Tuple[int, ArgumentBlock]]:
+        """
+        Assigns a number of first task in each block. Tasks are numbered from 1, across all blocks
+        (the number is used eg. in names of log files)
+        """
+
+        numbered = []
         task_num = 0
 
         for block in requested_blocks:
-            for task_request in block.tasks():
-                task_num += 1
+            numbered.append((task_num + 1, block))
+            task_num += len(block.tasks())
+
+        return numbered
+
+    def reset(self) -> None:
+        """Begins a new invocation - dependencies that were already executed will be executed again"""
+
+        self._satisfied_dependencies = set()
+
+    def mark_as_satisfied(self, names: List[str]) -> None:
+        """Notes that given tasks were already executed (eg. by other process), so they are not dependencies to run"""
+
+        self._satisfied_dependencies.update(names)
+
+    def list_requested_tasks(self, block: ArgumentBlock) -> List[str]:
+        """Lists names of tasks requested in given block (task aliases are resolved)"""
+
+        return [self._find_declaration(task_request.name()).to_full_name() for task_request in block.tasks()]
+
+    def list_dependencies(self, block: ArgumentBlock) -> List[str]:
+        """Lists names of not yet satisfied dependencies of all tasks in given block, in topological order"""
+
+        names = []
+
+        for task_request in block.tasks():
+            for declaration in self._flatten(self._find_declaration(task_request.name())):
+                self._collect_dependencies(declaration, names)
+
+        return names
+
+    def _collect_dependencies(self, declaration: TaskDeclaration, collected: List[str]) -> None:
+        for name in self._ctx.get_dependencies_of(declaration):
+            if name in collected or name in self._satisfied_dependencies:
+                continue
+
+            for dependency_declaration in self._flatten(self._ctx.find_task_by_name(name)):
+                self._collect_dependencies(dependency_declaration, collected)
+
+            collected.append(name)
+
+    def _flatten(self, declaration: Union[TaskDeclaration, GroupDeclaration]) -> List[TaskDeclaration]:
+        if isinstance(declaration, GroupDeclaration):
+            flatten = []
+
+            for inner_declaration in declaration.get_declarations():
+                flatten += self._flatten(inner_declaration)
 
-                try:
-                    self._resolve_element(task_request, callback, task_num, block)
-                except InterruptExecution:
-                    return
+            return flatten
+
+        return [declaration]
+
+    def _find_declaration(self, task_name: str) -> Union[TaskDeclaration, GroupDeclaration]:
+        try:
+            return self._ctx.find_task_by_name(task_name)
+
+        # maybe a task name is an alias to other task defined by alias groups
+        except TaskNotFoundException:
+            task_from_alias = self._resolve_name_from_alias(task_name)
+
+            if not task_from_alias:
+                raise
+
+            return self._ctx.find_task_by_name(task_from_alias)
 
     def _resolve_name_from_alias(self, task_name: str) -> Optional[str]:
         """Resolves task group's shortcuts eg. :hb -> :harbor"""
@@ -62,28 +181,25 @@ class TaskResolver(object):
     def _resolve_elements(self, requests: List[TaskArguments], callback: CALLBACK_DEF, task_num: int,
                           block: ArgumentBlock) -> None:
 
-        for request in requests:
-            self._resolve_element(request, callback, task_num, block)
+        """Resolves and executes tasks on demand - eg. tasks scheduled by @rescue or @error"""
 
-    def _resolve_element(self, task_request: TaskArguments, callback: CALLBACK_DEF, task_num: int,
-                         block: ArgumentBlock) -> None:
+        planned_block = PlannedBlock(0, block, task_num)
 
-        """Checks task by name if it was defined in context, if yes then unpacks declarations and prepares callbacks"""
+        for request in requests:
+            self._plan_element(planned_block, request, task_num, block)
 
-        self._ctx.io.internal('Resolving {}'.format(task_request))
+        self.execute_block(planned_block, callback)
 
-        try:
-            # @todo: Possibly clone required - shell summary shows only 2 tasks executed, when there were executed more but of same type
-            ctx_declaration = self._ctx.find_task_by_name(task_request.name())
+    def _plan_element(self, planned_block: PlannedBlock, task_request: TaskArguments, task_num: int,
+                      block: ArgumentBlock, is_dependency: bool = False) -> None:
 
-        # maybe a task name is an alias to other task defined by alias groups
-        except TaskNotFoundException:
-            task_from_alias = self._resolve_name_from_alias(task_request.name())
+        """Checks task by name if it was defined in context, if yes then unpacks declarations and plans them"""
 
-            if not task_from_alias:
-                raise
+        self._ctx.io.internal('Resolving {}'.format(task_request))
 
-            ctx_declaration = self._ctx.find_task_by_name(task_from_alias)
+        ctx_declaration = self._find_declaration(task_request.name())
+        self._satisfied_dependencies.add(ctx_declaration.to_full_name())
+        planned_block.note_resolved(ctx_declaration.to_full_name(), is_dependency)
 
         self._ctx.io.internal('Resolved as {}'.format(ctx_declaration))
 
@@ -96,75 +212,94 @@ class TaskResolver(object):
         else:
             raise Exception('Cannot resolve task - unknown type "%s"' % str(ctx_declaration))
 
-        # connect TaskDeclaration to blocks for context
-        declaration_num = 0
-        for declaration in declarations:
-            declaration: TaskDeclaration
-            declarations[declaration_num] = declaration.with_connected_block(block)
-            declaration_num += 1
-
-        self._iterate_over_declarations(callback, declarations, task_num, parent, task_request)
-
-    def _iterate_over_declarations(self, callback: CALLBACK_DEF, declarations: list, task_num: int,
-                                   parent: Optional[GroupDeclaration], task_request: TaskArguments):
+        self._request_num += 1
+        self._plan_declarations(planned_block, declarations, task_num, parent, task_request, block, is_dependency,
+                                self._request_num)
 
-        """Recursively go through all tasks in correct order, executing a callable on each"""
+    def _plan_declarations(self, planned_block: PlannedBlock, declarations: list, task_num: int,
+                           parent: Optional[GroupDeclaration], task_request: TaskArguments, block: ArgumentBlock,
+                           is_dependency: bool, request_num: int):
 
-        for declaration in declarations:
-            declaration: TaskDeclaration
+        """Recursively go through all tasks in correct order, planning dependencies before each task"""
 
+        for position, declaration in enumerate(declarations):
             if isinstance(declaration, GroupDeclaration):
-                self._iterate_over_declarations(
-                    callback, declaration.get_declarations(),
-                    task_num, declaration, task_request
-                )
+                self._plan_declarations(planned_block, declaration.get_declarations(), task_num, declaration,
+                                        task_request, block, is_dependency, request_num)
                 continue
 
-            try:
-                callback(
-                    declaration,
-                    task_num,
-                    parent,
-                    # the arguments there will be mixed in order:
-                    #  - first: defined in Makefile
-                    #  - second: commandline arguments
-                    #
-                    #  The argparse in Python will take the second one as priority.
-                    #  We do not try to remove duplications there to not increase complexity
-                    #  of the solution - it works now.
-                    declaration.get_args() + task_request.args()
-                )
+            # connect TaskDeclaration to block for context
+            declaration: TaskDeclaration = declaration.with_connected_block(block)
+
+            self._plan_dependencies(planned_block, declaration, task_num)
+            self._satisfied_dependencies.add(declaration.to_full_name())
+            planned_block.note_resolved(declaration.to_full_name(), is_dependency)
+
+            planned_block.add(PlannedTask(
+                declaration, task_num, parent,
+                # the arguments there will be mixed in order:
+                #  - first: defined in Makefile
+                #  - second: commandline arguments
+                #
+                #  The argparse in Python will take the second one as priority.
+                #  We do not try to remove duplications there to not increase complexity
+                #  of the solution - it works now.
+                declaration.get_args() + task_request.args(),
+                request_num, position, is_dependency
+            ))
+
+    def _call(self, callback: CALLBACK_DEF, declaration: TaskDeclaration, task_num: int,
+              parent: Optional[GroupDeclaration], args: list) -> bool:
 
-            #
-            # Resolver is able to resolve dynamically additional fallback tasks on-demand
-            # The status of the overall pipeline depends on decision of ProgressObserver, the resolver is only
-            # resolving and scheduling tasks, not deciding about results
-            #
-
-            except ExecutionRetryException as exc:
-                # multiple tasks to resolve, then retry
-                if exc.args:
-                    self._resolve_elements(
-                        requests=exc.args,
-                        callback=callback,
-                        task_num=task_num,
-                        block=ArgumentBlock.from_empty()
-                    )
-                    return
-
-                # single task to retry
-                self._iterate_over_declarations(
-                    callback=callback,
-                    declarations=[declaration],
-                    task_num=task_num,
-                    parent=parent,
-                    task_request=task_request
-                )
+        """
+        Calls a callback on a single task
+
+        :return: False, when the whole block was retried
+        """
+
+        try:
+            callback(declaration, task_num, parent, args)
+
+        #
+        # Resolver is able to resolve dynamically additional fallback tasks on-demand
+        # The status of the overall pipeline depends on decision of ProgressObserver, the resolver is only
+        # resolving and scheduling tasks, not deciding about results
+        #
 
-            except ExecutionRescheduleException as reschedule_action:
+        except ExecutionRetryException as exc:
+            # multiple tasks to resolve, then retry
+            if exc.args:
                 self._resolve_elements(
-                    requests=reschedule_action.tasks_to_schedule,
+                    requests=exc.args,
                     callback=callback,
                     task_num=task_num,
                     block=ArgumentBlock.from_empty()
                 )
+                return False
+
+            # single task to retry
+            return self._call(callback, declaration, task_num, parent, args)
+
+        except ExecutionRescheduleException as reschedule_action:
+            self._resolve_elements(
+                requests=reschedule_action.tasks_to_schedule,
+                callback=callback,
+                task_num=task_num,
+                block=ArgumentBlock.from_empty()
+            )
+
+        return True
+
+    def _plan_dependencies(self, planned_block: PlannedBlock, declaration: TaskDeclaration, task_num: int) -> None:
+        """Plans not yet planned dependencies of a task. Dependencies of dependencies are planned first"""
+
+        dependencies = self._ctx.get_dependencies_of(declaration)
+        planned_block.note_required(dependencies)
+
+        for name in dependencies:
+            if name in self._satisfied_dependencies:
+                continue
+
+            self._ctx.io.internal('Resolving {} as a dependency of {}'.format(name, declaration.to_full_name()))
+            self._plan_element(planned_block, TaskArguments(name, []), task_num, declaration.block(),
+                               is_dependency=True)
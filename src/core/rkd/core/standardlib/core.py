@@ -1,5 +1,4 @@
 
-import pkg_resources
 import os
 import re
 from subprocess import CalledProcessError
@@ -41,7 +40,15 @@ class InitTask(TaskInterface):
             'RKD_ALIAS_GROUPS': '',        # supported by core, here only for documentation in CLI
             'RKD_UI': 'true',
             'RKD_SYS_LOG_LEVEL': 'info',   # supported by core, here only for documentation in CLI
-            'RKD_IMPORTS': ''              # supported by core, here only for documentation in CLI
+            'RKD_IMPORTS': '',             # supported by core, here only for documentation in CLI
+            'RKD_JOBS': '1',               # supported by core, here only for documentation in CLI
+            'RKD_CACHE_DIR': '.rkd/cache',  # supported by core, here only for documentation in CLI
+            'RKD_CACHE_MAX_SIZE': '1G',    # supported by core, here only for documentation in CLI
+            'RKD_CONTEXT_CACHE_DIR': '',   # supported by core, here only for documentation in CLI
+            'RKD_TASK_MANIFEST': '',       # supported by core, here only for documentation in CLI
+            'RKD_DAEMON_SOCKET': '.rkd/daemon.sock',  # supported by core, here only for documentation in CLI
+            'RKD_SUBPROJECT_WORKERS': str(min(4, os.cpu_count() or 1)),  # supported by core, here only for documentation in CLI
+            'RKD_STARTUP_PROFILE': ''  # supported by core, here only for documentation in CLI
         }
 
     def configure_argparse(self, parser: ArgumentParser):
@@ -54,6 +61,23 @@ class InitTask(TaskInterface):
                                  'Example: "rkt_utils.docker:rkt_ciutils.boatci:rkd_python". '
                                  'Instead of switch there could be also environment variable "RKD_IMPORTS" used')
 
+        parser.add_argument('--jobs', '-rj', type=int,
+                            help='Number of tasks (or blocks of tasks) executed concurrently, each in a separate '
+                                 'worker process. Instead of switch there could be also environment variable '
+                                 '"RKD_JOBS" used')
+
+        parser.add_argument('--validate-all', action='store_true',
+                            help='Resolve and validate all task aliases at once (normally each alias is resolved, when '
+                                 'used). Can be used without any task, eg. on CI')
+
+        parser.add_argument('--plan-out',
+                            help='Resolve and validate requested tasks, then write the execution plan into given JSON '
+                                 'file instead of executing the tasks')
+
+        parser.add_argument('--plan-in',
+                            help='Execute tasks from an execution plan written before with --plan-out '
+                                 '(no tasks should be given in commandline then)')
+
     def execute(self, context: ExecutionContext) -> bool:
         """
         :init task is setting user-defined global defaults on runtime
@@ -265,6 +289,8 @@ class VersionTask(TaskInterface):
         pass
 
     def execute(self, context: ExecutionContext) -> bool:
+        import pkg_resources  # slow to import, needed only there
+
         self._io.outln('RKD version %s' % pkg_resources.get_distribution("rkd.core").version)
         self._io.print_opt_line()
 
@@ -550,6 +576,8 @@ This task is designed to be extended, see methods marked as "interface methods".
         if use_latest:
             return ''
 
+        import pkg_resources
+
         rkd_version = pkg_resources.get_distribution(self.get_package_name()).version
         return '==%s' % rkd_version
 
@@ -567,8 +595,8 @@ This task is designed to be extended, see methods marked as "interface methods".
         Interface method: to be overridden
         """
 
-        return ['.rkd/logs', '*.pyc', '*__pycache__*', '/.venv',
-                '.venv-setup.log', '/*.egg-info/*', '.eggs', 'dist', 'build']
+        return ['.rkd/logs', '.rkd/.context-cache', '.rkd/.task-manifest.json', '.rkd/daemon.sock', '*.pyc',
+                '*__pycache__*', '/.venv', '.venv-setup.log', '/*.egg-info/*', '.eggs', 'dist', 'build']
 
     def on_startup(self, ctx: ExecutionContext) -> None:
         """When the command is triggered, and the git is not dirty
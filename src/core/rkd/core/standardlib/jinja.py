@@ -3,10 +3,6 @@ import re
 from typing import Pattern
 from argparse import ArgumentParser
 from subprocess import CalledProcessError
-from jinja2 import Environment
-from jinja2 import FileSystemLoader
-from jinja2 import StrictUndefined
-from jinja2.exceptions import UndefinedError
 from ..api.contract import TaskInterface
 from ..api.contract import ExecutionContext
 from ..api.syntax import TaskDeclaration
@@ -22,6 +18,10 @@ class FileRendererTask(TaskInterface):
         return ':j2'
 
     def execute(self, context: ExecutionContext) -> bool:
+        # imported there to not slow down startup of every RKD invocation
+        from jinja2 import Environment, FileSystemLoader, StrictUndefined
+        from jinja2.exceptions import UndefinedError
+
         source = context.get_arg('--source')
         output = context.get_arg('--output')
 
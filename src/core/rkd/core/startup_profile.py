@@ -0,0 +1,157 @@
+"""
+Startup profiler
+================
+
+Measures wall time and memory allocations of each phase of the startup - loading of environment files,
+loading of the context (each path, each subproject, compilation), parsing of the commandline and resolving of tasks.
+Startup is considered finished, when first task is going to be executed.
+
+Enabled by RKD_STARTUP_PROFILE environment variable:
+  - "1", "true", "yes": sorted breakdown is printed to stderr
+  - any other value: path to a JSON file that the profile is written to (eg. to compare results in CI)
+
+Allocations are measured with tracemalloc (net size of memory allocated during a phase), what slows down the startup.
+Subprojects could be loaded in threads, then their allocations are overlapping.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import List, Optional
+from . import env
+
+
+class StartupProfiler(object):
+    """
+    Collects measurements of nested phases
+    """
+
+    _destination: str
+    _records: List[dict]
+    _local: threading.local
+    _started_at: Optional[float]
+
+    def __init__(self):
+        self._destination = ''
+        self._records = []
+        self._local = threading.local()
+        self._started_at = None
+
+    def enable(self, destination: str) -> None:
+        """
+        :param destination: "1"/"true"/"yes" to print the profile, path to write a JSON, empty to disable
+        """
+
+        self._destination = destination
+        self._records = []
+
+        if destination:
+            self._started_at = time.perf_counter()
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def is_enabled(self) -> bool:
+        return self._destination != ''
+
+    def phase(self, name: str):
+        """
+        Measures a block of code. Phases started inside other phase are recorded as its children
+
+        Example:
+            with profiler.phase('context'):
+                ...
+        """
+
+        if not self._destination:
+            return nullcontext()
+
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name: str):
+        stack = self._get_stack()
+        record = {'name': name, 'parent': self._qualify(stack[-1]) if stack else None,
+                  'wall_ms': 0.0, 'allocated_bytes': 0}
+
+        self._records.append(record)
+        stack.append(record)
+
+        allocated_before = tracemalloc.get_traced_memory()[0]
+        started_at = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            record['wall_ms'] = round((time.perf_counter() - started_at) * 1000, 3)
+            record['allocated_bytes'] = tracemalloc.get_traced_memory()[0] - allocated_before
+            stack.pop()
+
+    def inherit(self, func):
+        """
+        Wraps a function that will be executed in other thread, so its phases are nested in the current phase
+        """
+
+        if not self._destination:
+            return func
+
+        parent_stack = list(self._get_stack())
+
+        def inheriting(*args, **kwargs):
+            self._local.stack = list(parent_stack)
+            return func(*args, **kwargs)
+
+        return inheriting
+
+    def finish(self) -> None:
+        """Reports the profile, when enabled. Next calls do nothing"""
+
+        if not self._destination:
+            return
+
+        profile = {
+            'total_ms': round((time.perf_counter() - self._started_at) * 1000, 3),
+            'phases': self._records
+        }
+
+        destination = self._destination
+        self._destination = ''
+        tracemalloc.stop()
+
+        if destination.lower() in env.STR_BOOLEAN_TRUE:
+            self._print(profile)
+            return
+
+        with open(destination, 'w') as f:
+            json.dump(profile, f, indent=4)
+
+    @staticmethod
+    def _print(profile: dict) -> None:
+        lines = [
+            f'RKD startup profile, total: {profile["total_ms"]:.1f}ms (phases are including their nested phases)',
+            f'{"wall [ms]":>12} {"allocated [KiB]":>16}  phase'
+        ]
+
+        for record in sorted(profile['phases'], key=lambda phase: phase['wall_ms'], reverse=True):
+            lines.append(f'{record["wall_ms"]:>12.1f} {record["allocated_bytes"] / 1024:>16.1f}  '
+                         f'{StartupProfiler._qualify(record)}')
+
+        print(os.linesep.join(lines), file=sys.stderr)
+
+    @staticmethod
+    def _qualify(record: dict) -> str:
+        return record['parent'] + ' > ' + record['name'] if record['parent'] else record['name']
+
+    def _get_stack(self) -> List[dict]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+
+        return self._local.stack
+
+
+profiler = StartupProfiler()
@@ -0,0 +1,168 @@
+"""
+Task manifest
+=============
+
+Maps strings used in IMPORTS/imports: (eg. "rkd.core.standardlib.jinja") to metadata of the tasks they import
+(full name, description, dependencies, class import path). Having that, the tasks can be declared as
+LazyTaskDeclaration and their modules (with all third-party dependencies like jinja2) are imported only when
+a task is actually executed.
+
+The manifest is generated automatically - each import that had to be imported eagerly is remembered.
+An entry is valid as long as the files of the imported module and of modules defining the tasks are unchanged.
+
+Imports are remembered only when all of their tasks can be recreated from a class name alone
+(the task does not take constructor arguments, and is not configured after construction).
+
+The manifest is optional - enabled by setting RKD_TASK_MANIFEST to a path of the file.
+"""
+
+import os
+import sys
+import json
+from threading import Lock
+from types import ModuleType
+from typing import Dict, List, Optional
+from .api.syntax import LazyTaskDeclaration
+
+MANIFEST_FORMAT_VERSION = 1
+
+
+class TaskManifest(object):
+    """
+    JSON file with metadata of imported tasks, read and written by SyntaxParsing
+    """
+
+    _path: str
+    _imports: Optional[Dict[str, dict]]
+    _changed: bool
+    _used_files: List[str]
+    _lock: Lock
+
+    def __init__(self, path: str):
+        self._path = path
+        self._imports = None
+        self._changed = False
+        self._used_files = []
+        self._lock = Lock()  # subprojects are loaded in threads
+
+    def is_enabled(self) -> bool:
+        return self._path != ''
+
+    def get_declarations(self, import_str: str) -> Optional[List[LazyTaskDeclaration]]:
+        """
+        :return: None, when the import is not in the manifest, or the entry is outdated
+        """
+
+        entry = self._get_imports().get(import_str)
+
+        if not entry or not self._is_up_to_date(entry['files']):
+            return None
+
+        with self._lock:
+            self._used_files += entry['files'].keys()
+
+        return [LazyTaskDeclaration(**metadata) for metadata in entry['declarations']]
+
+    def remember(self, import_str: str, module: ModuleType, declarations: list) -> bool:
+        """
+        Adds an import to the manifest
+
+        :return: False, when tasks imported by this import cannot be declared lazily
+        """
+
+        described = []
+        modules = [module]
+
+        for declaration in declarations:
+            metadata = LazyTaskDeclaration.describe(declaration)
+
+            if metadata is None:
+                return False
+
+            described.append(metadata)
+            modules.append(sys.modules.get(type(declaration.get_task_to_execute()).__module__))
+
+        files = {}
+
+        for imported_module in modules:
+            path = getattr(imported_module, '__file__', None)
+
+            if not path:
+                return False
+
+            files[path] = self._calculate_fingerprint(path)
+
+        imports = self._get_imports()
+
+        with self._lock:
+            imports[import_str] = {'files': files, 'declarations': described}
+            self._changed = True
+
+        return True
+
+    def get_used_files(self) -> List[str]:
+        """Files of modules, which tasks were declared lazily from the manifest"""
+
+        return self._used_files
+
+    def save(self) -> bool:
+        """
+        Writes the manifest, when anything new was remembered. Written only when the parent directory exists
+
+        :return: True, when written
+        """
+
+        if not self._changed or not os.path.isdir(os.path.dirname(os.path.abspath(self._path))):
+            return False
+
+        tmp_path = f'{self._path}.{os.getpid()}.tmp'
+
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': MANIFEST_FORMAT_VERSION, 'imports': self._imports}, f)
+
+            os.replace(tmp_path, self._path)
+
+        except OSError:
+            return False
+
+        self._changed = False
+
+        return True
+
+    def _get_imports(self) -> Dict[str, dict]:
+        with self._lock:
+            if self._imports is None:
+                self._imports = self._read()
+
+        return self._imports
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self._path, 'r') as f:
+                content = json.load(f)
+
+            if content.get('version') == MANIFEST_FORMAT_VERSION:
+                return content['imports']
+
+        # not existing, or damaged - will be generated again
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+        return {}
+
+    def _is_up_to_date(self, files: Dict[str, list]) -> bool:
+        for path, fingerprint in files.items():
+            if self._calculate_fingerprint(path) != fingerprint:
+                return False
+
+        return True
+
+    @staticmethod
+    def _calculate_fingerprint(path: str) -> Optional[list]:
+        try:
+            stat = os.stat(path)
+            return [stat.st_mtime_ns, stat.st_size]
+
+        except OSError:
+            return None
@@ -2,7 +2,7 @@
 import os
 import sys
 from typing import Union
-from subprocess import check_output, Popen, DEVNULL, CalledProcessError
+from subprocess import check_output, Popen, DEVNULL, PIPE, CalledProcessError
 from tempfile import NamedTemporaryFile
 from abc import ABC as AbstractClass, abstractmethod
 from copy import deepcopy
@@ -73,7 +73,64 @@ class TaskUtilities(AbstractClass):
 
         # cmd without environment variables
         original_cmd = deepcopy(cmd)
+        bash_script = self._create_bash_script(cmd, verbose=verbose, strict=strict, env=env)
 
+        if not capture:
+            with NamedTemporaryFile() as bash_temp_file:
+                bash_temp_file.write(bash_script.encode('utf-8'))
+                bash_temp_file.flush()
+
+                check_call('bash ' + bash_temp_file.name,
+                           script_to_show=original_cmd if not is_debug else bash_script,
+                           use_subprocess=use_subprocess)
+
+            return
+
+        read, write = os.pipe()
+        os.write(write, bash_script.encode('utf-8'))
+        os.close(write)
+
+        return check_output('bash', shell=True, stdin=read).decode('utf-8')
+
+    async def sh_async(self, cmd: str, capture: bool = False, verbose: bool = False, strict: bool = True,
+                       env: dict = None) -> Union[str, None]:
+        """ Asynchronous sh() - multiple scripts can be executed concurrently from one event loop.
+            Throws exception on error. To capture output set capture=True
+
+            Example:
+                async def build_all():
+                    await asyncio.gather(self.sh_async('make app'), self.sh_async('make docs'))
+
+                asyncio.run(build_all())
+        """
+
+        # asyncio is loaded only by tasks that are using it
+        import asyncio
+        from rkd.process.asynchronous import check_call_async
+
+        self.io().debug('sh_async(%s)' % cmd)
+        is_debug = self.io().is_log_level_at_least('debug')
+        bash_script = self._create_bash_script(cmd, verbose=verbose, strict=strict, env=env)
+
+        if not capture:
+            with NamedTemporaryFile() as bash_temp_file:
+                bash_temp_file.write(bash_script.encode('utf-8'))
+                bash_temp_file.flush()
+
+                await check_call_async('bash ' + bash_temp_file.name,
+                                       script_to_show=cmd if not is_debug else bash_script)
+
+            return
+
+        process = await asyncio.create_subprocess_exec('bash', stdin=PIPE, stdout=PIPE)
+        out, _ = await process.communicate(bash_script.encode('utf-8'))
+
+        if process.returncode != 0:
+            raise CalledProcessError(process.returncode, cmd, output=out)
+
+        return out.decode('utf-8')
+
+    def _create_bash_script(self, cmd: str, verbose: bool, strict: bool, env: Union[dict, None]) -> str:
         # set strict mode, it can be disabled manually
         if strict:
             cmd = 'set -euo pipefail; ' + cmd
@@ -92,24 +149,8 @@ class TaskUtilities(AbstractClass):
             cmd = env_str + cmd
 
         bash_script = "#!/bin/bash -eopipefail \n" + cmd
-        bash_script = bash_script.replace('%RKD%', self.get_rkd_binary())
 
-        if not capture:
-            with NamedTemporaryFile() as bash_temp_file:
-                bash_temp_file.write(bash_script.encode('utf-8'))
-                bash_temp_file.flush()
-
-                check_call('bash ' + bash_temp_file.name,
-                           script_to_show=original_cmd if not is_debug else bash_script,
-                           use_subprocess=use_subprocess)
-
-            return
-
-        read, write = os.pipe()
-        os.write(write, bash_script.encode('utf-8'))
-        os.close(write)
-
-        return check_output('bash', shell=True, stdin=read).decode('utf-8')
+        return bash_script.replace('%RKD%', self.get_rkd_binary())
 
     def py(self, code: str = '', become: str = None, capture: bool = False,
            script_path: str = None, arguments: str = '') -> Union[str, None]:
@@ -6,7 +6,8 @@ Test data for RKD automatic tests
 For internal usage only.
 """
 
-
+import os
+import sys
 from typing import Dict
 from argparse import ArgumentParser
 from .api.syntax import TaskDeclaration
@@ -55,6 +56,20 @@ class TaskForTestingWithRKDCallInside(TaskForTesting):
         return True
 
 
+class TaskForTestingProcessInformation(TaskForTesting):
+    """Prints information about the process it is executed in - used to test forked execution"""
+
+    def execute(self, context: ExecutionContext) -> bool:
+        print('pid={}, cwd={}, RKD_TEST_VALUE={}'.format(os.getpid(), os.getcwd(), os.getenv('RKD_TEST_VALUE')))
+        print('stdin_tty={}, stdout_tty={}'.format(sys.stdin.isatty(), sys.stdout.isatty()))
+        return True
+
+
+class TaskForTestingExitingProcess(TaskForTesting):
+    def execute(self, context: ExecutionContext) -> bool:
+        os._exit(1)
+
+
 def get_test_declaration(task: TaskInterface = None, internal: bool = False) -> TaskDeclaration:
     if not task:
         task = TaskForTesting(internal=internal)
@@ -1,7 +1,5 @@
-import yaml
 import os
-from typing import List, Tuple, Union, Callable, Dict
-from dotenv import dotenv_values
+from typing import List, Tuple, Union, Callable, Dict, Optional
 from copy import deepcopy
 from collections import OrderedDict
 from .api.parsing import SyntaxParsing
@@ -16,6 +14,8 @@ from .api.inputoutput import IO
 from .api.inputoutput import get_environment_copy
 from .standardlib import CallableTask
 from .yaml_parser import YamlFileLoader
+from .context_cache import ContextSources
+from .task_manifest import TaskManifest
 from .execution.declarative import DeclarativeExecutor
 
 
@@ -26,29 +26,34 @@ class YamlSyntaxInterpreter:
 
     io: IO
     loader: YamlFileLoader
+    sources: Optional[ContextSources]
+    manifest: Optional[TaskManifest]
 
-    def __init__(self, io: IO, loader: YamlFileLoader):
+    def __init__(self, io: IO, loader: YamlFileLoader, sources: Optional[ContextSources] = None,
+                 manifest: Optional[TaskManifest] = None):
         self.io = io
         self.loader = loader
+        self.sources = sources
+        self.manifest = manifest
 
     def parse(self, content: str, rkd_path: str, file_path: str) \
             -> Tuple[List[TaskDeclaration], List[TaskAliasDeclaration], List[str]]:
 
         """ Parses whole YAML into entities same as in makefile.py - IMPORTS, TASKS """
 
-        pre_parsed = yaml.load(content, yaml.Loader)
+        parsed = self.loader.parse(content)
         subprojects = {}
 
-        if 'version' not in pre_parsed:
+        if 'version' not in parsed:
             raise YamlParsingException('"version" is not specified in YAML file')
 
-        parsed = self.loader.load(content, str(pre_parsed.get('version')))
+        self.loader.validate(parsed, str(parsed.get('version')))
 
         imports = []
         global_envs = self.parse_env(parsed, file_path)
 
         if "imports" in parsed:
-            imports = self.parse_imports(parsed['imports'])
+            imports = self.parse_imports(parsed['imports'], self.manifest)
 
         tasks = self.parse_tasks(
             parsed['tasks'] if 'tasks' in parsed else {},
@@ -109,7 +114,7 @@ class YamlSyntaxInterpreter:
 
         if "env_files" in parent:
             for path in parent['env_files']:
-                envs.update(self._load_env_from_file(path, makefile_path))
+                envs.update(self._load_env_from_file(path, makefile_path, self.sources))
 
         if "environment" in parent:
             envs.update(parent['environment'])
@@ -117,7 +122,7 @@ class YamlSyntaxInterpreter:
         return envs
 
     @staticmethod
-    def _load_env_from_file(path: str, makefile_path: str) -> dict:
+    def _load_env_from_file(path: str, makefile_path: str, sources: Optional[ContextSources] = None) -> dict:
         """Load .env file
 
         Loads .env file in Bash-like syntax from selected path (path to file, not directory).
@@ -126,6 +131,7 @@ class YamlSyntaxInterpreter:
         Arguments:
             path: Path to file that contains env variables
             makefile_path: Path to the Makefile.yaml that is being processed
+            sources: (Optional) Collects files, that were looked up - for caching of the context
 
         Returns:
             KV dictionary
@@ -138,9 +144,14 @@ class YamlSyntaxInterpreter:
         ]
 
         for search_path in search_paths:
+            if sources:
+                sources.observe(search_path)
+
             if not os.path.isfile(search_path):
                 continue
 
+            from dotenv import dotenv_values
+
             return dotenv_values(dotenv_path=search_path)
 
         raise EnvironmentVariablesFileNotFound(path, search_paths)
@@ -153,6 +164,9 @@ class YamlSyntaxInterpreter:
         become = yaml_declaration['become'] if 'become' in yaml_declaration else ''
         workdir = yaml_declaration.get('workdir', '')
         internal = bool(yaml_declaration['internal']) if 'internal' in yaml_declaration else None
+        dependencies = yaml_declaration.get('dependencies', [])
+        inputs = yaml_declaration.get('inputs', [])
+        outputs = yaml_declaration.get('outputs', [])
 
         # important: order of environment variables loading
         envs = deepcopy(global_env)
@@ -181,7 +195,10 @@ class YamlSyntaxInterpreter:
                 become=become
             ),
             workdir=workdir,
-            internal=internal
+            internal=internal,
+            dependencies=dependencies,
+            inputs=inputs,
+            outputs=outputs
         )
 
     @staticmethod
@@ -227,11 +244,12 @@ class YamlSyntaxInterpreter:
         return converted
 
     @staticmethod
-    def parse_imports(classes: List[str]) -> List[TaskDeclaration]:
+    def parse_imports(classes: List[str], manifest: Optional[TaskManifest] = None) -> List[TaskDeclaration]:
         """Parses imports strings into Python classes
 
         Args:
             classes: List of classes to import
+            manifest: Imports known in the manifest are declared lazily
 
         Returns:
             A list of basic task declarations with imported tasks inside
@@ -247,6 +265,6 @@ class YamlSyntaxInterpreter:
         """
 
         try:
-            return SyntaxParsing.parse_imports_by_list_of_classes(classes)
+            return SyntaxParsing.parse_imports_by_list_of_classes(classes, manifest)
         except ParsingException as e:
             raise YamlParsingException(str(e))
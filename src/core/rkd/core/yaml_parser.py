@@ -4,22 +4,24 @@ Generic YAML file parsing module
 Uses standard YAML parser, adds additional features, such as:
   - Schema validation
   - RKD lookup paths integration
+
+The libyaml based loader is used when PyYAML was built with it. Compiled schema validators are kept
+for the whole process - each schema file is read only once. PyYAML and jsonschema are imported on first use,
+so invocations that do not load any YAML file do not pay for them.
 """
 
 import os
-from typing import List
-from yaml import load as yaml_load
-from yaml import Loader as YamlLoader
+from typing import Dict, List, Tuple
 from json import load as json_load
-from jsonschema import validate
-from jsonschema import ValidationError
-from jsonschema import draft7_format_checker
 from . import env
 from .exception import YAMLFileValidationError
-from .packaging import get_user_site_packages
+from .packaging import get_user_site_packages, resolver
 
 CURRENT_SCRIPT_PATH = os.path.dirname(os.path.realpath(__file__))
 
+# schema path -> (modification time of the schema file, compiled validator)
+_validators: Dict[str, Tuple[int, object]] = {}
+
 
 class YamlFileLoader(object):
     """YAML loader extended by schema validation support
@@ -49,6 +51,30 @@ class YamlFileLoader(object):
     def load(self, stream, schema_name: str):
         """Loads a YAML, validates and return parsed as dict/list """
 
+        parsed = self.parse(stream)
+        self.validate(parsed, schema_name)
+
+        return parsed
+
+    @staticmethod
+    def parse(stream):
+        """Parses a YAML without validation"""
+
+        from yaml import load as yaml_load
+
+        try:
+            from yaml import CLoader as YamlLoader
+        except ImportError:
+            from yaml import Loader as YamlLoader
+
+        return yaml_load(stream, YamlLoader)
+
+    def validate(self, parsed, schema_name: str) -> None:
+        """Validates already parsed YAML document against a schema
+
+        :raises YAMLFileValidationError:
+        """
+
         schema_name = schema_name.replace('/', '-') + '.json'
         schema_path = self.find_path_by_name(schema_name, 'schema')
 
@@ -57,32 +83,51 @@ class YamlFileLoader(object):
                 schema_name, str(self.get_lookup_paths('schema'))
             ))
 
-        parsed = yaml_load(stream, YamlLoader)
+        from jsonschema.exceptions import best_match
+
+        error = best_match(self._get_validator(schema_path).iter_errors(parsed))
+
+        if error is not None:
+            raise YAMLFileValidationError(error)
+
+    @staticmethod
+    def _get_validator(schema_path: str):
+        """Compiles the schema once, again only when the schema file was modified"""
+
+        modified_at = os.stat(schema_path).st_mtime_ns
+        cached = _validators.get(schema_path)
+
+        if cached and cached[0] == modified_at:
+            return cached[1]
+
+        from jsonschema import draft7_format_checker
+        from jsonschema.validators import validator_for
 
         with open(schema_path, 'rb') as f:
-            try:
-                validate(instance=parsed, schema=json_load(f), format_checker=draft7_format_checker)
-            except ValidationError as e:
-                raise YAMLFileValidationError(e)
+            schema = json_load(f)
 
-        return parsed
+        validator_class = validator_for(schema)
+        validator_class.check_schema(schema)
+        validator = validator_class(schema, format_checker=draft7_format_checker)
+
+        _validators[schema_path] = (modified_at, validator)
+
+        return validator
 
     def find_path_by_name(self, filename: str, subdir: str) -> str:
         """Find schema in one of RKD directories or in current path
         """
 
-        if "/" in filename and os.path.isfile(filename):
+        if "/" in filename and resolver.check(filename, os.path.isfile):
             return filename
 
-        for path in self.get_lookup_paths(subdir):
-            file_path = path + '/' + filename
-
-            if os.path.isfile(file_path):
-                return file_path
-
-        return ''
+        return resolver.find([path + '/' + filename for path in self.get_lookup_paths(subdir)], os.path.isfile) or ''
 
     def get_lookup_paths(self, subdirectory: str) -> List[str]:
+        return resolver.get_candidates(('yaml', subdirectory, tuple(self.paths)),
+                                       lambda: self._build_lookup_paths(subdirectory))
+
+    def _build_lookup_paths(self, subdirectory: str) -> List[str]:
         paths = [
             os.getcwd(),
             os.getcwd() + '/' + subdirectory,
@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 
+import gc
+from io import StringIO
 from argparse import ArgumentParser
+from contextlib import redirect_stdout
 from rkd.core.api.inputoutput import IO
 from rkd.core.api.testing import BasicTestingCase
 from rkd.core.argparsing.parser import CommandlineParsingHelper
+from rkd.core.exception import CommandlineParsingError
 from rkd.core.test import get_test_declaration
+from rkd.core.standardlib.shell import ShellCommandTask
 
 
 class ArgParsingTest(BasicTestingCase):
@@ -37,6 +42,17 @@ class ArgParsingTest(BasicTestingCase):
                          "\"ArgumentBlock<[':harbor:stop'], [TaskCall<:harbor:stop ([])>]>\"]",
                          str(list(map(lambda a: str(a), parsed))))
 
+    def test_creates_grouped_arguments_into_tasks__block_after_task_keeps_order(self):
+        """Task placed before a block should be closed by the block - order of execution is kept"""
+
+        parsed = CommandlineParsingHelper(IO()).create_grouped_arguments([
+            ':init', '--log-level=debug', '{@retry 1}', ':strike:start', '{/@}', ':picket:start'
+        ])
+
+        self.assertEqual([':init', ':strike:start', ':picket:start'],
+                         [block.tasks()[0].name() for block in parsed])
+        self.assertEqual(1, parsed[1].retry_per_task)
+
     def test_add_env_variables_to_argparse(self):
         parser = ArgumentParser(':test')
         task = get_test_declaration()
@@ -55,6 +71,44 @@ class ArgParsingTest(BasicTestingCase):
         self.assertNotIn('ORG_NAME (default: International Workers Association)', parser.description)
         self.assertIn('-- No environment variables declared --', parser.description)
 
+    def test_parse_reuses_parser_configured_for_the_task(self):
+        declaration = get_test_declaration(ShellCommandTask())
+
+        first, first_definitions = CommandlineParsingHelper.parse(declaration, ['-c', 'echo "Solidarity"'])
+        second, second_definitions = CommandlineParsingHelper.parse(declaration.with_args(['--rerun']),
+                                                                    ['-c', 'echo "Direct action"', '--rerun'])
+
+        self.assertEqual('echo "Solidarity"', first['cmd'])
+        self.assertFalse(first['rerun'])
+        self.assertEqual('echo "Direct action"', second['cmd'])
+        self.assertTrue(second['rerun'])
+        self.assertIs(first_definitions, second_definitions)
+
+    def test_parse_formats_description_only_when_help_is_shown(self):
+        declaration = get_test_declaration()
+        CommandlineParsingHelper.parse(declaration, [])
+
+        parser = CommandlineParsingHelper._parsers[declaration.get_task_to_execute()][declaration.to_full_name()]
+        self.assertIsNone(parser.description)
+
+        out = StringIO()
+
+        with redirect_stdout(out), self.assertRaises(SystemExit):
+            CommandlineParsingHelper.parse(declaration, ['--help'])
+
+        self.assertIn('ORG_NAME (default: International Workers Association)', out.getvalue())
+        self.assertIn('Environment variables for task ":rkd:test"', out.getvalue())
+
+    def test_cached_parser_is_released_together_with_the_task(self):
+        declaration = get_test_declaration()
+        CommandlineParsingHelper.parse(declaration, [])
+        parsers_count = len(CommandlineParsingHelper._parsers)
+
+        del declaration
+        gc.collect()
+
+        self.assertEqual(parsers_count - 1, len(CommandlineParsingHelper._parsers))
+
     def test_arguments_usage(self):
         """Check that arguments are recognized"""
 
@@ -156,6 +210,33 @@ class ArgParsingTest(BasicTestingCase):
         self.assertIn('imports', args)
         self.assertEqual(['rkd.pythonic'], args['imports'])
 
+    def test_preparse_args_parses_jobs(self):
+        with self.subTest('From switch'):
+            self.assertEqual(4, CommandlineParsingHelper.preparse_args(['--jobs', '4', ':sh'])['jobs'])
+
+        with self.subTest('From environment'):
+            with self.environment({'RKD_JOBS': '3'}):
+                self.assertEqual(3, CommandlineParsingHelper.preparse_args([':sh'])['jobs'])
+
+        with self.subTest('Defaults to one'):
+            self.assertEqual(1, CommandlineParsingHelper.preparse_args([':sh'])['jobs'])
+
+    def test_preparse_args_rejects_invalid_number_of_jobs(self):
+        for value in ['0', '-2', 'auto']:
+            with self.subTest('--jobs ' + value):
+                with self.assertRaises(CommandlineParsingError) as exc:
+                    CommandlineParsingHelper.preparse_args(['--jobs=' + value, ':sh'])
+
+                self.assertIn('Invalid number of jobs in --jobs switch: "{}"'.format(value), str(exc.exception))
+
+            with self.subTest('RKD_JOBS=' + value):
+                with self.environment({'RKD_JOBS': value}):
+                    with self.assertRaises(CommandlineParsingError) as exc:
+                        CommandlineParsingHelper.preparse_args([':sh'])
+
+                self.assertIn('Invalid number of jobs in RKD_JOBS environment variable: "{}"'.format(value),
+                              str(exc.exception))
+
     def test_preparse_ignores_arguments_after_tasks(self):
         """
         Arguments that could be preparsed should be placed behind any task
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+from random import Random
+from rkd.core.api.inputoutput import IO
+from rkd.core.api.testing import BasicTestingCase
+from rkd.core.argparsing.commandline import parse_commandline, to_argv, tokenize, TaskNode, SharedArgumentsNode, \
+    ArgumentsNode, BlockNode, BLOCK_BEGIN, BLOCK_END, WORD
+from rkd.core.argparsing.parser import CommandlineParsingHelper
+from rkd.core.exception import CommandlineParsingError
+
+WORDS = ['--env=test', '-c', 'Solidarity', '--fast-fail', 'mutual aid', '', '42', 'http://iwa-ait.org']
+HEADERS = ['{@retry 2', '{@retry-block 1', '{@error :notify', '{@rescue :rollback --env=test @retry 3']
+EXAMPLES = 300
+
+
+def generate_nodes(random: Random, in_block: bool = False) -> list:
+    """Generates a random, valid syntax tree (what could be written in a shell or in a task alias)"""
+
+    nodes = []
+
+    for _ in range(0, random.randint(0, 6)):
+        kind = random.choice(['task', 'task', 'shared', 'block'] if not in_block else ['task', 'task', 'shared'])
+        args = [random.choice(WORDS) for _ in range(0, random.randint(0, 3))]
+
+        if kind == 'task':
+            nodes.append(TaskNode(':task-%i' % random.randint(1, 5), args))
+        elif kind == 'shared':
+            nodes.append(SharedArgumentsNode(args))
+        else:
+            nodes.append(BlockNode(random.choice(HEADERS), {}, generate_nodes(random, in_block=True)))
+
+    # arguments, that do not follow any task
+    if random.randint(0, 5) == 0:
+        nodes.insert(0, ArgumentsNode([random.choice(WORDS[0:4])]))
+
+    return nodes
+
+
+def glue_markers(random: Random, argv: list) -> list:
+    """Joins some block markers with neighbouring arguments, eg. ['{@retry 2}', ':task'] -> ['{@retry 2}:task']"""
+
+    glued = []
+
+    for argument in argv:
+        # empty arguments cannot be glued, they would disappear
+        if glued and glued[-1].strip() and argument.strip() and random.randint(0, 1) and \
+                (glued[-1].endswith('}') or argument.startswith('{/@}')):
+            glued[-1] += argument
+            continue
+
+        glued.append(argument)
+
+    return glued
+
+
+class ArgParsingCommandlineTest(BasicTestingCase):
+    #
+    # properties, checked on randomly generated commandlines
+    #
+
+    def test_rendered_syntax_tree_parses_into_the_same_tree(self):
+        random = Random(161)
+
+        for _ in range(0, EXAMPLES):
+            nodes = generate_nodes(random)
+            argv = to_argv(nodes)
+
+            self.assertEqual(nodes, parse_commandline(argv), msg=argv)
+            self.assertEqual(argv, to_argv(parse_commandline(argv)), msg=argv)
+
+    def test_block_markers_glued_to_arguments_are_parsed_the_same_way(self):
+        random = Random(1936)
+
+        for _ in range(0, EXAMPLES):
+            argv = to_argv(generate_nodes(random))
+            glued = glue_markers(random, argv)
+
+            self.assertEqual(parse_commandline(argv), parse_commandline(glued), msg=glued)
+
+    def test_every_task_is_grouped_once_in_order(self):
+        random = Random(1871)
+
+        for _ in range(0, EXAMPLES):
+            argv = to_argv(generate_nodes(random))
+            expected = [arg for arg in argv if arg.startswith(':')]
+            blocks = CommandlineParsingHelper(IO()).create_grouped_arguments(argv)
+            names = [task.name() for block in blocks for task in block.tasks() if task.name() != 'rkd:initialize']
+
+            self.assertEqual(expected, names, msg=argv)
+
+    #
+    # tokenize()
+    #
+
+    def test_tokenize_splits_arguments_only_around_block_markers(self):
+        tokens = tokenize([':deploy', '{@retry 3}:migrate --env=test', 'mutual aid{/@}', ':notify'])
+
+        self.assertEqual([(WORD, ':deploy'), (BLOCK_BEGIN, '{@retry 3'), (WORD, ':migrate --env=test'),
+                          (WORD, 'mutual aid'), (BLOCK_END, '{/@}'), (WORD, ':notify')],
+                         [(token.kind, token.value) for token in tokens])
+
+    def test_tokenize_joins_header_spread_across_arguments(self):
+        """Shell splits an unquoted header by spaces - values of whole arguments are quoted to be split back later"""
+
+        tokens = tokenize(['{@error', ':notify', 'Strike failed', '@retry', '3}:strike', '{/@}'])
+
+        self.assertEqual("{@error :notify 'Strike failed' @retry 3", tokens[0].value)
+        self.assertEqual(':strike', tokens[1].value)
+
+    def test_tokenize_raises_error_when_header_is_not_closed(self):
+        with self.assertRaises(CommandlineParsingError) as exc:
+            tokenize([':hello', '{@retry 3', ':test', '{/@}'])
+
+        self.assertEqual('Parsing exception: Closing character "}" not found for {@ opened at 1', str(exc.exception))
+
+    #
+    # parse_commandline()
+    #
+
+    def test_parse_commandline_raises_error_on_block_ending_without_block(self):
+        with self.assertRaises(CommandlineParsingError) as exc:
+            parse_commandline([':hello', '{/@}'])
+
+        self.assertEqual('Parsing exception: Block ending - {/@} at argument 1 does not close any block',
+                         str(exc.exception))
+
+    def test_block_keeps_all_its_tasks(self):
+        blocks = CommandlineParsingHelper(IO()).create_grouped_arguments([
+            '@', '--shared', ':picket', '{@retry 2 @rescue :rollback :notify}', ':strike', '--long', ':occupy', '{/@}'
+        ])
+
+        self.assertEqual(2, len(blocks))
+        self.assertEqual([':strike', ':occupy'], [task.name() for task in blocks[1].tasks()])
+        self.assertEqual([['--long', '--shared'], ['--shared']], [task.args() for task in blocks[1].tasks()])
+        self.assertEqual([':rollback', ':notify'], [task.name() for task in blocks[1].on_rescue])
+        self.assertEqual(2, blocks[1].retry_per_task)
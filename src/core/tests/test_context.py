@@ -8,14 +8,19 @@ from unittest import mock
 from rkd.core.context import ContextFactory
 from rkd.core.context import ApplicationContext
 from rkd.core.context import distinct_imports
-from rkd.core.api.inputoutput import NullSystemIO, IO, SystemIO
+from rkd.core.api.inputoutput import NullSystemIO, IO, SystemIO, BufferedSystemIO
 from rkd.core.exception import ContextException
+from rkd.core.exception import TaskDependencyException
+from rkd.core.exception import TaskNotFoundException
+from rkd.core.exception import DeclarationException
 from rkd.core.api.syntax import TaskDeclaration
 from rkd.core.api.syntax import TaskAliasDeclaration
 from rkd.core.api.syntax import GroupDeclaration
 from rkd.core.api.testing import BasicTestingCase
 from rkd.core.test import TaskForTesting
 from rkd.core.standardlib import InitTask
+from rkd.core.standardlib.core import CallableTask
+from rkd.process import switched_workdir
 
 TESTS_DIR = os.path.dirname(os.path.realpath(__file__))
 
@@ -89,6 +94,29 @@ class ContextTest(BasicTestingCase):
         self.assertEqual(['/home/iwa-ait'], ctx1.directories)
         self.assertEqual(['/home/iwa-ait', '/home/black-lives-matters'], ctx_merged.directories)
 
+    def test_merge_shares_declarations_and_keeps_primary_context_unchanged(self):
+        """Merged context overrides declarations of the primary context, but does not copy nor modify them"""
+
+        build = TaskDeclaration(CallableTask(':build', lambda ctx, task: True))
+        primary = ApplicationContext([build, TaskDeclaration(CallableTask(':test', lambda ctx, task: True))], [],
+                                     '', subprojects=[], workdir='', project_prefix='')
+
+        overridden_test = TaskDeclaration(CallableTask(':test', lambda ctx, task: True))
+        subctx = ApplicationContext([overridden_test], [TaskAliasDeclaration(':all', [':build', ':test'])],
+                                    '', subprojects=[], workdir='', project_prefix='')
+
+        merged = ApplicationContext.merge(primary, subctx)
+        merged.io = IO()
+        merged.compile()
+
+        self.assertIs(build, merged.find_task_by_name(':build'))
+        self.assertIs(overridden_test, merged.find_task_by_name(':test'))
+        self.assertEqual([':build', ':test', ':all'], list(merged.find_all_tasks().keys()))
+
+        # primary context is not affected by the merge
+        self.assertIsNot(overridden_test, primary._imported_tasks[':test'])
+        self.assertNotIn(':all', primary._task_aliases)
+
     def test_context_empty_path_is_not_applied_to_directories(self):
         """Test that '' path will not be added to directories list"""
 
@@ -111,7 +139,7 @@ class ContextTest(BasicTestingCase):
             ''')
 
             with unittest.mock.patch('rkd.core.context.os.path.isfile', return_value=True):
-                with unittest.mock.patch('rkd.core.context.SourceFileLoader.load_module') as src_loader_method:
+                with unittest.mock.patch('rkd.core.context.load_makefile') as src_loader_method:
                     class TestImported:
                         IMPORTS = []
                         TASKS = []
@@ -201,6 +229,100 @@ class ContextTest(BasicTestingCase):
         self.assertEqual(':init', task.get_declarations()[1].to_full_name())
         self.assertEqual(':init', task.get_declarations()[2].to_full_name())
 
+    def test_aliases_are_resolved_on_first_use_and_remembered(self):
+        ctx = ApplicationContext([TaskDeclaration(InitTask())],
+                                 [TaskAliasDeclaration(':deeper', [':init']),
+                                  TaskAliasDeclaration(':deep', [':deeper'])],
+                                 directory='', subprojects=[], workdir='', project_prefix='')
+        ctx.io = IO()
+
+        with mock.patch.object(ctx, '_resolve_pipeline', wraps=ctx._resolve_pipeline) as resolve_pipeline:
+            ctx.compile()
+            self.assertEqual(0, resolve_pipeline.call_count)
+
+            deep = ctx.find_task_by_name(':deep')
+            self.assertIs(deep, ctx.find_task_by_name(':deep'))
+            self.assertEqual([':deep', ':deeper'], [call.args[0] for call in resolve_pipeline.call_args_list])
+
+    def test_invalid_alias_is_reported_when_used_or_when_validating_all(self):
+        ctx = ApplicationContext([TaskDeclaration(InitTask())],
+                                 [TaskAliasDeclaration(':valid', [':init']),
+                                  TaskAliasDeclaration(':not-existing', [':sabotage']),
+                                  TaskAliasDeclaration(':ping', [':pong']), TaskAliasDeclaration(':pong', [':ping'])],
+                                 directory='', subprojects=[], workdir='', project_prefix='')
+        ctx.io = IO()
+        ctx.compile()
+
+        self.assertIsInstance(ctx.find_task_by_name(':valid'), GroupDeclaration)
+
+        with self.assertRaises(TaskNotFoundException):
+            ctx.find_task_by_name(':not-existing')
+
+        with self.assertRaises(TaskDependencyException) as cycle:
+            ctx.find_task_by_name(':ping')
+
+        self.assertIn(':ping -> :pong -> :ping', str(cycle.exception))
+
+        with self.assertRaises(DeclarationException) as exc:
+            ctx.validate_all()
+
+        self.assertIn(':not-existing: Task ":sabotage" is not defined', str(exc.exception))
+        self.assertIn(':ping: Tasks have cyclic dependencies', str(exc.exception))
+        self.assertIn(':pong: Tasks have cyclic dependencies', str(exc.exception))
+        self.assertNotIn(':valid:', str(exc.exception))
+
+    def test_alias_overrides_task_of_the_same_name(self):
+        ctx = ApplicationContext([TaskDeclaration(InitTask()),
+                                  TaskDeclaration(CallableTask(':build', lambda ctx, task: True))],
+                                 [TaskAliasDeclaration(':build', [':init'])],
+                                 directory='', subprojects=[], workdir='', project_prefix='')
+        ctx.io = IO()
+        ctx.compile()
+
+        self.assertIsInstance(ctx.find_task_by_name(':build'), GroupDeclaration)
+        self.assertEqual([':init', ':build'], list(ctx.find_all_tasks().keys()))
+
+    def test_alias_can_wrap_task_of_the_same_name(self):
+        ctx = ApplicationContext([TaskDeclaration(InitTask()),
+                                  TaskDeclaration(CallableTask(':build', lambda ctx, task: True),
+                                                  dependencies=[':init'])],
+                                 [TaskAliasDeclaration(':build', [':build', '--silent'])],
+                                 directory='', subprojects=[], workdir='', project_prefix='')
+        ctx.io = IO()
+        ctx.compile()
+
+        alias = ctx.find_task_by_name(':build')
+
+        self.assertIsInstance(alias, GroupDeclaration)
+        self.assertEqual([':build'], [declaration.to_full_name() for declaration in alias.get_declarations()])
+        self.assertIsInstance(alias.get_declarations()[0], TaskDeclaration)
+        self.assertEqual(['--silent'], alias.get_declarations()[0].get_args())
+
+        ctx.validate_all()
+
+    def test_compile_detects_cyclic_dependencies(self):
+        ctx = ApplicationContext([
+            TaskDeclaration(CallableTask(':build', lambda ctx, task: True), dependencies=[':test']),
+            TaskDeclaration(CallableTask(':test', lambda ctx, task: True), dependencies=[':build'])
+        ], [], directory='', subprojects=[], workdir='', project_prefix='')
+        ctx.io = IO()
+
+        with self.assertRaises(TaskDependencyException) as exc:
+            ctx.compile()
+
+        self.assertIn(':build -> :test -> :build', str(exc.exception))
+
+    def test_compile_detects_not_existing_dependencies(self):
+        ctx = ApplicationContext([
+            TaskDeclaration(CallableTask(':build', lambda ctx, task: True), dependencies=[':fetch'])
+        ], [], directory='', subprojects=[], workdir='', project_prefix='')
+        ctx.io = IO()
+
+        with self.assertRaises(TaskDependencyException) as exc:
+            ctx.compile()
+
+        self.assertIn(':fetch', str(exc.exception))
+
     def test_expand_contexts_expands_one_context(self) -> None:
         # MAIN PROJECT context
         ctx = ApplicationContext(
@@ -244,6 +366,30 @@ class ContextTest(BasicTestingCase):
             self.assertIn('internal-samples/subprojects/testsubproject1', kwargs['workdir'])
             self.assertEqual(':testsubproject1', kwargs['subproject'])
 
+    def test_subprojects_loaded_in_parallel_are_merged_in_order_of_declaration(self):
+        """
+        Subprojects are loaded in threads, but the order of contexts has to be the same as in serial loading.
+        Each subproject reports its loading time
+        """
+
+        def load(workers: str):
+            io = BufferedSystemIO()
+            io.set_log_level('internal')
+
+            with switched_workdir(TESTS_DIR + '/internal-samples/subprojects'), \
+                    self.environment({'RKD_SUBPROJECT_WORKERS': workers}):
+                contexts = ContextFactory(io)._load_context_from_directory('.rkd')
+
+            return [ctx.project_prefix for ctx in contexts], io.get_value()
+
+        serial_order, _ = load('1')
+        parallel_order, logs = load('4')
+
+        self.assertEqual([None, ':testsubproject1', ':testsubproject1:docs', ':testsubproject1:infrastructure',
+                          ':testsubproject1:infrastructure:terraform'], serial_order)
+        self.assertEqual(serial_order, parallel_order)
+        self.assertRegex(logs, r'Subproject :testsubproject1:docs loaded in [0-9.]+ms')
+
     def test_expand_contexts_ignores_subprojects_if_no_any(self):
         ctx = ApplicationContext(
             tasks=[
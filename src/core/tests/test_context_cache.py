@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+from unittest import mock
+from tempfile import TemporaryDirectory
+from rkd.core.context import ContextFactory
+from rkd.core.context_cache import ContextCache, ContextSources
+from rkd.core.api.inputoutput import NullSystemIO
+from rkd.core.api.testing import BasicTestingCase
+from rkd.process import switched_workdir
+
+YAML_MAKEFILE = '''
+version: org.riotkit.rkd/yaml/v1
+env_files:
+    - .rkd/vars.env
+tasks:
+    {name}:
+        steps: echo "Hello"
+'''
+
+
+class TestContextCache(BasicTestingCase):
+    def _create_project(self, workdir: str, task_name: str = ':hello'):
+        os.makedirs(workdir + '/.rkd', exist_ok=True)
+
+        with open(workdir + '/.rkd/makefile.yaml', 'w') as f:
+            f.write(YAML_MAKEFILE.format(name=task_name))
+
+        with open(workdir + '/.rkd/vars.env', 'w') as f:
+            f.write('MOVEMENT=Occupy\n')
+
+    def _create_module(self, directory: str, name: str, description: str):
+        self.addCleanup(lambda: sys.modules.pop(name, None))
+
+        with open(directory + '/' + name + '.py', 'w') as f:
+            f.write('\n'.join([
+                'from rkd.core.api.syntax import TaskDeclaration',
+                'from rkd.core.test import TaskForTesting',
+                '',
+                'class HelperTask(TaskForTesting):',
+                '    def get_description(self) -> str:',
+                '        return "%s"' % description,
+                '',
+                'IMPORTS = [TaskDeclaration(HelperTask())]',
+                '',
+                'def imports():',
+                '    return IMPORTS'
+            ]))
+
+    def _load(self, workdir: str, additional_imports: list = None) -> tuple:
+        """Returns (context, was_loaded_from_cache)"""
+
+        cache = ContextCache(workdir + '/.rkd/.context-cache')
+        load = cache.load
+        loaded = []
+
+        def load_and_remember(key: str):
+            loaded.append(load(key))
+            return loaded[-1]
+
+        cache.load = load_and_remember
+
+        # RKD_PATH is exported by create_unified_context(), so it would grow with each call in the same process
+        with self.environment({'RKD_PATH': ''}):
+            ctx = ContextFactory(NullSystemIO(), cache=cache).create_unified_context(
+                additional_imports=additional_imports
+            )
+
+        return ctx, loaded[0] is not None
+
+    def test_context_is_loaded_from_cache_until_makefile_changes(self):
+        with TemporaryDirectory() as workdir, switched_workdir(workdir):
+            self._create_project(workdir)
+
+            ctx, from_cache = self._load(workdir)
+            self.assertFalse(from_cache)
+            self.assertIn(':hello', ctx.find_all_tasks())
+
+            ctx, from_cache = self._load(workdir)
+            self.assertTrue(from_cache)
+            self.assertIn(':hello', ctx.find_all_tasks())
+
+            # touched only - content is the same
+            os.utime(workdir + '/.rkd/makefile.yaml', (1, 1))
+            self.assertTrue(self._load(workdir)[1])
+
+            self._create_project(workdir, task_name=':bonjour')
+            ctx, from_cache = self._load(workdir)
+
+            self.assertFalse(from_cache)
+            self.assertIn(':bonjour', ctx.find_all_tasks())
+
+    def test_cache_is_invalidated_when_env_file_changes(self):
+        with TemporaryDirectory() as workdir, switched_workdir(workdir):
+            self._create_project(workdir)
+            self._load(workdir)
+
+            with open(workdir + '/.rkd/vars.env', 'w') as f:
+                f.write('MOVEMENT=Indignados\n')
+
+            self.assertFalse(self._load(workdir)[1])
+
+    def test_cache_is_invalidated_when_new_makefile_appears(self):
+        with TemporaryDirectory() as workdir, switched_workdir(workdir):
+            self._create_project(workdir)
+            self._load(workdir)
+
+            with open(workdir + '/.rkd/makefile.py', 'w') as f:
+                f.write('IMPORTS = []')
+
+            self.assertFalse(self._load(workdir)[1])
+
+    def test_cache_is_not_used_when_environment_changes(self):
+        with TemporaryDirectory() as workdir, switched_workdir(workdir):
+            self._create_project(workdir)
+            self._load(workdir)
+
+            with self.environment({'RKD_TEST_VALUE': 'Plaza del Sol'}):
+                self.assertFalse(self._load(workdir)[1])
+
+    def test_context_with_classes_defined_in_makefile_is_not_cached(self):
+        with TemporaryDirectory() as workdir, switched_workdir(workdir):
+            os.mkdir(workdir + '/.rkd')
+
+            with open(workdir + '/.rkd/makefile.py', 'w') as f:
+                f.write('\n'.join([
+                    'from rkd.core.api.syntax import TaskDeclaration',
+                    'from rkd.core.test import TaskForTesting',
+                    '',
+                    'class MakefileTask(TaskForTesting):',
+                    '    pass',
+                    '',
+                    'IMPORTS = [TaskDeclaration(MakefileTask())]'
+                ]))
+
+            self._load(workdir)
+
+            self.assertFalse(self._load(workdir)[1])
+            self.assertFalse(os.path.exists(workdir + '/.rkd/.context-cache'))
+
+    def test_cache_is_invalidated_when_module_imported_by_makefile_changes(self):
+        with TemporaryDirectory() as workdir, switched_workdir(workdir):
+            os.mkdir(workdir + '/.rkd')
+            self._create_module(workdir + '/.rkd', 'rkd_test_cache_helpers', 'Bread')
+
+            with open(workdir + '/.rkd/makefile.py', 'w') as f:
+                f.write('from rkd_test_cache_helpers import IMPORTS\n')
+
+            self._load(workdir)
+            self.assertTrue(self._load(workdir)[1])
+
+            self._create_module(workdir + '/.rkd', 'rkd_test_cache_helpers', 'Roses')
+            self.assertFalse(self._load(workdir)[1])
+
+    def test_python_paths_are_added_once_on_cache_hits(self):
+        with TemporaryDirectory() as workdir, switched_workdir(workdir):
+            os.mkdir(workdir + '/.rkd')
+            self._create_module(workdir + '/.rkd', 'rkd_test_cache_paths', 'Bread')
+            self.addCleanup(setattr, sys, 'path', list(sys.path))
+
+            with open(workdir + '/.rkd/makefile.py', 'w') as f:
+                f.write('from rkd_test_cache_paths import IMPORTS\n')
+
+            self._load(workdir)
+            self.assertTrue(self._load(workdir)[1])
+            self.assertTrue(self._load(workdir)[1])
+
+            self.assertEqual(1, sys.path.count(workdir + '/.rkd'))
+
+    def test_cache_is_invalidated_when_imported_plugin_changes(self):
+        with TemporaryDirectory() as workdir, TemporaryDirectory() as plugins_dir, switched_workdir(workdir):
+            self._create_project(workdir)
+            self._create_module(plugins_dir, 'rkd_test_cache_plugin', 'Bread')
+            sys.path.append(plugins_dir)
+            self.addCleanup(lambda: sys.path.remove(plugins_dir))
+
+            self._load(workdir, additional_imports=['rkd_test_cache_plugin'])
+            self.assertTrue(self._load(workdir, additional_imports=['rkd_test_cache_plugin'])[1])
+
+            self._create_module(plugins_dir, 'rkd_test_cache_plugin', 'Roses')
+            self.assertFalse(self._load(workdir, additional_imports=['rkd_test_cache_plugin'])[1])
+
+    def test_cache_is_disabled_on_python_without_reducer_override(self):
+        cache = ContextCache('.rkd/.context-cache')
+
+        with mock.patch.object(sys, 'version_info', (3, 7, 9)):
+            self.assertFalse(cache.is_enabled())
+
+        self.assertTrue(cache.is_enabled())
+
+    def test_cache_is_not_created_without_rkd_directory(self):
+        with TemporaryDirectory() as workdir, switched_workdir(workdir):
+            ContextFactory(NullSystemIO(), cache=ContextCache('.rkd/.context-cache')).create_unified_context()
+
+            self.assertEqual([], os.listdir(workdir))
+
+
+class TestContextSources(BasicTestingCase):
+    def test_missing_file_is_valid_as_long_as_it_does_not_exist(self):
+        with TemporaryDirectory() as workdir:
+            sources = ContextSources()
+            sources.observe(workdir + '/makefile.yml')
+
+            self.assertTrue(sources.is_up_to_date())
+
+            with open(workdir + '/makefile.yml', 'w') as f:
+                f.write('')
+
+            self.assertFalse(sources.is_up_to_date())
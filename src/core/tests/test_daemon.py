@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import subprocess
+from tempfile import TemporaryDirectory
+from rkd.core.api.testing import BasicTestingCase
+
+MAKEFILE = '''
+version: org.riotkit.rkd/yaml/v1
+tasks:
+    :hello:
+        steps: echo "Hello from {name}, socket=$RKD_DAEMON_SOCKET"
+'''
+
+
+class TestDaemon(BasicTestingCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.workdir = TemporaryDirectory()
+        os.mkdir(self.workdir.name + '/.rkd')
+        self._write_makefile('Rojava')
+
+        self.env = dict(os.environ)
+        self.env['RKD_DAEMON_SOCKET'] = '.rkd/daemon.sock'
+
+        self.daemon = subprocess.Popen([sys.executable, '-m', 'rkd.core', '--server'], cwd=self.workdir.name,
+                                       env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        for _ in range(0, 200):
+            if os.path.exists(self.workdir.name + '/.rkd/daemon.sock'):
+                break
+
+            time.sleep(0.05)
+
+    def tearDown(self) -> None:
+        self.daemon.terminate()
+        self.daemon.wait(timeout=10)
+        self.workdir.cleanup()
+        super().tearDown()
+
+    def _write_makefile(self, name: str):
+        with open(self.workdir.name + '/.rkd/makefile.yaml', 'w') as f:
+            f.write(MAKEFILE.format(name=name))
+
+    def _invoke(self, args: list) -> tuple:
+        process = subprocess.run([sys.executable, '-m', 'rkd.core'] + args, cwd=self.workdir.name, env=self.env,
+                                 stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=60)
+
+        return process.stdout.decode('utf-8'), process.returncode
+
+    def test_invocation_is_executed_by_daemon(self):
+        out, exit_code = self._invoke([':hello'])
+
+        # daemon exports absolute path of its socket for nested calls
+        self.assertIn('Hello from Rojava, socket=' + self.workdir.name + '/.rkd/daemon.sock', out)
+        self.assertEqual(0, exit_code)
+
+    def test_exit_code_is_passed_to_client(self):
+        self.assertEqual(1, self._invoke([':sh', '-c', 'exit 3'])[1])
+        self.assertEqual(127, self._invoke([':not-existing'])[1])
+
+    def test_changed_makefile_is_loaded_again(self):
+        self._invoke([':hello'])
+        self._write_makefile('Chiapas')
+
+        self.assertIn('Hello from Chiapas', self._invoke([':hello'])[0])
+
+    def test_makefile_is_executed_only_by_invocations_and_loaded_once(self):
+        """Daemon keeps the context sent back by the first invocation, without executing the project code itself"""
+
+        os.unlink(self.workdir.name + '/.rkd/makefile.yaml')
+
+        with open(self.workdir.name + '/.rkd/makefile.py', 'w') as f:
+            f.write('\n'.join([
+                'import os',
+                'from rkd.core.api.syntax import TaskAliasDeclaration',
+                '',
+                'with open(os.path.dirname(__file__) + "/loaded-by.txt", "a") as f:',
+                '    f.write(str(os.getpid()) + "\\n")',
+                '',
+                'TASKS = [TaskAliasDeclaration(":print", [":sh", "-c", "echo Printed"])]'
+            ]))
+
+        self.assertIn('Printed', self._invoke([':print'])[0])
+        self.assertIn('Printed', self._invoke([':print'])[0])
+
+        with open(self.workdir.name + '/.rkd/loaded-by.txt') as f:
+            loaded_by = f.read().split()
+
+        self.assertEqual(1, len(loaded_by))
+        self.assertNotEqual(str(self.daemon.pid), loaded_by[0])
+
+    def test_client_executes_invocation_by_itself_when_daemon_is_not_running(self):
+        self.daemon.terminate()
+        self.daemon.wait(timeout=10)
+
+        out, exit_code = self._invoke([':hello'])
+
+        self.assertIn('Hello from Rojava, socket=.rkd/daemon.sock', out)
+        self.assertEqual(0, exit_code)
+        self.assertFalse(os.path.exists(self.workdir.name + '/.rkd/daemon.sock'))
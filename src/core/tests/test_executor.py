@@ -50,19 +50,27 @@ class TestOneByOneExecutor(BasicTestingCase):
 
         # mock to get results instead of real action
         executor._execute_as_forked_process = lambda *args, **kwargs: expectations.append('executor::_execute_as_forked_process')
+        executor._execute_in_fork = lambda *args, **kwargs: expectations.append('executor::_execute_in_fork')
         task.execute = lambda *args, **kwargs: expectations.append('task::execute')
 
         with self.subTest('Will fork'):
             expectations = []
             task.should_fork = lambda: True
-            executor._execute_directly_or_forked('', task, temp, ctx)
+            executor._execute_directly_or_forked('', task, ctx)
+
+            self.assertEqual(['executor::_execute_in_fork'], expectations)
+
+        with self.subTest('Will fork as other user'):
+            expectations = []
+            task.should_fork = lambda: True
+            executor._execute_directly_or_forked('root', task, ctx)
 
             self.assertEqual(['executor::_execute_as_forked_process'], expectations)
 
         with self.subTest('Will not fork'):
             expectations = []
             task.should_fork = lambda: False
-            executor._execute_directly_or_forked('', task, temp, ctx)
+            executor._execute_directly_or_forked('', task, ctx)
 
             self.assertEqual(['task::execute'], expectations)
 
@@ -75,7 +83,7 @@ class TestOneByOneExecutor(BasicTestingCase):
         task.should_fork = ret_true
 
         with io.capture_descriptors(stream=string_io, enable_standard_out=False):
-            executor._execute_as_forked_process('', task, temp, ctx)
+            executor._execute_as_forked_process('', task, ctx)
 
         self.assertIn('Hello world from :test task', string_io.getvalue())
 
@@ -88,7 +96,7 @@ class TestOneByOneExecutor(BasicTestingCase):
         task.get_become_as = ret_invalid_user
 
         with io.capture_descriptors(stream=string_io, enable_standard_out=False):
-            executor._execute_as_forked_process('', task, temp, ctx)
+            executor._execute_as_forked_process('', task, ctx)
 
         self.assertIn('Unknown user "invalid-user-there"', string_io.getvalue())
 
@@ -103,7 +111,7 @@ class TestOneByOneExecutor(BasicTestingCase):
         task.should_fork = lambda: True
 
         with io.capture_descriptors(stream=string_io, enable_standard_out=False):
-            executor._execute_as_forked_process('', task, temp, ctx)
+            executor._execute_as_forked_process('', task, ctx)
 
         self.assertIn('Pickle trace: ["[val type=TaskForTesting].should_fork', string_io.getvalue())
         self.assertIn('Cannot fork, serialization failed. Hint: Tasks that are using internally' +
@@ -120,9 +128,22 @@ class TestOneByOneExecutor(BasicTestingCase):
         task.should_fork = ret_true
 
         with io.capture_descriptors(stream=string_io, enable_standard_out=False):
-            executor._execute_as_forked_process('', task, temp, ctx)
+            executor._execute_as_forked_process('', task, ctx)
 
         self.assertIn('9 Aug 2014 Michael Brown, an unarmed Black teenager, ' +
                       'was killed by a white police officer in Ferguson, Missouri, ' +
                       'sparking mass protests across the US.',
                       string_io.getvalue())
+
+    def test_execute_in_fork_supports_not_serializable_tasks(self):
+        """Lambdas and inner-methods cannot be pickled, but fork() does not need to serialize the task"""
+
+        string_io, task, executor, io, ctx, temp = self._prepare_test_for_forking_process()
+        task.execute = lambda context: print('Hello from pid={}'.format(os.getpid())) is None
+
+        with io.capture_descriptors(stream=string_io, enable_standard_out=False):
+            result = executor._execute_in_fork(task, ctx)
+
+        self.assertTrue(result)
+        self.assertIn('Hello from pid=', string_io.getvalue())
+        self.assertNotIn('Hello from pid={}'.format(os.getpid()), string_io.getvalue())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import os
+import tarfile
+from io import BytesIO
+from unittest import mock
+from tempfile import TemporaryDirectory
+from rkd.core.execution.cache import TaskResultCache
+from rkd.core.execution.results import ProgressObserver
+from rkd.core.api.syntax import TaskDeclaration
+from rkd.core.api.inputoutput import BufferedSystemIO
+from rkd.core.api.testing import BasicTestingCase
+from rkd.core.standardlib.core import CallableTask
+from rkd.core import env
+
+
+class TestTaskResultCache(BasicTestingCase):
+    @staticmethod
+    def _create_declaration(outputs: list) -> TaskDeclaration:
+        return TaskDeclaration(CallableTask(':build', lambda ctx, task: True), outputs=outputs)
+
+    def test_outputs_and_log_are_restored(self):
+        with TemporaryDirectory() as cache_dir, TemporaryDirectory() as workdir:
+            os.mkdir(workdir + '/dist')
+
+            with open(workdir + '/dist/program.bin', 'w') as f:
+                f.write('Confederacion Nacional del Trabajo')
+
+            with open(workdir + '/task.log', 'w') as f:
+                f.write('Building...')
+
+            cache = TaskResultCache(cache_dir, max_size=0)
+            declaration = self._create_declaration(outputs=['dist/'])
+
+            self.assertTrue(cache.store(declaration, workdir, 'abcdef', workdir + '/task.log'))
+
+            # restoring replaces the output entirely - files not present in cache are removed
+            with open(workdir + '/dist/program.bin', 'w') as f:
+                f.write('Modified')
+
+            with open(workdir + '/dist/leftover.bin', 'w') as f:
+                f.write('')
+
+            self.assertEqual('Building...', cache.restore(declaration, workdir, 'abcdef'))
+            self.assertEqual(['program.bin'], os.listdir(workdir + '/dist'))
+
+            with open(workdir + '/dist/program.bin', 'r') as f:
+                self.assertEqual('Confederacion Nacional del Trabajo', f.read())
+
+    def test_restore_returns_none_on_miss(self):
+        with TemporaryDirectory() as cache_dir:
+            cache = TaskResultCache(cache_dir, max_size=0)
+
+            self.assertIsNone(cache.restore(self._create_declaration(outputs=['dist/']), cache_dir, 'non-existing'))
+
+    def test_truncated_entry_is_a_miss_and_outputs_are_kept(self):
+        with TemporaryDirectory() as cache_dir, TemporaryDirectory() as workdir:
+            os.mkdir(workdir + '/dist')
+
+            with open(workdir + '/dist/program.bin', 'w') as f:
+                f.write('Solidaridad Obrera' * 1000)
+
+            cache = TaskResultCache(cache_dir, max_size=0)
+            declaration = self._create_declaration(outputs=['dist/'])
+            cache.store(declaration, workdir, 'abcdef', '')
+
+            entry_path = cache_dir + '/ab/abcdef.tar'
+
+            with open(entry_path, 'r+b') as f:
+                f.truncate(2048)
+
+            self.assertIsNone(cache.restore(declaration, workdir, 'abcdef'))
+            self.assertEqual(['program.bin'], os.listdir(workdir + '/dist'))
+
+    def test_entry_with_path_outside_of_workdir_is_not_extracted(self):
+        with TemporaryDirectory() as cache_dir, TemporaryDirectory() as parent_dir:
+            workdir = parent_dir + '/workdir'
+            os.mkdir(workdir)
+            os.mkdir(cache_dir + '/ab')
+
+            with tarfile.open(cache_dir + '/ab/abcdef.tar', 'w') as archive:
+                info = tarfile.TarInfo('outputs/../escaped')
+                info.size = 4
+                archive.addfile(info, BytesIO(b'evil'))
+
+            cache = TaskResultCache(cache_dir, max_size=0)
+
+            # Python versions without tarfile.data_filter
+            with mock.patch('rkd.core.execution.cache.hasattr', return_value=False, create=True):
+                self.assertIsNone(cache.restore(self._create_declaration(outputs=['dist/']), workdir, 'abcdef'))
+
+            self.assertFalse(os.path.exists(parent_dir + '/escaped'))
+
+    def test_entry_evicted_during_restore_is_still_restored(self):
+        with TemporaryDirectory() as cache_dir, TemporaryDirectory() as workdir:
+            with open(workdir + '/program.bin', 'w') as f:
+                f.write('FAI')
+
+            cache = TaskResultCache(cache_dir, max_size=0)
+            declaration = self._create_declaration(outputs=['program.bin'])
+            cache.store(declaration, workdir, 'abcdef', '')
+
+            with mock.patch('rkd.core.execution.cache.os.utime', side_effect=FileNotFoundError):
+                self.assertEqual('', cache.restore(declaration, workdir, 'abcdef'))
+
+            self.assertTrue(os.path.exists(workdir + '/program.bin'))
+
+    def test_task_with_missing_output_is_not_stored(self):
+        with TemporaryDirectory() as cache_dir, TemporaryDirectory() as workdir:
+            cache = TaskResultCache(cache_dir, max_size=0)
+
+            self.assertFalse(cache.store(self._create_declaration(outputs=['dist/']), workdir, 'abcdef', ''))
+            self.assertEqual([], os.listdir(cache_dir))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        with TemporaryDirectory() as cache_dir, TemporaryDirectory() as workdir:
+            with open(workdir + '/output.bin', 'wb') as f:
+                f.write(b'x' * 1024 * 8)
+
+            declaration = self._create_declaration(outputs=['output.bin'])
+            unlimited_cache = TaskResultCache(cache_dir, max_size=0)
+
+            for num, key in enumerate(['aa1', 'bb2', 'cc3']):
+                unlimited_cache.store(declaration, workdir, key, '')
+                os.utime(cache_dir + '/' + key[0:2] + '/' + key + '.tar', (num, num))
+
+            # "aa1" is the oldest, but was just used
+            unlimited_cache.restore(declaration, workdir, 'aa1')
+
+            entry_size = os.path.getsize(cache_dir + '/aa/aa1.tar')
+            TaskResultCache(cache_dir, max_size=entry_size * 2).evict()
+
+            self.assertTrue(os.path.isfile(cache_dir + '/aa/aa1.tar'))
+            self.assertFalse(os.path.isfile(cache_dir + '/bb/bb2.tar'))
+            self.assertTrue(os.path.isfile(cache_dir + '/cc/cc3.tar'))
+
+    def test_empty_directory_disables_cache(self):
+        self.assertFalse(TaskResultCache('', max_size=0).is_enabled())
+        self.assertTrue(TaskResultCache('.rkd/cache', max_size=0).is_enabled())
+
+    def test_max_size_is_parsed_with_unit(self):
+        for value, expected in {'512M': 512 * 1024 * 1024, '2G': 2 * 1024 ** 3, '1000': 1000, '': 0}.items():
+            with self.subTest(value), self.environment({'RKD_CACHE_MAX_SIZE': value}):
+                self.assertEqual(expected, env.cache_max_size())
+
+
+class TestCacheStatistics(BasicTestingCase):
+    def test_hits_and_misses_are_reported_and_imported_from_workers(self):
+        io = BufferedSystemIO()
+        observer = ProgressObserver(io)
+        worker_observer = ProgressObserver(BufferedSystemIO())
+
+        observer.task_restored_from_cache(TaskDeclaration(CallableTask(':build', lambda ctx, task: True)), None)
+        worker_observer.task_cache_missed(TaskDeclaration(CallableTask(':test', lambda ctx, task: True)))
+
+        observer.import_cache_stats(worker_observer.export_cache_stats())
+        observer.execution_finished()
+
+        self.assertEqual((1, 1), observer.count_cache_hits_and_misses())
+        self.assertIn('Cache: 1 hits, 1 misses', io.get_value())
+        self.assertFalse(observer.is_at_least_one_task_failing())
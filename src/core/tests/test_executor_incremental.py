@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+import os
+from tempfile import TemporaryDirectory
+from rkd.core.execution.incremental import UpToDateChecker
+from rkd.core.execution.cache import TaskResultCache
+from rkd.core.execution.results import ProgressObserver
+from rkd.core.execution.executor import OneByOneTaskExecutor
+from rkd.core.context import ApplicationContext
+from rkd.core.argparsing.model import ArgumentBlock
+from rkd.core.api.syntax import TaskDeclaration
+from rkd.core.api.inputoutput import BufferedSystemIO
+from rkd.core.api.testing import BasicTestingCase
+from rkd.core.standardlib.core import CallableTask
+
+
+class TestUpToDateChecker(BasicTestingCase):
+    def _create_declaration(self, workdir: str, inputs: list = None, outputs: list = None) -> TaskDeclaration:
+        return TaskDeclaration(CallableTask(':build', lambda ctx, task: True), workdir=workdir,
+                               inputs=inputs, outputs=outputs)
+
+    def test_fingerprint_changes_when_input_file_content_changes(self):
+        with TemporaryDirectory() as workdir:
+            with open(workdir + '/input.txt', 'w') as f:
+                f.write('Mujeres Libres')
+
+            checker = UpToDateChecker(workdir + '/.rkd/state')
+            declaration = self._create_declaration(workdir, inputs=['*.txt'])
+            fingerprint = checker.calculate_fingerprint(declaration, workdir, {})
+
+            self.assertEqual(fingerprint, checker.calculate_fingerprint(declaration, workdir, {}))
+
+            with open(workdir + '/input.txt', 'w') as f:
+                f.write('Solidaridad Obrera')
+
+            self.assertNotEqual(fingerprint, checker.calculate_fingerprint(declaration, workdir, {}))
+
+    def test_fingerprint_changes_when_new_input_file_appears(self):
+        with TemporaryDirectory() as workdir:
+            os.mkdir(workdir + '/src')
+
+            checker = UpToDateChecker(workdir + '/.rkd/state')
+            declaration = self._create_declaration(workdir, inputs=['src/'])
+            fingerprint = checker.calculate_fingerprint(declaration, workdir, {})
+
+            with open(workdir + '/src/new.py', 'w') as f:
+                f.write('')
+
+            self.assertNotEqual(fingerprint, checker.calculate_fingerprint(declaration, workdir, {}))
+
+    def test_fingerprint_changes_when_arguments_change(self):
+        with TemporaryDirectory() as workdir:
+            checker = UpToDateChecker(workdir + '/.rkd/state')
+            declaration = self._create_declaration(workdir, inputs=['*.txt'])
+
+            self.assertNotEqual(
+                checker.calculate_fingerprint(declaration, workdir, {'target': 'x86_64'}),
+                checker.calculate_fingerprint(declaration, workdir, {'target': 'arm64'})
+            )
+
+            # --rerun does not influence the result of the task
+            self.assertEqual(
+                checker.calculate_fingerprint(declaration, workdir, {'rerun': True}),
+                checker.calculate_fingerprint(declaration, workdir, {'rerun': False})
+            )
+
+    def test_task_is_not_up_to_date_when_output_is_missing(self):
+        with TemporaryDirectory() as workdir:
+            checker = UpToDateChecker(workdir + '/.rkd/state')
+            declaration = self._create_declaration(workdir, outputs=['dist/'])
+            fingerprint = checker.calculate_fingerprint(declaration, workdir, {})
+
+            checker.remember_success(declaration, fingerprint)
+            self.assertFalse(checker.is_up_to_date(declaration, workdir, fingerprint))
+
+            os.mkdir(workdir + '/dist')
+            self.assertTrue(checker.is_up_to_date(declaration, workdir, fingerprint))
+
+            checker.forget(declaration)
+            self.assertFalse(checker.is_up_to_date(declaration, workdir, fingerprint))
+
+
+class TestIncrementalExecution(BasicTestingCase):
+    def test_task_is_skipped_when_inputs_did_not_change(self):
+        executions = []
+
+        def build(ctx, task) -> bool:
+            executions.append(ctx.get_arg('--rerun'))
+            return True
+
+        with TemporaryDirectory() as workdir:
+            with open(workdir + '/input.txt', 'w') as f:
+                f.write('CNT-AIT')
+
+            ctx = ApplicationContext([], [], '', subprojects=[], workdir='', project_prefix='')
+            ctx.io = BufferedSystemIO()
+            observer = ProgressObserver(ctx.io)
+            executor = OneByOneTaskExecutor(ctx, observer)
+            executor._up_to_date = UpToDateChecker(workdir + '/.rkd/state')
+            executor._cache = TaskResultCache('', max_size=0)
+
+            declaration = TaskDeclaration(CallableTask(':build', build), workdir=workdir, inputs=['input.txt'])\
+                .with_connected_block(ArgumentBlock([':build']))
+
+            executor.execute(declaration, task_num=1)
+            executor.execute(declaration, task_num=2)
+            self.assertEqual([False], executions)
+            self.assertIn('is up-to-date, skipping', ctx.io.get_value())
+
+            executor.execute(declaration, task_num=3, args=['--rerun'])
+            self.assertEqual([False, True], executions)
+
+            with open(workdir + '/input.txt', 'w') as f:
+                f.write('FAU')
+
+            executor.execute(declaration, task_num=4)
+            self.assertEqual([False, True, False], executions)
+            self.assertFalse(observer.is_at_least_one_task_failing())
+
+    def test_outputs_are_restored_from_cache_instead_of_executing_task(self):
+        executions = []
+
+        def build(ctx, task) -> bool:
+            executions.append(True)
+
+            # task is executed inside its workdir
+            with open('out.txt', 'w') as f:
+                f.write('built')
+
+            return True
+
+        with TemporaryDirectory() as workdir:
+            ctx = ApplicationContext([], [], '', subprojects=[], workdir='', project_prefix='')
+            ctx.io = BufferedSystemIO()
+            observer = ProgressObserver(ctx.io)
+            executor = OneByOneTaskExecutor(ctx, observer)
+            executor._up_to_date = UpToDateChecker(workdir + '/.rkd/state')
+            executor._cache = TaskResultCache(workdir + '/.rkd/cache', max_size=0)
+
+            declaration = TaskDeclaration(CallableTask(':build', build), workdir=workdir, outputs=['out.txt'])\
+                .with_connected_block(ArgumentBlock([':build']))
+
+            executor.execute(declaration, task_num=1)
+
+            # eg. a fresh checkout on other machine sharing the same cache directory
+            os.unlink(workdir + '/out.txt')
+            executor._up_to_date.forget(declaration)
+
+            executor.execute(declaration, task_num=2)
+
+            self.assertEqual([True], executions)
+            self.assertIn('was restored from cache', ctx.io.get_value())
+
+            with open(workdir + '/out.txt', 'r') as f:
+                self.assertEqual('built', f.read())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import os
+from time import time
+from tempfile import TemporaryDirectory
+from rkd.core.api.testing import FunctionalTestingCase
+from rkd.core.execution.forking import ForkedProcess
+
+
+class TestParallelExecutor(FunctionalTestingCase):
+    """
+    Functional tests of ParallelTaskExecutor - RKD is bootstrapped with --jobs switch
+    """
+
+    def test_independent_tasks_are_executed_concurrently(self):
+        started_at = time()
+
+        full_output, exit_code = self.run_and_capture_output([
+            '--jobs', '3',
+            ':sh', '-c', 'sleep 1; echo "Cipriano Mera"',
+            ':sh', '-c', 'sleep 1; echo "Lucia Sanchez Saornil"',
+            ':sh', '-c', 'sleep 1; echo "Federica Montseny"'
+        ])
+
+        self.assertLess(time() - started_at, 2.5)
+        self.assertIn('Cipriano Mera', full_output)
+        self.assertIn('Lucia Sanchez Saornil', full_output)
+        self.assertIn('Federica Montseny', full_output)
+        self.assertIn('Successfully executed 4 tasks.', full_output)
+        self.assertEqual(0, exit_code)
+
+    def test_jobs_are_read_from_environment(self):
+        with self.environment({'RKD_JOBS': '2'}):
+            started_at = time()
+
+            full_output, exit_code = self.run_and_capture_output([
+                ':sh', '-c', 'sleep 1',
+                ':sh', '-c', 'sleep 1'
+            ])
+
+        self.assertLess(time() - started_at, 1.9)
+        self.assertEqual(0, exit_code)
+
+    def test_failure_stops_scheduling_of_next_blocks(self):
+        full_output, exit_code = self.run_and_capture_output([
+            '--jobs', '2',
+            ':sh', '-c', 'exit 1',
+            ':sh', '-c', 'sleep 1',
+            ':sh', '-c', 'echo "Should not be executed"'
+        ])
+
+        self.assertNotIn(':sh -c echo "Should not be executed"', full_output)
+        self.assertIn('Execution failed with 1 failed tasks of 3 total tasks', full_output)
+        self.assertEqual(1, exit_code)
+
+    def test_keep_going_allows_to_schedule_next_blocks(self):
+        full_output, exit_code = self.run_and_capture_output([
+            '--jobs', '2',
+            ':sh', '-c', 'exit 1', '--keep-going',
+            ':sh', '-c', 'sleep 1',
+            ':sh', '-c', 'echo "Durruti Column"'
+        ])
+
+        self.assertIn('Durruti Column', full_output)
+        self.assertIn('Execution failed with 1 failed tasks of 4 total tasks', full_output)
+        self.assertEqual(1, exit_code)
+
+    def test_retry_block_modifier_is_respected_inside_worker(self):
+        """A task fails for the first time, then succeeds when retried - all inside a worker process"""
+
+        with TemporaryDirectory() as tmp_dir:
+            marker = tmp_dir + '/marker'
+
+            full_output, exit_code = self.run_and_capture_output([
+                '--jobs', '2',
+                '{@retry 1}', ':sh', '-c', 'if [[ ! -f {path} ]]; then touch {path}; exit 1; fi'.format(path=marker),
+                '{/@}',
+                ':sh', '-c', 'echo "CNT"'
+            ])
+
+        self.assertIn('was retried', full_output)
+        self.assertIn('CNT', full_output)
+        self.assertEqual(0, exit_code)
+
+    def test_killed_worker_marks_its_tasks_as_failed_and_other_workers_are_awaited(self):
+        with TemporaryDirectory() as tmp_dir:
+            with open(tmp_dir + '/makefile.py', 'w') as f:
+                f.write("import os, signal\n"
+                        "from rkd.core.api.syntax import TaskDeclaration\n"
+                        "from rkd.core.standardlib import CallableTask\n"
+                        "IMPORTS = [TaskDeclaration(CallableTask(':oom', "
+                        "lambda ctx, task: os.kill(os.getpid(), signal.SIGKILL)))]\n")
+
+            with self.environment({'RKD_PATH': tmp_dir}):
+                full_output, exit_code = self.run_and_capture_output([
+                    '--jobs', '2',
+                    ':sh', '-c', 'sleep 1; echo "Still awaited"',
+                    ':oom'
+                ])
+
+        self.assertIn('Tasks :oom were lost', full_output)
+        self.assertIn('Still awaited', full_output)
+        self.assertIn('Execution failed with 1 failed tasks', full_output)
+        self.assertEqual(1, exit_code)
+
+
+class TestForkedProcess(FunctionalTestingCase):
+    def test_result_is_returned_and_exception_reraised(self):
+        self.assertEqual(4, ForkedProcess(lambda: 2 + 2).start().get_result())
+
+        def raises():
+            raise KeyError('Not in this process')
+
+        with self.assertRaises(KeyError):
+            ForkedProcess(raises).start().get_result()
+
+    def test_child_does_not_modify_parent_process_state(self):
+        def change_workdir():
+            os.chdir('/tmp')
+            return os.getcwd()
+
+        cwd = os.getcwd()
+
+        self.assertEqual('/tmp', ForkedProcess(change_workdir).start().get_result())
+        self.assertEqual(cwd, os.getcwd())
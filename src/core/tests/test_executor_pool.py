@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+import os
+import re
+from io import StringIO
+from unittest import mock
+from rkd.core.execution.results import ProgressObserver
+from rkd.core.execution.executor import OneByOneTaskExecutor
+from rkd.core.execution.forking import ForkedProcess
+from rkd.core.execution.pool import WorkerPool, WorkerProcessError, WorkerOutputRelay
+from rkd.core.execution.serialization import FrameDecoder, encode_frame
+from rkd.core.context import ApplicationContext
+from rkd.core.test import get_test_declaration
+from rkd.core.test import TaskForTestingProcessInformation
+from rkd.core.test import TaskForTestingExitingProcess
+from rkd.core.api.inputoutput import BufferedSystemIO, SystemIO
+from rkd.core.api.inputoutput import IO
+from rkd.core.api.contract import ExecutionContext
+from rkd.core.api.testing import BasicTestingCase
+from rkd.process import switched_workdir
+
+
+class TestWorkerPool(BasicTestingCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        container = ApplicationContext([], [], '', subprojects=[], workdir='', project_prefix='')
+        container.io = BufferedSystemIO()
+
+        self.executor = OneByOneTaskExecutor(container, observer=ProgressObserver(SystemIO()))
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+        super().tearDown()
+
+    def _execute_in_worker(self, task) -> str:
+        io = IO()
+        task._io = io
+        out = StringIO()
+        ctx = ExecutionContext(get_test_declaration(task))
+
+        with io.capture_descriptors(stream=out, enable_standard_out=False):
+            self.executor._execute_as_forked_process('', task, ctx)
+
+        return out.getvalue()
+
+    def test_worker_process_is_reused_between_tasks(self):
+        first = self._execute_in_worker(TaskForTestingProcessInformation())
+        second = self._execute_in_worker(TaskForTestingProcessInformation())
+
+        first_pid = re.findall('pid=([0-9]+)', first)[0]
+
+        self.assertNotEqual(str(os.getpid()), first_pid)
+        self.assertEqual(first_pid, re.findall('pid=([0-9]+)', second)[0])
+
+    def test_environment_and_workdir_changes_are_passed_to_running_worker(self):
+        self._execute_in_worker(TaskForTestingProcessInformation())
+
+        with self.environment({'RKD_TEST_VALUE': 'Anarchist Black Cross'}), switched_workdir('/tmp'):
+            out = self._execute_in_worker(TaskForTestingProcessInformation())
+
+        self.assertIn('cwd=/tmp, RKD_TEST_VALUE=Anarchist Black Cross', out)
+
+    def test_task_in_worker_is_attached_to_a_terminal(self):
+        """Tasks executed as other user could be interactive (eg. ask for a confirmation), as before the pool"""
+
+        out = self._execute_in_worker(TaskForTestingProcessInformation())
+
+        self.assertIn('stdin_tty=True, stdout_tty=True', out)
+
+    def test_output_that_looks_like_a_control_sequence_is_kept_within_its_job(self):
+        """End of a job is signaled through the socket - nothing, that a task prints, could end its job earlier"""
+
+        with self.environment({'RKD_TEST_VALUE': '\x1b]rkd;job-done\x07 Free them all'}):
+            first = self._execute_in_worker(TaskForTestingProcessInformation())
+
+        # output of the next tasks is long, so it is still being relayed, when their result arrives
+        with self.environment({'RKD_TEST_VALUE': 'Solidarity ' * 1024 * 10}):
+            following = [self._execute_in_worker(TaskForTestingProcessInformation()) for _ in range(0, 3)]
+
+        self.assertIn('Free them all', first)
+        self.assertIn('stdin_tty=True', first)
+
+        for out in following:
+            self.assertNotIn('Free them all', out)
+            self.assertEqual(1, out.count('pid='))
+            self.assertEqual(1, out.count('stdin_tty=True'))
+
+    def test_worker_exiting_during_task_is_reported_and_replaced(self):
+        with self.assertRaises(WorkerProcessError):
+            self._execute_in_worker(TaskForTestingExitingProcess())
+
+        self.assertIn('pid=', self._execute_in_worker(TaskForTestingProcessInformation()))
+
+    def test_workers_are_not_shared_with_forked_process(self):
+        pool = WorkerPool()
+
+        try:
+            parent_worker = pool.get_worker()
+            child_worker_is_other = ForkedProcess(lambda: pool.get_worker() is not parent_worker).start()
+
+            self.assertTrue(child_worker_is_other.get_result())
+            self.assertTrue(parent_worker.is_alive())
+
+        finally:
+            pool.shutdown()
+
+    def test_big_job_frames_are_transferred_through_pipes(self):
+        """Job bigger than a pipe buffer - sent in multiple chunks"""
+
+        value = 'Solidarity ' * 1024 * 100
+
+        # worker is started before - such big environment variable cannot be passed to exec()
+        self._execute_in_worker(TaskForTestingProcessInformation())
+
+        with self.environment({'RKD_TEST_VALUE': value}):
+            out = self._execute_in_worker(TaskForTestingProcessInformation())
+
+        self.assertIn('RKD_TEST_VALUE=' + value, out)
+
+
+class TestWorkerOutputRelay(BasicTestingCase):
+    def test_output_is_relayed_as_is_when_split_between_reads(self):
+        read_fd, write_fd = os.pipe()
+        relay = WorkerOutputRelay(read_fd)
+        out = StringIO()
+        stream = 'Żywię i bronię\n\x1b]rkd;job-done\x07~'.encode('utf-8')
+
+        try:
+            with mock.patch('sys.stdout', out):
+                for position in range(0, len(stream)):
+                    os.write(write_fd, stream[position:position + 1])
+                    relay.relay()
+
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+        self.assertEqual('Żywię i bronię\n\x1b]rkd;job-done\x07~', out.getvalue())
+
+    def test_drain_relays_everything_written_so_far_without_blocking(self):
+        read_fd, write_fd = os.pipe()
+        relay = WorkerOutputRelay(read_fd)
+        out = StringIO()
+
+        try:
+            os.write(write_fd, b'Solidarity ' * 1024)
+
+            with mock.patch('sys.stdout', out):
+                relay.drain()
+
+            self.assertTrue(os.get_blocking(read_fd))
+
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+        self.assertEqual('Solidarity ' * 1024, out.getvalue())
+        self.assertFalse(relay.is_closed)
+
+
+class TestFrameDecoder(BasicTestingCase):
+    def test_frames_are_decoded_from_partial_chunks(self):
+        stream = encode_frame(b'Rojava') + encode_frame(b'') + encode_frame(b'Chiapas')
+        decoder = FrameDecoder()
+        frames = []
+
+        for position in range(0, len(stream)):
+            frames += decoder.feed(stream[position:position + 1])
+
+        self.assertEqual([b'Rojava', b'', b'Chiapas'], frames)
+        self.assertFalse(decoder.has_incomplete_frame())
+
+    def test_incomplete_frame_is_kept_in_buffer(self):
+        decoder = FrameDecoder()
+
+        self.assertEqual([], decoder.feed(encode_frame(b'Exarchia')[0:-1]))
+        self.assertTrue(decoder.has_incomplete_frame())
@@ -254,6 +254,105 @@ class TestFunctional(FunctionalTestingCase):
 
             self.assertIn('Hello world', full_output)
 
+    def test_validate_all_switch_reports_invalid_aliases_without_executing_tasks(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            with open(tempdir + '/makefile.py', 'w') as f:
+                f.write("from rkd.core.api.syntax import TaskAliasDeclaration\n"
+                        "IMPORTS = []\n"
+                        "TASKS = [TaskAliasDeclaration(':strike', [':sh', '-c', 'echo Strike']),\n"
+                        "         TaskAliasDeclaration(':broken', [':not-existing'])]\n")
+
+            with self.environment({'RKD_PATH': tempdir}):
+                with self.subTest('Only used alias is resolved'):
+                    full_output, exit_code = self.run_and_capture_output([':strike'])
+
+                    self.assertIn('Strike', full_output)
+                    self.assertEqual(0, exit_code)
+
+                with self.subTest('All aliases are validated'):
+                    full_output, exit_code = self.run_and_capture_output(['--validate-all'])
+
+                    self.assertIn(':broken: Task ":not-existing" is not defined', full_output)
+                    self.assertEqual(1, exit_code)
+
+    def test_plan_written_with_plan_out_is_executed_with_plan_in(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            with open(tempdir + '/makefile.py', 'w') as f:
+                f.write("from rkd.core.api.syntax import TaskAliasDeclaration\n"
+                        "IMPORTS = []\n"
+                        "TASKS = [TaskAliasDeclaration(':strike', [':sh', '-c', 'echo General strike'])]\n")
+
+            with self.environment({'RKD_PATH': tempdir}):
+                with self.subTest('Plan is written, tasks are not executed'):
+                    full_output, exit_code = self.run_and_capture_output(['--plan-out', tempdir + '/plan.json',
+                                                                          ':strike'])
+
+                    self.assertIn('Execution plan of 2 tasks written to', full_output)
+                    self.assertNotIn('General strike', full_output)
+                    self.assertEqual(0, exit_code)
+
+                with self.subTest('Plan is executed'):
+                    full_output, exit_code = self.run_and_capture_output(['--plan-in', tempdir + '/plan.json'])
+
+                    self.assertIn('General strike', full_output)
+                    self.assertIn('Successfully executed 2 tasks.', full_output)
+                    self.assertEqual(0, exit_code)
+
+                with self.subTest('Error is reported, when the plan cannot be written'):
+                    full_output, exit_code = self.run_and_capture_output(['--plan-out',
+                                                                          tempdir + '/not-existing/plan.json',
+                                                                          ':strike'])
+
+                    self.assertIn('Cannot write execution plan to', full_output)
+                    self.assertNotIn('Traceback', full_output)
+                    self.assertEqual(1, exit_code)
+
+                with self.subTest('Error is reported, when the plan refers to a task that is not defined anymore'):
+                    with open(tempdir + '/plan.json', 'r') as f:
+                        plan = f.read()
+
+                    with open(tempdir + '/plan.json', 'w') as f:
+                        f.write(plan.replace('":strike"', '":not-existing"'))
+
+                    full_output, exit_code = self.run_and_capture_output(['--plan-in', tempdir + '/plan.json'])
+
+                    self.assertIn('Cannot use execution plan', full_output)
+                    self.assertIn('Task ":not-existing" is not defined', full_output)
+                    self.assertNotIn('Traceback', full_output)
+                    self.assertEqual(1, exit_code)
+
+    def test_all_tasks_of_block_body_and_of_rescue_are_executed(self):
+        """
+        Regression check: blocks are tokenized as a whole, before only the first task of a block body was executed
+        """
+
+        with self.subTest('Block body'):
+            full_output, exit_code = self.run_and_capture_output([
+                '{@retry 1}', ':sh', '-c', 'echo Picket', ':sh', '-c', 'echo Occupy', '{/@}'
+            ])
+
+            self.assertIn('Picket', full_output)
+            self.assertIn('Occupy', full_output)
+            self.assertEqual(0, exit_code)
+
+        with self.subTest('@rescue'):
+            full_output, exit_code = self.run_and_capture_output([
+                '{@rescue :sh -c "echo Rollback" :sh -c "echo Notify"}', ':sh', '-c', 'exit 1', '{/@}'
+            ])
+
+            self.assertIn('Rollback', full_output)
+            self.assertIn('Notify', full_output)
+            self.assertEqual(0, exit_code)
+
+    def test_invalid_number_of_jobs_is_reported_without_traceback(self):
+        with self.environment({'RKD_JOBS': 'auto'}):
+            full_output, exit_code = self.run_and_capture_output([':sh', '-c', 'echo Solidarity'])
+
+        self.assertIn('Invalid number of jobs in RKD_JOBS environment variable: "auto"', full_output)
+        self.assertNotIn('Solidarity', full_output)
+        self.assertNotIn('Traceback', full_output)
+        self.assertEqual(1, exit_code)
+
     def test_env_variables_are_recursively_resolved(self):
         """
         :hello:
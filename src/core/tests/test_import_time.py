@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import subprocess
+from tempfile import TemporaryDirectory
+from rkd.core.api.testing import BasicTestingCase
+
+# imported only by tasks or files that need them - every "rkd" invocation would pay for them otherwise
+DEFERRED_MODULES = ['jinja2', 'yaml', 'jsonschema', 'pkg_resources', 'tabulate', 'dotenv', 'distutils']
+
+# in microseconds, measured ~100ms on a developer machine, before deferring the imports it was ~260ms
+IMPORT_TIME_BUDGET = 250000
+
+
+class TestImportTime(BasicTestingCase):
+    @staticmethod
+    def _measure_imports() -> dict:
+        """
+        :return: Top-level module name -> import time in microseconds (own time, without imported modules)
+        """
+
+        with TemporaryDirectory() as workdir:
+            process = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'rkd.core', ':sh', '-c', 'true'],
+                                     cwd=workdir, env=dict(os.environ, RKD_DAEMON_SOCKET=''),
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+
+        imports = {}
+
+        for line in process.stderr.decode('utf-8').splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+
+            own_time, _, name = line[len('import time:'):].split('|')
+            top_level_name = name.strip().split('.')[0]
+            imports[top_level_name] = imports.get(top_level_name, 0) + int(own_time)
+
+        return imports
+
+    def test_heavy_dependencies_are_not_imported_on_startup(self):
+        imports = self._measure_imports()
+
+        self.assertIn('rkd', imports)
+
+        for name in DEFERRED_MODULES:
+            self.assertNotIn(name, imports, msg=f'"{name}" should be imported at the point of use')
+
+    def test_startup_fits_import_time_budget(self):
+        # the best of few runs, to not depend on other processes running in the meantime
+        total = min([sum(self._measure_imports().values()) for _ in range(0, 3)])
+
+        self.assertLess(total, IMPORT_TIME_BUDGET, msg=f'Imports took {total}us on startup of ":sh -c true"')
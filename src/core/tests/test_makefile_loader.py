@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+from tempfile import TemporaryDirectory
+from unittest import mock
+from rkd.core.api.testing import BasicTestingCase
+from rkd.core.api.contract import ExecutionContext
+from rkd.core.api.inputoutput import IO, BufferedSystemIO, SystemIO
+from rkd.core.context import ApplicationContext
+from rkd.core.execution.executor import OneByOneTaskExecutor
+from rkd.core.execution.results import ProgressObserver
+from rkd.core.makefile_loader import load_makefile, get_module_name, is_makefile_module
+from rkd.core.test import get_test_declaration
+
+MAKEFILE = '''
+from rkd.core.test import TaskForTesting
+
+ORIGIN = '{origin}'
+
+
+class WorkerTask(TaskForTesting):
+    def execute(self, context) -> bool:
+        with open('{origin}/executed', 'w') as f:
+            f.write(__name__)
+
+        return True
+'''
+
+
+class TestMakefileLoader(BasicTestingCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._sys_path = list(sys.path)
+
+    def tearDown(self) -> None:
+        sys.path = self._sys_path
+        super().tearDown()
+
+    @staticmethod
+    def _create_makefile(directory: str) -> str:
+        os.mkdir(directory + '/.rkd')
+
+        with open(directory + '/.rkd/makefile.py', 'w') as f:
+            f.write(MAKEFILE.format(origin=directory))
+
+        return directory + '/.rkd/makefile.py'
+
+    def test_makefiles_are_loaded_under_separate_module_names(self):
+        with TemporaryDirectory() as first_dir, TemporaryDirectory() as second_dir:
+            first = load_makefile(self._create_makefile(first_dir))
+            second = load_makefile(self._create_makefile(second_dir))
+
+            self.assertNotEqual(first.__name__, second.__name__)
+            self.assertTrue(is_makefile_module(first.__name__))
+            self.assertIs(first, sys.modules[first.__name__])
+            self.assertIs(second, sys.modules[second.__name__])
+            self.assertEqual(first_dir, first.ORIGIN)
+
+    def test_directory_is_added_to_sys_path_once(self):
+        with TemporaryDirectory() as workdir:
+            makefile_path = self._create_makefile(workdir)
+
+            load_makefile(makefile_path)
+            load_makefile(makefile_path)
+
+            self.assertEqual(1, sys.path.count(workdir + '/.rkd'))
+
+    def test_bytecode_is_cached_in_pycache(self):
+        with TemporaryDirectory() as workdir, mock.patch.object(sys, 'dont_write_bytecode', False):
+            module = load_makefile(self._create_makefile(workdir))
+
+            self.assertEqual(get_module_name(workdir + '/.rkd/makefile.py'), module.__name__)
+            self.assertTrue(os.path.isfile(module.__cached__))
+            self.assertEqual(workdir + '/.rkd/__pycache__', os.path.dirname(module.__cached__))
+
+    def test_task_defined_in_makefile_is_executed_in_worker_process(self):
+        """Worker process imports the makefile module by its name, when unpickling the task"""
+
+        with TemporaryDirectory() as workdir:
+            task = load_makefile(self._create_makefile(workdir)).WorkerTask()
+            task._io = IO()
+
+            container = ApplicationContext([], [], '', subprojects=[], workdir='', project_prefix='')
+            container.io = BufferedSystemIO()
+            executor = OneByOneTaskExecutor(container, observer=ProgressObserver(SystemIO()))
+
+            try:
+                self.assertTrue(executor._execute_as_forked_process('', task, ExecutionContext(
+                    get_test_declaration(task)
+                )))
+            finally:
+                executor.shutdown()
+
+            with open(workdir + '/executed', 'r') as f:
+                self.assertEqual(type(task).__module__, f.read())
@@ -55,6 +55,31 @@ class TestPackaging(BasicTestingCase):
         with mock.patch('sys.path', returns_value=[]):
             self.assertEqual(rkd.core.packaging._get_global_site_packages(), rkd.core.packaging.get_user_site_packages())
 
+    def test_resolver_remembers_lookups_until_rkd_path_changes(self):
+        """Missing files are not looked for again, as long as the lookup scope is the same"""
+
+        resolver = rkd.core.packaging.ResourceResolver()
+        checked = []
+
+        def isfile(path: str) -> bool:
+            checked.append(path)
+            return os.path.isfile(path)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            candidates = resolver.get_candidates('schemas', lambda: [tempdir + '/missing', tempdir + '/schema.json'])
+
+            self.assertIsNone(resolver.find(candidates, isfile))
+
+            with open(tempdir + '/schema.json', 'w') as f:
+                f.write('{}')
+
+            self.assertIsNone(resolver.find(candidates, isfile))
+            self.assertEqual(2, len(checked))
+
+            with self.environment({'RKD_PATH': tempdir}):
+                self.assertEqual(tempdir + '/schema.json', resolver.find(candidates, isfile))
+                self.assertEqual(4, len(checked))
+
     def test_functionally_package_contains_complete_misc_directory(self):
         """
         "misc" directory is essential for RKD to work. There were issues with packaging this directory that contains
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import json
 from typing import Union
 
 from rkd.core.api.inputoutput import IO
@@ -8,9 +9,12 @@ from rkd.core.api.testing import BasicTestingCase
 from rkd.core.context import ApplicationContext
 from rkd.core.resolver import TaskResolver
 from rkd.core.standardlib.shell import ShellCommandTask
+from rkd.core.standardlib.core import CallableTask
 from rkd.core.api.syntax import TaskDeclaration, GroupDeclaration, TaskAliasDeclaration
 from rkd.core.argparsing.model import TaskArguments, ArgumentBlock
 from rkd.core.aliasgroups import parse_alias_groups_from_env
+from rkd.core.execution.plan import ExecutionPlan
+from rkd.core.exception import InvalidExecutionPlanException
 
 
 class TestResolver(BasicTestingCase):
@@ -111,3 +115,143 @@ class TestResolver(BasicTestingCase):
                          .clone_with_tasks([TaskArguments(':bella-ciao:sh', [])])], assertion_callback)
 
         self.assertEqual([':sh'], result_tasks)
+
+    def test_dependencies_are_resolved_before_task_and_only_once(self):
+        """
+        :test depends on :build and :lint, :lint depends on :build
+        Expected order: :build, :lint, :test - each dependency executed once
+        """
+
+        context = ApplicationContext(
+            tasks=[
+                TaskDeclaration(CallableTask(':build', lambda ctx, task: True)),
+                TaskDeclaration(CallableTask(':lint', lambda ctx, task: True), dependencies=[':build']),
+                TaskDeclaration(CallableTask(':test', lambda ctx, task: True), dependencies=[':build', ':lint'])
+            ],
+            aliases=[],
+            directory='',
+            subprojects=[],
+            workdir='',
+            project_prefix=''
+        )
+        context.io = IO()
+        context.compile()
+        result_tasks = []
+
+        def assertion_callback(declaration: TaskDeclaration,
+                               task_num: int,
+                               parent: Union[GroupDeclaration, None] = None,
+                               args: list = []):
+            result_tasks.append(declaration.to_full_name())
+
+        resolver = TaskResolver(context, [])
+        resolver.resolve([
+            ArgumentBlock([':test']).clone_with_tasks([TaskArguments(':test', [])]),
+            ArgumentBlock([':lint']).clone_with_tasks([TaskArguments(':lint', [])])
+        ], assertion_callback)
+
+        # explicitly requested tasks are always executed, dependencies only when were not executed yet
+        self.assertEqual([':build', ':lint', ':test', ':lint'], result_tasks)
+
+    def test_list_dependencies_skips_satisfied_dependencies(self):
+        context = ApplicationContext(
+            tasks=[
+                TaskDeclaration(CallableTask(':build', lambda ctx, task: True)),
+                TaskDeclaration(CallableTask(':lint', lambda ctx, task: True), dependencies=[':build']),
+                TaskDeclaration(CallableTask(':test', lambda ctx, task: True), dependencies=[':lint'])
+            ],
+            aliases=[],
+            directory='',
+            subprojects=[],
+            workdir='',
+            project_prefix=''
+        )
+        context.io = IO()
+        context.compile()
+
+        resolver = TaskResolver(context, [])
+        block = ArgumentBlock([':test']).clone_with_tasks([TaskArguments(':test', [])])
+
+        self.assertEqual([':build', ':lint'], resolver.list_dependencies(block))
+        self.assertEqual([':test'], resolver.list_requested_tasks(block))
+
+        resolver.mark_as_satisfied([':build'])
+        self.assertEqual([':lint'], resolver.list_dependencies(block))
+
+    @staticmethod
+    def _create_context_with_dependencies() -> ApplicationContext:
+        context = ApplicationContext(
+            tasks=[
+                TaskDeclaration(CallableTask(':build', lambda ctx, task: True)),
+                TaskDeclaration(CallableTask(':lint', lambda ctx, task: True), dependencies=[':build']),
+                TaskDeclaration(CallableTask(':docs', lambda ctx, task: True))
+            ],
+            aliases=[TaskAliasDeclaration(':check', [':lint', '--fix', ':docs'])],
+            directory='',
+            subprojects=[],
+            workdir='',
+            project_prefix=''
+        )
+        context.io = IO()
+        context.compile()
+
+        return context
+
+    def test_plan_contains_blocks_waiting_for_blocks_that_execute_their_dependencies(self):
+        resolver = TaskResolver(self._create_context_with_dependencies(), [])
+        plan = resolver.plan([
+            ArgumentBlock([':check']).clone_with_tasks([TaskArguments(':check', [])]),
+            ArgumentBlock([':docs']).clone_with_tasks([TaskArguments(':docs', ['--help'])]),
+            ArgumentBlock([':build']).clone_with_tasks([TaskArguments(':build', [])])
+        ])
+
+        check, docs, build = plan.blocks
+
+        self.assertEqual([(':build', True), (':lint', False), (':docs', False)],
+                         [(planned.declaration.to_full_name(), planned.is_dependency) for planned in check.tasks])
+        self.assertEqual([':check', ':check'], [planned.parent.get_name() for planned in check.tasks[1:]])
+        self.assertEqual(['--fix'], check.tasks[1].args)
+        self.assertIs(check.block, check.tasks[0].declaration.block())
+
+        # :docs is requested twice, it can be executed concurrently - but :build is executed by :check as a dependency
+        self.assertEqual([], docs.waits_for)
+        self.assertEqual([0], build.waits_for)
+        self.assertEqual([':build', ':check', ':docs', ':lint'], plan.list_task_names())
+
+    def test_plan_loaded_from_dict_refers_to_declarations_of_context(self):
+        context = self._create_context_with_dependencies()
+        plan = TaskResolver(context, []).plan([
+            ArgumentBlock([':check']).clone_with_tasks([TaskArguments(':check', [])]),
+            ArgumentBlock([':build']).clone_with_tasks([TaskArguments(':build', [])])
+        ])
+
+        loaded = ExecutionPlan.from_dict(json.loads(json.dumps(plan.to_dict())), context)
+
+        self.assertEqual(plan.to_dict(), loaded.to_dict())
+        self.assertIs(context.find_task_by_name(':check').get_declarations()[0].get_task_to_execute(),
+                      loaded.blocks[0].tasks[1].declaration.get_task_to_execute())
+        self.assertIs(loaded.blocks[1].block, loaded.blocks[1].tasks[0].declaration.block())
+
+    def test_plan_cannot_be_loaded_when_alias_has_changed(self):
+        context = self._create_context_with_dependencies()
+        data = TaskResolver(context, []).plan([
+            ArgumentBlock([':check']).clone_with_tasks([TaskArguments(':check', [])])
+        ]).to_dict()
+
+        data['blocks'][0]['tasks'][2]['position'] = 5
+
+        with self.assertRaises(InvalidExecutionPlanException):
+            ExecutionPlan.from_dict(data, context)
+
+    def test_plan_cannot_be_loaded_when_task_is_not_defined_anymore(self):
+        context = self._create_context_with_dependencies()
+        data = TaskResolver(context, []).plan([
+            ArgumentBlock([':build']).clone_with_tasks([TaskArguments(':build', [])])
+        ]).to_dict()
+
+        data['blocks'][0]['tasks'][0]['task'] = ':not-existing'
+
+        with self.assertRaises(InvalidExecutionPlanException) as exc:
+            ExecutionPlan.from_dict(data, context)
+
+        self.assertIn('Task ":not-existing" is not defined', str(exc.exception))
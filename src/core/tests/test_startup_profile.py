@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import subprocess
+from threading import Thread
+from tempfile import TemporaryDirectory
+from rkd.core.api.testing import BasicTestingCase
+from rkd.core.startup_profile import StartupProfiler
+
+
+class TestStartupProfile(BasicTestingCase):
+    def test_nested_phases_are_recorded_with_their_parent(self):
+        profiler = StartupProfiler()
+
+        with TemporaryDirectory() as workdir:
+            profiler.enable(workdir + '/profile.json')
+
+            with profiler.phase('context'):
+                with profiler.phase('path /project/.rkd'):
+                    thread = Thread(target=profiler.inherit(self._load_subproject), args=(profiler, ))
+                    thread.start()
+                    thread.join()
+
+            profiler.finish()
+
+            with open(workdir + '/profile.json', 'r') as f:
+                profile = json.load(f)
+
+        phases = {phase['name']: phase for phase in profile['phases']}
+
+        self.assertIsNone(phases['context']['parent'])
+        self.assertEqual('context', phases['path /project/.rkd']['parent'])
+        self.assertEqual('context > path /project/.rkd', phases['subproject :docs']['parent'])
+        self.assertGreater(phases['subproject :docs']['allocated_bytes'], 0)
+        self.assertGreaterEqual(profile['total_ms'], phases['context']['wall_ms'])
+        self.assertFalse(profiler.is_enabled())
+
+    @staticmethod
+    def _load_subproject(profiler: StartupProfiler):
+        with profiler.phase('subproject :docs'):
+            return ['Zapatista' for _ in range(0, 1000)]
+
+    def test_disabled_profiler_does_not_record_phases(self):
+        profiler = StartupProfiler()
+        profiler.enable('')
+
+        with profiler.phase('context'):
+            pass
+
+        self.assertFalse(profiler.is_enabled())
+        self.assertEqual([], profiler._records)
+
+    def test_startup_phases_are_written_to_json_file(self):
+        with TemporaryDirectory() as workdir:
+            process = subprocess.run([sys.executable, '-m', 'rkd.core', ':sh', '-c', 'true'], cwd=workdir,
+                                     env=dict(os.environ, RKD_DAEMON_SOCKET='', RKD_STARTUP_PROFILE='profile.json'),
+                                     stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=60)
+
+            self.assertEqual(0, process.returncode, msg=process.stdout.decode('utf-8'))
+
+            with open(workdir + '/profile.json', 'r') as f:
+                names = [phase['name'] for phase in json.load(f)['phases']]
+
+        self.assertIn('context', names)
+        self.assertIn('compilation', names)
+        self.assertIn('commandline parsing', names)
+        self.assertIn('resolving tasks', names)
+
+    def test_breakdown_is_printed_to_stderr(self):
+        with TemporaryDirectory() as workdir:
+            process = subprocess.run([sys.executable, '-m', 'rkd.core', ':sh', '-c', 'true'], cwd=workdir,
+                                     env=dict(os.environ, RKD_DAEMON_SOCKET='', RKD_STARTUP_PROFILE='1'),
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+
+        stderr = process.stderr.decode('utf-8')
+
+        self.assertIn('RKD startup profile, total:', stderr)
+        self.assertIn('context > compilation', stderr)
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
+import pickle
 import pytest
 from rkd.core.api.testing import BasicTestingCase
+from rkd.core.api.syntax import LazyTaskDeclaration
+from rkd.core.argparsing.model import ArgumentBlock
 from rkd.core.test import get_test_declaration
 
 
@@ -75,3 +78,50 @@ class TestTaskDeclaration(BasicTestingCase):
         declaration._is_internal = False       # this one overrides the second one
 
         self.assertFalse(declaration.is_internal)
+
+    def test_copies_share_task_and_containers_with_original_declaration(self) -> None:
+        declaration = get_test_declaration()
+        block = ArgumentBlock([':rkd:test'])
+
+        copy = declaration.with_connected_block(block).as_part_of_subproject('/tmp', ':docs')
+
+        self.assertIs(declaration.get_task_to_execute(), copy.get_task_to_execute())
+        self.assertIs(declaration.get_env(), copy.get_env())
+        self.assertIs(block, copy.block())
+        self.assertNotEqual(declaration.get_unique_id(), copy.get_unique_id())
+
+        # the original is not touched
+        self.assertIsNone(declaration.block())
+        self.assertEqual(':rkd:test', declaration.to_full_name())
+
+    def test_setters_replace_containers_instead_of_modifying_them(self) -> None:
+        declaration = get_test_declaration()
+        args = declaration.get_args()
+
+        copy = declaration.with_args(['--a=Solidarity']).with_env({'STRIKE': 'general'})
+
+        self.assertEqual([], args)
+        self.assertEqual(['--a=Solidarity'], copy.get_args())
+        self.assertNotIn('STRIKE', declaration.get_env())
+        self.assertEqual({'STRIKE': 'general'}, copy.get_env())
+
+    def test_attributes_set_on_declaration_are_kept_in_copies(self) -> None:
+        """Makefiles and extensions are allowed to set own attributes on declarations"""
+
+        declaration = get_test_declaration()
+        declaration.format_task_name = lambda text: text.upper()
+
+        copy = declaration.with_args(['--a=Solidarity']).as_part_of_subproject('/tmp', ':docs')
+
+        self.assertEqual(':STRIKE', copy.format_task_name(':strike'))
+
+    def test_copy_of_lazy_declaration_is_picklable(self) -> None:
+        lazy = LazyTaskDeclaration('rkd.core.test.TaskForTesting', ':rkd:test', description='Test')
+        copy = lazy.as_part_of_subproject('/tmp', ':docs').with_args(['--help'])
+
+        unpickled = pickle.loads(pickle.dumps(copy))
+
+        self.assertEqual(':docs:rkd:test', unpickled.to_full_name())
+        self.assertEqual(['--help'], unpickled.get_args())
+        self.assertEqual('Test', unpickled.get_description())
+        self.assertEqual('/tmp/', unpickled.workdir)
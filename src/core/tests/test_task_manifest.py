@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+from tempfile import TemporaryDirectory
+from rkd.core.api.parsing import SyntaxParsing
+from rkd.core.api.syntax import TaskDeclaration, LazyTaskDeclaration
+from rkd.core.api.testing import BasicTestingCase
+from rkd.core.exception import DeclarationException
+from rkd.core.task_manifest import TaskManifest
+from rkd.core.standardlib.core import CallableTask
+from rkd.core.context import ContextFactory
+from rkd.core.context_cache import ContextCache
+from rkd.core.api.inputoutput import NullSystemIO
+from rkd.core.api.contract import TaskInterface, ExecutionContext
+from rkd.process import switched_workdir
+
+PLUGIN_MODULE = '''
+from rkd.core.api.syntax import TaskDeclaration
+from rkd.core.api.contract import TaskInterface, ExecutionContext
+
+
+class StrikeTask(TaskInterface):
+    """Stops the work
+
+    Until the demands are met
+    """
+
+    def get_name(self) -> str:
+        return ':strike'
+
+    def get_group_name(self) -> str:
+        return ':{group}'
+
+    def get_dependencies(self):
+        return [':organize']
+
+    def configure_argparse(self, parser):
+        pass
+
+    def execute(self, context: ExecutionContext) -> bool:
+        return True
+
+
+def imports():
+    return [TaskDeclaration(StrikeTask(), internal=True, dependencies=[':vote'])]
+'''
+
+
+class ConstructorCountingTask(TaskInterface):
+    instances = 0
+
+    def __init__(self):
+        ConstructorCountingTask.instances += 1
+
+    def get_name(self) -> str:
+        return ':count'
+
+    def get_group_name(self) -> str:
+        return ''
+
+    def configure_argparse(self, parser):
+        pass
+
+    def execute(self, context: ExecutionContext) -> bool:
+        return True
+
+
+class TestTaskManifest(BasicTestingCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.plugin_dir = TemporaryDirectory()
+        sys.path.append(self.plugin_dir.name)
+
+    def tearDown(self) -> None:
+        sys.path.remove(self.plugin_dir.name)
+        sys.modules.pop('rkd_test_plugin', None)
+        self.plugin_dir.cleanup()
+        super().tearDown()
+
+    def _create_plugin(self, group: str = 'union'):
+        with open(self.plugin_dir.name + '/rkd_test_plugin.py', 'w') as f:
+            f.write(PLUGIN_MODULE.format(group=group))
+
+        # mtime could be the same as before in case of quick writes
+        os.utime(self.plugin_dir.name + '/rkd_test_plugin.py', ns=(1, len(group)))
+        sys.modules.pop('rkd_test_plugin', None)
+
+    def test_tasks_are_imported_lazily_when_manifest_was_generated(self):
+        self._create_plugin()
+
+        with TemporaryDirectory() as workdir:
+            manifest_path = workdir + '/manifest.json'
+
+            # first time the module is imported, and remembered
+            first = TaskManifest(manifest_path)
+            eager = SyntaxParsing.parse_imports_by_list_of_classes(['rkd_test_plugin'], first)
+
+            self.assertTrue(first.save())
+            self.assertEqual(TaskDeclaration, type(eager[0]))
+
+            sys.modules.pop('rkd_test_plugin')
+
+            lazy = SyntaxParsing.parse_imports_by_list_of_classes(['rkd_test_plugin'], TaskManifest(manifest_path))
+            declaration = lazy[0]
+
+            self.assertEqual(LazyTaskDeclaration, type(declaration))
+            self.assertNotIn('rkd_test_plugin', sys.modules)
+
+            self.assertEqual(':union:strike', declaration.to_full_name())
+            self.assertEqual('Stops the work', declaration.get_description())
+            self.assertIn('Until the demands are met', declaration.get_full_description())
+            self.assertEqual([':vote', ':organize'], declaration.get_dependencies())
+            self.assertTrue(declaration.is_internal)
+            self.assertEqual(':union:union:strike', declaration.as_part_of_subproject('union', ':union').to_full_name())
+            self.assertNotIn('rkd_test_plugin', sys.modules)
+
+            # the module is imported only when the task is going to be executed
+            self.assertEqual(':union:strike', declaration.get_task_to_execute().get_full_name())
+            self.assertIn('rkd_test_plugin', sys.modules)
+
+    def test_changed_module_is_imported_again(self):
+        self._create_plugin()
+
+        with TemporaryDirectory() as workdir:
+            manifest = TaskManifest(workdir + '/manifest.json')
+            SyntaxParsing.parse_imports_by_list_of_classes(['rkd_test_plugin'], manifest)
+            manifest.save()
+
+            self._create_plugin(group='federation')
+
+            imported = SyntaxParsing.parse_imports_by_list_of_classes(['rkd_test_plugin'],
+                                                                      TaskManifest(workdir + '/manifest.json'))
+
+            self.assertEqual(TaskDeclaration, type(imported[0]))
+            self.assertEqual(':federation:strike', imported[0].to_full_name())
+
+    def test_tasks_taking_constructor_arguments_are_not_remembered(self):
+        with TemporaryDirectory() as workdir:
+            manifest = TaskManifest(workdir + '/manifest.json')
+            declaration = TaskDeclaration(CallableTask(':picket', lambda ctx, task: True))
+
+            self.assertFalse(manifest.remember('rkd_test_plugin', sys.modules[__name__], [declaration]))
+            self.assertFalse(manifest.save())
+
+    def test_task_class_is_not_instantiated_to_describe_the_task(self):
+        declaration = TaskDeclaration(ConstructorCountingTask())
+        instances = ConstructorCountingTask.instances
+
+        metadata = LazyTaskDeclaration.describe(declaration)
+
+        self.assertEqual(instances, ConstructorCountingTask.instances)
+        self.assertEqual(__name__ + '.ConstructorCountingTask', metadata['class_path'])
+
+    def test_task_configured_after_construction_is_not_described(self):
+        task = ConstructorCountingTask()
+        task.picket_line = 'Gate 3'
+
+        self.assertIsNone(LazyTaskDeclaration.describe(TaskDeclaration(task)))
+
+    def test_lazy_declaration_detects_renamed_task(self):
+        declaration = LazyTaskDeclaration('rkd.core.standardlib.core.VersionTask', ':old-version')
+
+        with self.assertRaises(DeclarationException) as exc:
+            declaration.get_task_to_execute()
+
+        self.assertIn('Task manifest is outdated', str(exc.exception))
+
+    def test_context_is_cached_with_lazy_declarations(self):
+        """Context is not cached in the invocation that updated the manifest - next one declares tasks lazily"""
+
+        self._create_plugin()
+
+        with TemporaryDirectory() as workdir, switched_workdir(workdir), self.environment({'RKD_PATH': ''}):
+            os.mkdir(workdir + '/.rkd')
+
+            with open(workdir + '/.rkd/makefile.yaml', 'w') as f:
+                f.write('\n'.join([
+                    'version: org.riotkit.rkd/yaml/v1',
+                    'imports: [rkd_test_plugin]',
+                    'tasks:',
+                    '    :vote: {steps: "true"}',
+                    '    :organize: {steps: "true"}'
+                ]))
+
+            def load():
+                return ContextFactory(NullSystemIO(), cache=ContextCache('.rkd/.context-cache'),
+                                      manifest=TaskManifest('.rkd/.task-manifest.json')).create_unified_context()
+
+            self.assertEqual(TaskDeclaration, type(load().find_task_by_name(':union:strike')))
+            self.assertFalse(os.path.exists('.rkd/.context-cache'))
+
+            self.assertEqual(LazyTaskDeclaration, type(load().find_task_by_name(':union:strike')))
+            self.assertTrue(os.path.exists('.rkd/.context-cache'))
+
+            sys.modules.pop('rkd_test_plugin')
+            self.assertEqual(LazyTaskDeclaration, type(load().find_task_by_name(':union:strike')))
+            self.assertNotIn('rkd_test_plugin', sys.modules)
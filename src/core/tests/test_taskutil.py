@@ -2,11 +2,13 @@
 
 import unittest.mock
 import os
+import asyncio
 import psutil
 import subprocess
 from tempfile import NamedTemporaryFile
 from collections import OrderedDict
 from io import StringIO
+from time import time
 from rkd.core.api.testing import BasicTestingCase, OutputCapturingSafeTestCase
 from rkd.core.standardlib import InitTask
 from rkd.core.api.inputoutput import IO
@@ -281,6 +283,41 @@ for i in range(0, 1024 * 128):
 
         self.assertEqual('docker-compose -p riotkit up -d', out.strip())
 
+    def test_sh_async_executes_scripts_concurrently(self):
+        task = InitTask()
+        task._io = IO()
+
+        io = IO()
+        out = StringIO()
+
+        async def build_all():
+            return await asyncio.gather(
+                task.sh_async('sleep 1; echo "Built ${NAME}"', env={'NAME': 'first'}),
+                task.sh_async('sleep 1; echo "Built second"'),
+                task.sh_async('sleep 1; echo "Built third"', capture=True)
+            )
+
+        started_at = time()
+
+        with io.capture_descriptors(stream=out, enable_standard_out=False):
+            results = asyncio.run(build_all())
+
+        self.assertLess(time() - started_at, 2.5)
+        self.assertIn('Built first', out.getvalue())
+        self.assertIn('Built second', out.getvalue())
+        self.assertEqual([None, None, 'Built third\n'], results)
+
+    def test_sh_async_raises_exception_on_failure(self):
+        task = InitTask()
+        task._io = IO()
+
+        for capture in [False, True]:
+            with self.subTest(capture=capture), self.assertRaises(subprocess.CalledProcessError) as exc:
+                asyncio.run(task.sh_async('echo "Zapatistas"; exit 5', capture=capture))
+
+            self.assertEqual(5, exc.exception.returncode)
+            self.assertIn('Zapatistas', str(exc.exception.output))
+
     def test_py_executes_python_scripts_without_specifying_script_path(self):
         """Simply - check basic successful case - executing a Python code"""
 
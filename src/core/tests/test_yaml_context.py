@@ -85,6 +85,24 @@ class TestYamlContext(BasicTestingCase):
         self.assertTrue(parsed_tasks[0].is_internal)
         self.assertFalse(parsed_tasks[1].is_internal)
 
+    def test_parse_tasks_reads_dependencies(self):
+        input_tasks = {
+            ':build': {
+                'steps': ['echo "Build"']
+            },
+            ':test': {
+                'dependencies': [':build'],
+                'steps': ['echo "Test"']
+            }
+        }
+
+        io = IO()
+        factory = YamlSyntaxInterpreter(io, YamlFileLoader([]))
+        parsed_tasks = factory.parse_tasks(input_tasks, '', './makefile.yaml', OrderedDict())
+
+        self.assertEqual([], parsed_tasks[0].get_dependencies())
+        self.assertEqual([':build'], parsed_tasks[1].get_dependencies())
+
     def test_parse_tasks_signals_error_instead_of_throwing_exception(self):
         """
         Test that error thrown by executed Python code will
@@ -164,3 +164,28 @@ tasks:
 
         yaml_loader = YamlFileLoader([])
         self.assertEqual('', yaml_loader.find_path_by_name('some-file-that-does-not-exists', ''))
+
+    def test_compiled_validator_is_reused_until_schema_file_changes(self):
+        """Schema is read and compiled once per process, a modified schema is compiled again"""
+
+        with tempfile.TemporaryDirectory() as d:
+            os.mkdir(d + '/schema')
+            schema_path = d + '/schema/org.riotkit-test-v1.json'
+            yaml_loader = YamlFileLoader([d])
+
+            with open(schema_path, 'w') as f:
+                f.write('{"type": "object", "properties": {"version": {"type": "string"}}}')
+
+            yaml_loader.validate({'version': 'v1'}, 'org.riotkit/test/v1')
+            validator = yaml_loader._get_validator(schema_path)
+
+            self.assertIs(validator, yaml_loader._get_validator(schema_path))
+
+            with open(schema_path, 'w') as f:
+                f.write('{"type": "object", "properties": {"version": {"type": "integer"}}}')
+
+            os.utime(schema_path, ns=(1, 1))
+
+            self.assertIsNot(validator, yaml_loader._get_validator(schema_path))
+            self.assertRaises(YAMLFileValidationError,
+                              lambda: yaml_loader.validate({'version': 'v1'}, 'org.riotkit/test/v1'))
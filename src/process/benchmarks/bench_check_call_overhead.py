@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: check_call() per-call overhead
+=========================================
+
+Measures how much time rkd.process.check_call() adds on top of spawning the same shell command with
+subprocess.check_call() - short commands are dominated by the relay startup and shutdown, not by the command itself.
+
+Usage: python benchmarks/bench_check_call_overhead.py [--calls 50] [--command true]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from statistics import median
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)) + '/../')
+
+from rkd.process import check_call  # noqa: E402
+
+
+def measure(func, calls: int) -> list:
+    timings = []
+
+    for _ in range(0, calls):
+        started_at = perf_counter()
+        func()
+        timings.append(perf_counter() - started_at)
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures per-call overhead of rkd.process.check_call()')
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--command', default='true')
+    args = parser.parse_args()
+
+    original_stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+
+    try:
+        reference = measure(lambda: subprocess.check_call(args.command, shell=True), args.calls)
+        relayed = measure(lambda: check_call(args.command), args.calls)
+    finally:
+        sys.stdout.close()
+        sys.stdout = original_stdout
+
+    print('Command: %s, calls: %i' % (args.command, args.calls))
+    print('subprocess.check_call()    median: %8.2f ms' % (median(reference) * 1000))
+    print('rkd.process.check_call()   median: %8.2f ms' % (median(relayed) * 1000))
+    print('Overhead per call          median: %8.2f ms' % ((median(relayed) - median(reference)) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark: check_call() output throughput
+=========================================
+
+Relays several gigabytes of output of a command through rkd.process.check_call() into the same kind of sinks
+RKD uses during a task execution - a terminal (text stream) and an unbuffered log file (binary stream).
+
+Usage: python benchmarks/bench_check_call_throughput.py [--size 2G]
+"""
+
+import os
+import sys
+import argparse
+import resource
+import subprocess
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)) + '/../')
+
+from rkd.process import check_call  # noqa: E402
+
+LINE = 'Riotkit-Do throughput benchmark, a line that is long enough to look like a real build log output'
+UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+class ReplicatedOutput(object):
+    """Writes to multiple streams, text or binary - simplified rkd.core.api.inputoutput.StandardOutputReplication"""
+
+    def __init__(self, streams: list):
+        self._streams = streams
+
+    def write(self, text: str):
+        for stream in self._streams:
+            try:
+                stream.write(text)
+            except TypeError:
+                stream.write(text.encode('utf-8'))
+
+    def flush(self):
+        for stream in self._streams:
+            stream.flush()
+
+    def fileno(self):
+        return self._streams[0].fileno()
+
+
+def parse_size(size: str) -> int:
+    if size[-1].upper() in UNITS:
+        return int(size[0:-1]) * UNITS[size[-1].upper()]
+
+    return int(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures output throughput of rkd.process.check_call()')
+    parser.add_argument('--size', default='2G', help='Amount of output to produce, eg. 500M, 4G')
+    args = parser.parse_args()
+
+    size = parse_size(args.size)
+    command = "yes '%s' | head -c %i" % (LINE, size)
+
+    started_at = perf_counter()
+    subprocess.check_call(command + ' > /dev/null', shell=True)
+    reference_time = perf_counter() - started_at
+
+    original_stdout = sys.stdout
+
+    with TemporaryDirectory() as temp_dir, open(os.devnull, 'w') as terminal, \
+            open(temp_dir + '/task.log', 'wb', buffering=0) as log:
+
+        sys.stdout = ReplicatedOutput([terminal, log])
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        started_at = perf_counter()
+
+        try:
+            check_call(command)
+        finally:
+            sys.stdout = original_stdout
+
+        relay_time = perf_counter() - started_at
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+        logged_size = os.path.getsize(temp_dir + '/task.log')
+
+    print('Output: %i MB (%i MB logged with terminal line endings)' % (size / UNITS['M'], logged_size / UNITS['M']))
+    print('Command writing to /dev/null:   %7.2f s, %8.1f MB/s' % (reference_time, size / reference_time / UNITS['M']))
+    print('Relayed by check_call():        %7.2f s, %8.1f MB/s' % (relay_time, size / relay_time / UNITS['M']))
+    print('CPU time of relaying process:   %7.2f s user, %.2f s system' % (
+        usage_after.ru_utime - usage_before.ru_utime,
+        usage_after.ru_stime - usage_before.ru_stime
+    ))
+
+
+if __name__ == '__main__':
+    main()
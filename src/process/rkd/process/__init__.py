@@ -11,6 +11,7 @@ making it impossible to capture the text for logging.
 """
 import io
 import os
+import codecs
 import sys
 import subprocess
 import termios
@@ -29,6 +30,9 @@ from . import env as rkd_env
 
 ON_POSIX = 'posix' in sys.builtin_module_names
 TEXT_BUFFER_CALLBACK_DEFINITION = Optional[Callable[[str], None]]
+OUTPUT_READ_SIZE = 1024 * 64
+OUTPUT_BATCH_MIN_SIZE = 1024 * 64
+OUTPUT_BATCH_MAX_SIZE = 1024 * 1024 * 4
 
 
 @contextmanager
@@ -43,33 +47,61 @@ def switched_workdir(workdir: str):
 
 
 class TextBuffer(object):
-    text: str
+    """
+    Keeps last N bytes of the output (eg. to attach to an exception), forwards all the text to the callback.
+
+    A fixed-size ring buffer - writing does not copy the already buffered data, old data is overwritten in place.
+    """
+
     size: int
     callback: TEXT_BUFFER_CALLBACK_DEFINITION
+    _ring: bytearray
+    _position: int
+    _length: int
 
     def __init__(self, buffer_size: int, callback: TEXT_BUFFER_CALLBACK_DEFINITION = None):
-        self.text = ''
         self.size = buffer_size
         self.callback = callback
+        self._ring = bytearray(buffer_size)
+        self._position = 0
+        self._length = 0
 
     def write(self, text: str):
-        buf_len = len(self.text)
-        txt_len = len(text)
-
-        if buf_len + txt_len > self.size:
-            missing_len = (buf_len + txt_len) - self.size
-            self.trim_left_by(missing_len)
-
-        self.text += text
+        # each character takes at least one byte - older text would be overwritten anyway
+        self._write_bytes(text[-self.size:].encode('utf-8'))
 
         if self.callback:
             self.callback(text)
 
+    def _write_bytes(self, data: bytes):
+        data = data[-self.size:] if self.size else b''
+        first_part_len = min(len(data), self.size - self._position)
+
+        self._ring[self._position:self._position + first_part_len] = data[0:first_part_len]
+        self._ring[0:len(data) - first_part_len] = data[first_part_len:]
+
+        self._position = (self._position + len(data)) % self.size if self.size else 0
+        self._length = min(self._length + len(data), self.size)
+
     def trim_left_by(self, chars: int):
-        self.text = self.text[chars:]
+        """Forget oldest bytes"""
+
+        self._length = max(self._length - chars, 0)
 
     def get_value(self) -> str:
-        return self.text
+        start = (self._position - self._length) % self.size if self.size else 0
+
+        if start + self._length <= self.size:
+            data = self._ring[start:start + self._length]
+        else:
+            data = self._ring[start:] + self._ring[0:self._position]
+
+        # beginning could be a part of a multi-byte character
+        return bytes(data).decode('utf-8', errors='ignore')
+
+    @property
+    def text(self) -> str:
+        return self.get_value()
 
 
 class ProcessState(object):
@@ -80,6 +112,55 @@ class ProcessState(object):
         self.has_exited = False
 
 
+class ProcessExitNotifier(object):
+    """
+    Descriptor that becomes readable, when the process exits - so the output relay can block on a single epoll
+    for both the output and the process end.
+
+    Uses pidfd on Linux 5.3+, falls back to a self-pipe written by a thread that waits for the process.
+    """
+
+    _fd: int
+    _pipe_write_fd: Optional[int]
+
+    def __init__(self, process: subprocess.Popen):
+        self._pipe_write_fd = None
+
+        try:
+            self._fd = os.pidfd_open(process.pid)
+            return
+
+        except (AttributeError, OSError):
+            pass
+
+        self._fd, self._pipe_write_fd = os.pipe()
+
+        waiting_thread = Thread(target=self._notify_on_exit, args=(process, self._pipe_write_fd))
+        waiting_thread.daemon = True
+        waiting_thread.start()
+
+    @staticmethod
+    def _notify_on_exit(process: subprocess.Popen, write_fd: int):
+        try:
+            process.wait()
+            os.write(write_fd, b'x')
+
+        except OSError:
+            pass
+
+        finally:
+            os.close(write_fd)
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def close(self):
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
 def check_call(command: str, script_to_show: Optional[str] = '',
                use_subprocess: bool = False,
                cwd: Union[str, None] = None,
@@ -128,6 +209,8 @@ def check_call(command: str, script_to_show: Optional[str] = '',
     primary_fd = None
     replica_fd = None
     process: Optional[subprocess.Popen] = None
+    exit_notifier: Optional[ProcessExitNotifier] = None
+    out_buffer = TextBuffer(buffer_size=1024 * 10, callback=output_capture_callback)
 
     try:
         if is_interactive_session:
@@ -136,34 +219,24 @@ def check_call(command: str, script_to_show: Optional[str] = '',
         # open a virtual terminal
         primary_fd, replica_fd = pty.openpty()
 
-        # little hack: give thread a time to warm up
-        command = 'sleep 0.03 && ' + command
-
+        # output written before the relay starts waits in the terminal buffer, nothing is lost
         process = subprocess.Popen(command, shell=True, stdin=replica_fd, stdout=replica_fd, stderr=replica_fd,
                                    bufsize=0, close_fds=ON_POSIX, universal_newlines=True, preexec_fn=os.setsid,
                                    cwd=cwd if cwd else os.getcwd(), env=env if env else None)
 
-        out_buffer = TextBuffer(buffer_size=1024 * 10, callback=output_capture_callback)
-        fd_thread = Thread(
-            target=push_output,
-            args=(
-                process, primary_fd,
-                out_buffer, process_state,
-                is_interactive_session,
-                lambda: clean_up_on_process_exit(old_tty, process_state, is_interactive_session,
-                                                 primary_fd, replica_fd, process)
-            )
-        )
+        exit_notifier = ProcessExitNotifier(process)
+        push_output(process, primary_fd, out_buffer, process_state, is_interactive_session, exit_notifier.fileno())
 
-        fd_thread.daemon = True
-        fd_thread.start()
+        # the process could be still running, when the output relay failed - it is terminated on clean up
+        if process_state.exception:
+            raise process_state.exception
 
         exit_code = process.wait()
     finally:
         clean_up_on_process_exit(old_tty, process_state, is_interactive_session, primary_fd, replica_fd, process)
 
-    if process_state.exception:
-        raise process_state.exception
+        if exit_notifier:
+            exit_notifier.close()
 
     if exit_code > 0:
         raise subprocess.CalledProcessError(
@@ -202,29 +275,34 @@ def clean_up_on_process_exit(old_tty, process_state: ProcessState, is_interactiv
         for fd in [primary_fd, replica_fd]:
             try:
                 os.close(fd)
-            except OSError:
+            except (OSError, TypeError):
                 pass
     except NameError:
         pass
 
 
 def push_output(process, primary_fd, out_buffer: TextBuffer, process_state: ProcessState,
-                is_interactive_session: bool, on_error: callable):
+                is_interactive_session: bool, exit_fd: int):
 
     """
     Receive output from running process and forward to streams, capture
 
+    Blocks on epoll until there is an output, an input (interactive session) or the process exits - there is no
+    polling interval. After the process exits the remaining output is drained from the terminal.
+
     :param process:
     :param primary_fd:
     :param out_buffer:
     :param process_state:
     :param is_interactive_session:
-    :param on_error:
+    :param exit_fd: Descriptor readable on process exit, see ProcessExitNotifier
     :return:
     """
 
+    relay = OutputRelay(primary_fd, out_buffer)
     poller = select.epoll()
     poller.register(primary_fd, select.EPOLLIN)
+    poller.register(exit_fd, select.EPOLLIN)
 
     # terminal window size updating
     terminal_update_time = 3  # 3 seconds
@@ -233,6 +311,8 @@ def push_output(process, primary_fd, out_buffer: TextBuffer, process_state: Proc
 
     try:
         copy_terminal_size(sys.stdout, primary_fd)
+    except io.UnsupportedOperation:
+        should_update_terminal_size = False
     except OSError as e:
         if e.errno == 25:
             should_update_terminal_size = False
@@ -242,38 +322,107 @@ def push_output(process, primary_fd, out_buffer: TextBuffer, process_state: Proc
     if is_interactive_session:
         poller.register(sys.stdin, select.EPOLLIN)
 
-    while process.poll() is None:
-        for r, flags in poller.poll(timeout=0.01):
-            try:
-                if is_interactive_session and sys.stdin.fileno() is r:
+    try:
+        while not process_state.has_exited:
+            for r, flags in poller.poll():
+                if is_interactive_session and sys.stdin.fileno() == r:
                     d = os.read(r, 10240)
                     os.write(primary_fd, d)
 
-                elif primary_fd is r:
-                    o = os.read(primary_fd, 10240)
+                elif primary_fd == r:
+                    relay.relay()
+
+                    if relay.is_closed:
+                        # all terminal descriptors were closed, but the process still runs
+                        poller.unregister(primary_fd)
+                        continue
 
                     # terminal window size updating
                     if should_update_terminal_size and time() - last_terminal_update >= terminal_update_time:
                         copy_terminal_size(sys.stdout, primary_fd)
                         last_terminal_update = time()
 
-                    # propagate to stdout
-                    if o:
-                        decoded = carefully_decode(o, 'utf-8')
+                elif exit_fd == r:
+                    process_state.has_exited = True
+
+        # everything the process wrote is already in the terminal buffer
+        while relay.relay():
+            pass
+
+    except Exception as exc:
+        process_state.exception = exc
+        process_state.has_exited = True
+
+    finally:
+        poller.close()
+
+
+class OutputRelay(object):
+    """
+    Forwards output of a process from the terminal to sys.stdout and to the buffer
+
+    Terminal returns at most few kilobytes per read, so everything that is already available is read at once and
+    written as a single batch - one write() and flush() per batch, not per read. Batch limit grows while the process
+    produces output faster than it is relayed, and shrinks back when the output gets slow.
+    """
+
+    batch_size: int
+    is_closed: bool
+    _fd: int
+    _out_buffer: TextBuffer
+
+    def __init__(self, primary_fd: int, out_buffer: TextBuffer):
+        self._fd = primary_fd
+        self._out_buffer = out_buffer
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self.batch_size = OUTPUT_BATCH_MIN_SIZE
+        self.is_closed = False
+
+        os.set_blocking(primary_fd, False)
+
+    def relay(self) -> int:
+        """
+        Read all available output (up to the batch limit), then write it at once
+
+        :return: Number of relayed bytes, 0 when there is nothing to read at the moment
+        """
+
+        chunks = []
+        read_len = 0
+
+        while read_len < self.batch_size:
+            try:
+                chunk = os.read(self._fd, OUTPUT_READ_SIZE)
+
+            except BlockingIOError:
+                break
+
+            except OSError:
+                # EIO: all descriptors of the other side of the terminal are closed
+                self.is_closed = True
+                break
+
+            if not chunk:
+                self.is_closed = True
+                break
+
+            chunks.append(chunk)
+            read_len += len(chunk)
 
-                        sys.stdout.write(decoded)
-                        sys.stdout.flush()
-                        out_buffer.write(decoded)
+        if read_len >= self.batch_size:
+            self.batch_size = min(self.batch_size * 2, OUTPUT_BATCH_MAX_SIZE)
+        elif read_len < self.batch_size // 4:
+            self.batch_size = max(self.batch_size // 2, OUTPUT_BATCH_MIN_SIZE)
 
-                if process_state.has_exited:
-                    return True
+        # multi-byte characters split between reads are completed with next batch
+        decoded = self._decoder.decode(b''.join(chunks))
 
-            except Exception as exc:
-                process_state.exception = exc
-                process_state.has_exited = True
-                on_error()
+        if decoded:
+            sys.stdout.write(decoded)
+            sys.stdout.flush()
+            self._out_buffer.write(decoded)
 
-                return
+        return read_len
 
 
 def carefully_decode(txt_as_bytes: bytes, enc: str) -> str:
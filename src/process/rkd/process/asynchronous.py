@@ -0,0 +1,201 @@
+"""
+Asynchronous process engine
+===========================
+
+asyncio-native counterpart of check_call() - many processes can be started and supervised from a single event loop.
+Each process gets its own virtual terminal, the output is relayed to sys.stdout (so the output capturing still works)
+and a tail of the output is kept in a TextBuffer.
+
+Example:
+
+    await asyncio.gather(*[check_call_async('docker build ./' + name) for name in ['app', 'worker', 'proxy']])
+
+Processes do not read from the standard input - a terminal cannot be shared by multiple processes at once.
+"""
+
+import io
+import os
+import sys
+import pty
+import signal
+import asyncio
+import subprocess
+from typing import Optional, Union
+from . import TextBuffer, OutputRelay, ProcessState, TEXT_BUFFER_CALLBACK_DEFINITION
+from . import copy_terminal_size
+
+OUTPUT_TAIL_SIZE = 1024 * 10
+TERMINATION_TIMEOUT = 5
+
+
+class AsyncProcess(object):
+    """
+    A shell command running in a virtual terminal, supervised by the event loop
+
+    Usage:
+        process = AsyncProcess('make build')
+        await process.start()
+        exit_code = await process.wait()
+    """
+
+    command: str
+    out_buffer: TextBuffer
+    _cwd: Optional[str]
+    _env: Optional[dict]
+    _process: Optional[asyncio.subprocess.Process]
+    _state: ProcessState
+    _primary_fd: Optional[int]
+    _replica_fd: Optional[int]
+    _relay: Optional[OutputRelay]
+
+    def __init__(self, command: str, cwd: Union[str, None] = None, env: dict = None,
+                 output_capture_callback: TEXT_BUFFER_CALLBACK_DEFINITION = None):
+        self.command = command
+        self.out_buffer = TextBuffer(buffer_size=OUTPUT_TAIL_SIZE, callback=output_capture_callback)
+        self._cwd = cwd
+        self._env = env
+        self._process = None
+        self._state = ProcessState()
+        self._primary_fd = None
+        self._replica_fd = None
+        self._relay = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process else None
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._process.returncode if self._process else None
+
+    async def start(self) -> 'AsyncProcess':
+        # merge system environment with environment from parameters
+        env = dict(os.environ)
+        env.update(self._env if self._env else {})
+        env['PYTHONUNBUFFERED'] = '1'
+
+        self._primary_fd, self._replica_fd = pty.openpty()
+
+        try:
+            copy_terminal_size(sys.stdout, self._primary_fd)
+        except (OSError, io.UnsupportedOperation):
+            pass
+
+        try:
+            # new session: the whole process group (eg. commands started by the shell) can be terminated at once
+            self._process = await asyncio.create_subprocess_shell(
+                self.command, stdin=self._replica_fd, stdout=self._replica_fd, stderr=self._replica_fd,
+                start_new_session=True, cwd=self._cwd if self._cwd else os.getcwd(), env=env
+            )
+        except Exception:
+            self._close_terminal()
+            raise
+
+        self._relay = OutputRelay(self._primary_fd, self.out_buffer)
+        asyncio.get_running_loop().add_reader(self._primary_fd, self._on_output)
+
+        return self
+
+    def _on_output(self):
+        try:
+            self._relay.relay()
+
+        except Exception as exc:
+            # eg. output_capture_callback raised an exception - it will be raised by wait()
+            self._state.exception = exc
+            asyncio.get_running_loop().remove_reader(self._primary_fd)
+            self.terminate()
+
+    async def wait(self) -> int:
+        """
+        Wait for the process to exit. Cancelling the waiting terminates the process.
+
+        :return: Exit code
+        """
+
+        try:
+            exit_code = await self._process.wait()
+
+        except asyncio.CancelledError:
+            self.terminate()
+
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout=TERMINATION_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.terminate(signal.SIGKILL)
+                await self._process.wait()
+
+            raise
+
+        finally:
+            self._finish()
+
+        if self._state.exception:
+            raise self._state.exception
+
+        return exit_code
+
+    def terminate(self, sig: int = signal.SIGTERM) -> None:
+        """Sends a signal (by default SIGTERM) to the whole process group"""
+
+        if self._process is None or self._process.returncode is not None:
+            return
+
+        try:
+            os.killpg(self._process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _finish(self) -> None:
+        if self._state.has_exited:
+            return
+
+        self._state.has_exited = True
+        asyncio.get_running_loop().remove_reader(self._primary_fd)
+
+        # everything the process wrote is already in the terminal buffer
+        try:
+            if not self._state.exception:
+                while self._relay.relay():
+                    pass
+
+        except Exception as exc:
+            self._state.exception = exc
+
+        finally:
+            self._close_terminal()
+
+    def _close_terminal(self) -> None:
+        for fd in [self._primary_fd, self._replica_fd]:
+            try:
+                os.close(fd)
+            except (OSError, TypeError):
+                pass
+
+
+async def check_call_async(command: str, script_to_show: Optional[str] = '',
+                           cwd: Union[str, None] = None,
+                           env: dict = None,
+                           output_capture_callback: TEXT_BUFFER_CALLBACK_DEFINITION = None) -> None:
+    """
+    Asynchronous version of check_call() - writes output to sys.stdout, raises CalledProcessError on failure
+
+    :param command: Command to execute
+    :param script_to_show: Command to show that it failed
+    :param cwd: (Optional) Change current working directory
+    :param env: (Optional) Append environment variables
+    :param output_capture_callback: Optional callback that can read each buffered text
+
+    :return:
+    """
+
+    process = AsyncProcess(command, cwd=cwd, env=env, output_capture_callback=output_capture_callback)
+    await process.start()
+    exit_code = await process.wait()
+
+    if exit_code != 0:
+        raise subprocess.CalledProcessError(
+            exit_code, script_to_show if script_to_show else command,
+            stderr=process.out_buffer.get_value(),
+            output=process.out_buffer.get_value()
+        )
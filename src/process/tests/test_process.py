@@ -3,8 +3,9 @@
 import os
 import subprocess
 from io import StringIO
+from unittest import mock
 from rkd.core.api.testing import BasicTestingCase
-from rkd.process import carefully_decode, check_call, switched_workdir
+from rkd.process import carefully_decode, check_call, switched_workdir, TextBuffer, OutputRelay
 from rkd.core.api.inputoutput import IO
 
 
@@ -40,6 +41,77 @@ class TestProcess(BasicTestingCase):
         self.assertIn('PROTEST_TYPE=Sabotage', out.getvalue())
         self.assertIn('COMING_FROM_PARENT_CONTEXT=Buenaventura Durruti', out.getvalue())
 
+    def _check_call_captured(self, command: str) -> str:
+        io = IO()
+        out = StringIO()
+
+        with io.capture_descriptors(stream=out, enable_standard_out=False):
+            check_call(command)
+
+        return out.getvalue()
+
+    def test_output_of_short_living_process_is_not_lost(self) -> None:
+        for attempt in range(0, 20):
+            with self.subTest(attempt):
+                self.assertIn('Lucy Parsons', self._check_call_captured('echo "Lucy Parsons"'))
+
+    def test_whole_output_is_relayed_when_process_exits_before_it_is_read(self) -> None:
+        out = self._check_call_captured('seq 1 20000')
+
+        self.assertEqual(list(map(str, range(1, 20001))), out.split())
+
+    def test_process_exit_is_detected_without_pidfd(self) -> None:
+        with mock.patch('os.pidfd_open', side_effect=OSError(38, 'Function not implemented')):
+            self.assertIn('Voltairine de Cleyre', self._check_call_captured('echo "Voltairine de Cleyre"'))
+
+            with self.assertRaises(subprocess.CalledProcessError) as exc:
+                check_call('echo "Emma Goldman"; exit 3')
+
+        self.assertEqual(3, exc.exception.returncode)
+        self.assertIn('Emma Goldman', exc.exception.output)
+
+    def test_text_buffer_keeps_only_the_tail(self) -> None:
+        captured = []
+        buffer = TextBuffer(buffer_size=8, callback=captured.append)
+
+        for text in ['Nestor ', 'Makhno', '', ' Black Army']:
+            buffer.write(text)
+
+        self.assertEqual('ack Army', buffer.get_value())
+        self.assertEqual(['Nestor ', 'Makhno', '', ' Black Army'], captured)
+
+        buffer.trim_left_by(4)
+        self.assertEqual('Army', buffer.get_value())
+
+    def test_text_buffer_drops_partially_overwritten_multibyte_character(self) -> None:
+        buffer = TextBuffer(buffer_size=5)
+        buffer.write('Zażółć')
+
+        self.assertEqual('łć', buffer.get_value())
+
+    def test_output_relay_decodes_characters_split_between_reads(self) -> None:
+        read_fd, write_fd = os.pipe()
+        buffer = TextBuffer(buffer_size=1024)
+        encoded = 'Świętokrzyska'.encode('utf-8')
+
+        try:
+            relay = OutputRelay(read_fd, buffer)
+
+            with IO().capture_descriptors(stream=StringIO(), enable_standard_out=False):
+                os.write(write_fd, encoded[0:1])
+                relay.relay()
+                os.write(write_fd, encoded[1:])
+                relay.relay()
+
+                # nothing to read - does not block
+                self.assertEqual(0, relay.relay())
+
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+        self.assertEqual('Świętokrzyska', buffer.get_value())
+
     def test_switched_workdir(self) -> None:
         original_cwd = os.getcwd()
 
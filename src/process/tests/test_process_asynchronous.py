@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import asyncio
+import subprocess
+from io import StringIO
+from time import time
+from rkd.core.api.testing import BasicTestingCase
+from rkd.core.api.inputoutput import IO
+from rkd.process.asynchronous import check_call_async, AsyncProcess
+
+
+class TestProcessAsynchronous(BasicTestingCase):
+    @staticmethod
+    def _run_captured(coroutine) -> str:
+        io = IO()
+        out = StringIO()
+
+        with io.capture_descriptors(stream=out, enable_standard_out=False):
+            asyncio.run(coroutine)
+
+        return out.getvalue()
+
+    def test_multiple_processes_are_executed_concurrently(self) -> None:
+        async def run_all():
+            await asyncio.gather(*[
+                check_call_async('sleep 1; echo "Worker %i finished"' % num) for num in range(0, 5)
+            ])
+
+        started_at = time()
+        out = self._run_captured(run_all())
+
+        self.assertLess(time() - started_at, 3)
+
+        for num in range(0, 5):
+            self.assertIn('Worker %i finished' % num, out)
+
+    def test_exit_code_is_propagated_with_output_tail(self) -> None:
+        with self.assertRaises(subprocess.CalledProcessError) as exc:
+            self._run_captured(check_call_async('echo "Rudolf Rocker"; exit 4', script_to_show='rocker'))
+
+        self.assertEqual(4, exc.exception.returncode)
+        self.assertEqual('rocker', exc.exception.cmd)
+        self.assertIn('Rudolf Rocker', exc.exception.output)
+
+    def test_environment_and_workdir_are_passed(self) -> None:
+        out = self._run_captured(check_call_async('echo "$PROTEST_TYPE in $(pwd)"', cwd='/tmp',
+                                                  env={'PROTEST_TYPE': 'General strike'}))
+
+        self.assertIn('General strike in /tmp', out)
+
+    def test_cancelling_terminates_the_process_group(self) -> None:
+        pids = []
+
+        async def run_and_cancel():
+            process = AsyncProcess('sleep 30 & wait')
+            await process.start()
+            pids.append(process.pid)
+
+            waiting = asyncio.ensure_future(process.wait())
+            await asyncio.sleep(0.3)
+            waiting.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+
+            # the shell was killed together with its child
+            self.assertIsNotNone(process.returncode)
+
+        started_at = time()
+        self._run_captured(run_and_cancel())
+
+        self.assertLess(time() - started_at, 5)
+
+        # orphaned children could remain as zombies until reaped by init
+        group_states = subprocess.run(['ps', '-o', 'stat=', '-g', str(pids[0])],
+                                      stdout=subprocess.PIPE).stdout.decode('utf-8').split()
+        self.assertEqual([], [state for state in group_states if not state.startswith('Z')])
+
+    def test_callback_exception_terminates_process_and_is_raised(self) -> None:
+        def callback(text: str) -> None:
+            if 'Kronstadt' in text:
+                raise Exception('Found "Kronstadt"')
+
+        started_at = time()
+
+        with self.assertRaises(Exception) as exc:
+            self._run_captured(check_call_async('echo "Kronstadt"; sleep 30', output_capture_callback=callback))
+
+        self.assertEqual('Found "Kronstadt"', str(exc.exception))
+        self.assertLess(time() - started_at, 5)